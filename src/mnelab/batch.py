@@ -0,0 +1,389 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+"""Apply a pipeline recorded in the MNELAB history to many files.
+
+The pipeline consists of the operations saved from MNELAB (View – History – Profile –
+Save to File) or a history script (View – History – Save to File) that read exactly
+one file. The batch runner reads each input file in the same way, runs the pipeline
+for it in a separate worker process, and writes the resulting `data` to the output
+directory. For example:
+
+  mnelab-batch operations.json "study/sub-*/eeg/*.edf" -o derivatives --jobs 4
+
+Plotting calls are removed from the pipeline. Each file gets its own log in the "logs"
+subfolder of the output directory. The state of all files is stored in the output
+directory as well, so running the same command again only processes files that failed
+or were not processed yet (use --restart to process all files).
+"""
+
+import argparse
+import ast
+import hashlib
+import json
+import multiprocessing as mp
+import os
+import sys
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from glob import glob
+from pathlib import Path
+from time import perf_counter
+
+STATE_FILE = "mnelab-batch.json"
+_READERS = {"read_raw", "read_epochs"}
+_INTERACTIVE = {"show", "set_browser_backend"}
+
+
+class PipelineError(Exception):
+    """Raised if operations or a history script cannot be used as a batch pipeline."""
+
+
+def _call_name(func):
+    if isinstance(func, ast.Name):
+        return func.id
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return None
+
+
+def _is_interactive(statement):
+    """Check if a statement only plots or shows something."""
+    if not isinstance(statement, ast.Expr):
+        return False
+    for node in ast.walk(statement):
+        if isinstance(node, ast.Call):
+            name = _call_name(node.func) or ""
+            if name.startswith("plot") or name in _INTERACTIVE:
+                return True
+    return False
+
+
+def load_pipeline(source):
+    """Turn a history script into a pipeline that can be applied to any file.
+
+    Parameters
+    ----------
+    source : str
+        The history script. It must read exactly one file with `read_raw()` or
+        `read_epochs()`.
+
+    Returns
+    -------
+    pipeline : str
+        The pipeline code. It reads the file in the variable `input_fname`, and the
+        variable `data` contains the result after running it.
+    """
+    try:
+        tree = ast.parse(source)
+    except SyntaxError as e:
+        raise PipelineError(f"The pipeline is not valid Python code ({e}).") from e
+    reads = [
+        node
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Call) and _call_name(node.func) in _READERS
+    ]
+    if len(reads) != 1:
+        raise PipelineError(
+            f"The pipeline must read exactly one file, but it reads {len(reads)}."
+        )
+    if not reads[0].args:
+        raise PipelineError("The file name must be the first argument of the reader.")
+    reads[0].args[0] = ast.Name("input_fname", ast.Load())
+    tree.body = [statement for statement in tree.body if not _is_interactive(statement)]
+    return ast.unparse(ast.fix_missing_locations(tree))
+
+
+def pipeline_from_operations(operations):
+    """Turn recorded operations into a pipeline that can be applied to any file.
+
+    The pipeline consists of the code of all operations except interactive ones. The
+    file read by the load operation is replaced with the same reader and arguments.
+
+    Parameters
+    ----------
+    operations : list of mnelab.model.Operation
+        The operations (see `mnelab.model.Model.operations`). Exactly one of them must
+        load a file.
+
+    Returns
+    -------
+    pipeline : str
+        The pipeline code (see `load_pipeline()`).
+    """
+    from mnelab.model import HISTORY_HEADER, read_code
+
+    loads = [operation for operation in operations if operation.name == "load"]
+    if len(loads) != 1:
+        raise PipelineError(
+            f"The pipeline must read exactly one file, but it reads {len(loads)}."
+        )
+    lines = list(HISTORY_HEADER)
+    for operation in operations:
+        if operation.interactive:
+            continue
+        code = operation.code
+        if operation is loads[0]:
+            params = operation.params
+            read = read_code(
+                params["reader"], "input_fname", params["args"], params["kwargs"]
+            )
+            code = [read, *code[1:]]
+        lines.extend(code)
+    return "\n".join(lines)
+
+
+def run_pipeline(pipeline, fname, output_dir, fmt=".fif"):
+    """Apply a pipeline to a file and write the result.
+
+    MNE log messages are written to a log file named after the input file in the "logs"
+    subfolder of `output_dir`.
+
+    Parameters
+    ----------
+    pipeline : str
+        The pipeline code (see `load_pipeline()`).
+    fname : str | Path
+        The input file.
+    output_dir : str | Path
+        The output directory.
+    fmt : str
+        The output file format (extension).
+
+    Returns
+    -------
+    output : str
+        The output file name.
+    """
+    import mne
+    from mne.utils import logger
+    from mnextend import split_name_ext, write_epochs, write_raw
+    from mnextend.io.readers import raw_readers
+
+    output_dir = Path(output_dir)
+    name, _ = split_name_ext(fname, raw_readers)
+    log = output_dir / "logs" / f"{name}.log"
+    log.parent.mkdir(parents=True, exist_ok=True)
+    mne.set_log_file(log, "%(asctime)s %(levelname)s %(message)s", overwrite=True)
+    mne.set_log_level("INFO")
+    try:
+        logger.info(f"Processing {fname}")
+        namespace = {"input_fname": str(fname)}
+        exec(compile(pipeline, "<pipeline>", "exec"), namespace)  # noqa: S102
+        data = namespace["data"]
+        epochs = isinstance(data, mne.BaseEpochs)
+        suffix = ("_epo" if epochs else "_raw") if fmt.startswith(".fif") else ""
+        output = output_dir / f"{name}{suffix}{fmt}"
+        (write_epochs if epochs else write_raw)(output, data)
+        logger.info(f"Wrote {output}")
+        return str(output)
+    except Exception:
+        logger.error(traceback.format_exc())
+        raise
+    finally:
+        mne.set_log_file(None)
+
+
+def estimate_memory(fname):
+    """Estimate the memory needed to process a file.
+
+    The estimate is twice the size of all samples in double precision, because many
+    operations create a copy of the data.
+
+    Parameters
+    ----------
+    fname : str | Path
+        The input file.
+
+    Returns
+    -------
+    nbytes : int
+        The estimated memory in bytes.
+    """
+    from mnextend import read_raw
+
+    try:
+        raw = read_raw(fname, preload=False, verbose="error")
+    except Exception:
+        return 4 * os.path.getsize(fname)  # samples are usually stored as 16 bit
+    return 2 * 8 * raw.info["nchan"] * raw.n_times
+
+
+def _read_state(path, pipeline_hash):
+    try:
+        state = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        state = None
+    if not state or state.get("pipeline") != pipeline_hash:
+        state = {"pipeline": pipeline_hash, "files": {}}
+    return state
+
+
+def _write_state(path, state):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(state, indent=2), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_batch(pipeline, fnames, output_dir, jobs=1, memory_budget=None, fmt=".fif"):
+    """Apply a pipeline to many files in parallel.
+
+    Files which have been processed successfully with the same pipeline (according to
+    the state file in `output_dir`) are skipped.
+
+    Parameters
+    ----------
+    pipeline : str
+        The pipeline code (see `load_pipeline()`).
+    fnames : list of Path
+        The input files.
+    output_dir : Path
+        The output directory.
+    jobs : int
+        Maximum number of files processed at the same time.
+    memory_budget : int | None
+        Maximum total memory (in bytes, see `estimate_memory()`) of the files processed
+        at the same time. A file exceeding the budget on its own is processed when no
+        other file is being processed. If None, the number of files processed at the
+        same time is limited only by `jobs`.
+    fmt : str
+        The output file format (extension).
+
+    Returns
+    -------
+    failed : list of str
+        The files which could not be processed.
+    """
+    output_dir.mkdir(parents=True, exist_ok=True)
+    state_path = output_dir / STATE_FILE
+    state = _read_state(state_path, hashlib.sha256(pipeline.encode()).hexdigest())
+    files = state["files"]
+    todo = deque(
+        fname
+        for fname in map(str, fnames)
+        if files.get(fname, {}).get("status") != "done"
+        or not Path(files[fname]["output"]).exists()
+    )
+    n_skipped = len(fnames) - len(todo)
+    if n_skipped:
+        print(f"Skipping {n_skipped} file(s) processed previously.")
+
+    # estimate once per file, because a file may wait for several loop iterations
+    needs = {}
+    if memory_budget is not None:
+        needs = {fname: estimate_memory(fname) for fname in todo}
+    n_total = len(todo)
+    running = {}  # future → (file name, estimated memory, start time)
+    # each file is processed in a new worker process, which returns all of its memory
+    with ProcessPoolExecutor(
+        jobs, mp_context=mp.get_context("spawn"), max_tasks_per_child=1
+    ) as pool:
+        while todo or running:
+            while todo and len(running) < jobs:
+                need = needs.get(todo[0], 0)
+                used = sum(nbytes for _, nbytes, _ in running.values())
+                if (
+                    running
+                    and memory_budget is not None
+                    and used + need > memory_budget
+                ):
+                    break
+                fname = todo.popleft()
+                future = pool.submit(run_pipeline, pipeline, fname, output_dir, fmt)
+                running[future] = fname, need, perf_counter()
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                fname, _, start = running.pop(future)
+                seconds = round(perf_counter() - start, 3)
+                try:
+                    output = future.result()
+                except Exception as e:
+                    files[fname] = {"status": "failed", "error": repr(e)}
+                    result = f"failed ({e!r})"
+                else:
+                    files[fname] = {"status": "done", "output": output}
+                    result = f"done ({seconds:.1f} s)"
+                files[fname]["seconds"] = seconds
+                _write_state(state_path, state)
+                n_done = n_total - len(todo) - len(running)
+                print(f"[{n_done}/{n_total}] {fname}: {result}")
+    return [fname for fname in map(str, fnames) if files[fname]["status"] == "failed"]
+
+
+def main(argv=None):
+    from mnextend import split_name_ext
+    from mnextend.io.readers import raw_readers
+    from mnextend.io.writers import raw_writers
+
+    from mnelab.model import read_operations
+
+    parser = argparse.ArgumentParser(
+        prog="mnelab-batch",
+        description=__doc__.splitlines()[0],
+        epilog="\n".join(__doc__.splitlines()[2:]),
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument(
+        "pipeline",
+        type=Path,
+        help="operations (.json) or history script (.py) saved from MNELAB",
+    )
+    parser.add_argument("files", nargs="+", help="input files or glob patterns")
+    parser.add_argument(
+        "-o", "--output-dir", type=Path, required=True, help="output directory"
+    )
+    parser.add_argument(
+        "-j", "--jobs", type=int, default=1, help="number of files processed at once"
+    )
+    parser.add_argument(
+        "-m",
+        "--memory-budget",
+        type=int,
+        metavar="MB",
+        help="maximum estimated memory of files processed at once",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        default=".fif",
+        choices=sorted(raw_writers),
+        help="output file format (default: .fif)",
+    )
+    parser.add_argument(
+        "--restart", action="store_true", help="also process completed files"
+    )
+    args = parser.parse_args(argv)
+
+    try:
+        if args.pipeline.suffix == ".json":
+            pipeline = pipeline_from_operations(read_operations(args.pipeline))
+        else:
+            pipeline = load_pipeline(args.pipeline.read_text(encoding="utf-8"))
+    except (OSError, ValueError, TypeError, KeyError, PipelineError) as e:
+        parser.error(str(e))
+    fnames = sorted(
+        {Path(f).resolve() for pattern in args.files for f in glob(pattern)}
+    )
+    if not fnames:
+        parser.error("No input files found.")
+    names = [split_name_ext(fname, raw_readers)[0] for fname in fnames]
+    if len(set(names)) != len(names):
+        parser.error("Input files must have unique names.")
+    if args.restart:
+        (args.output_dir / STATE_FILE).unlink(missing_ok=True)
+
+    memory_budget = None
+    if args.memory_budget is not None:
+        memory_budget = args.memory_budget * 1024**2
+    failed = run_batch(
+        pipeline, fnames, args.output_dir, args.jobs, memory_budget, args.format
+    )
+    if failed:
+        print(f"{len(failed)} file(s) failed, see the logs in {args.output_dir}.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
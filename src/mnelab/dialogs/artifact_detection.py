@@ -2,10 +2,11 @@
 #
 # License: BSD (3-clause)
 
-from matplotlib.backends.backend_qtagg import FigureCanvas
-from matplotlib.colors import to_rgba_array
-from PySide6.QtCore import QEvent, Qt, QTimer
-from PySide6.QtGui import QBrush, QColor, QStandardItem, QStandardItemModel
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from PySide6.QtCore import QEvent, Qt, Signal
+from PySide6.QtGui import QBrush, QColor
 from PySide6.QtWidgets import (
     QAbstractItemView,
     QCheckBox,
@@ -22,12 +23,10 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
-from mnelab.dialogs.utils import (
-    CheckBoxDelegate,
-    NumberSortProxyModel,
-    set_header_alignments,
-)
+from mnelab.dialogs.utils import ArrayColumn, ArrayTableModel, CheckBoxDelegate
 from mnelab.utils import (
+    compute_epoch_stats,
+    find_bad_epochs,
     find_bad_epochs_amplitude,
     find_bad_epochs_autoreject,
     find_bad_epochs_kurtosis,
@@ -36,8 +35,13 @@ from mnelab.utils import (
 from mnelab.utils.dependencies import have
 from mnelab.widgets import FlatDoubleSpinBox
 
+_BAD_BACKGROUND = QBrush(QColor(255, 0, 0, 20))
+_BAD_FOREGROUND = QColor(220, 45, 45)
+
 
 class ArtifactDetectionDialog(QDialog):
+    stats_computed = Signal()  # emitted from the worker thread
+
     def __init__(self, parent, data):
         super().__init__(parent)
         self.setWindowTitle("Artifact Detection")
@@ -47,14 +51,17 @@ class ArtifactDetectionDialog(QDialog):
                     ("threshold", None, 100.0, "µV", "±")
                 ],  # (param_name, display_name, default, unit, prefix)
                 "function": find_bad_epochs_amplitude,
+                "method": "amplitude",
             },
             "Peak-to-Peak": {
                 "parameters": [("threshold", None, 150.0, "µV", "")],
                 "function": find_bad_epochs_ptp,
+                "method": "ptp",
             },
             "Kurtosis": {
                 "parameters": [("threshold", None, 5.0, "SD", "")],
                 "function": find_bad_epochs_kurtosis,
+                "method": "kurtosis",
             },
         }
 
@@ -62,19 +69,36 @@ class ArtifactDetectionDialog(QDialog):
             self.detection_methods["AutoReject"] = {
                 "parameters": [],
                 "function": find_bad_epochs_autoreject,
+                "method": "autoreject",
             }
 
-        # structure: {epoch_idx: {"method_name": bool, "reject": bool}}
-        self.detection_results = {}
+        # rows are epochs, columns are detection methods (in the order of
+        # `detection_methods`) followed by the final rejection decision
+        self.detection_results = np.zeros(
+            (len(data), len(self.detection_methods) + 1), dtype=bool
+        )
         self.method_widgets = {}
         self.data = data
         self.detection_done = False
         self.pending_methods = set()
 
-        # timer for debouncing detection runs
-        self.detection_timer = QTimer()
-        self.detection_timer.setSingleShot(True)
-        self.detection_timer.timeout.connect(self.run_detection)
+        # thresholds are compared against per-epoch statistics, which are computed
+        # once in the background so that changing a threshold takes effect instantly
+        self.stats = None
+        stats = {"amplitude", "ptp", "kurtosis"}
+        if have["autoreject"]:
+            stats.add("max_abs")
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mnelab-stats")
+        # the worker gets a read-only view of the current samples, which stays valid
+        # because dropping, rejecting, and cropping epochs replace the array
+        samples = data
+        if data.preload:
+            samples = data.get_data(copy=False).view()
+            samples.flags.writeable = False
+        self._stats_future = executor.submit(compute_epoch_stats, samples, stats)
+        executor.shutdown(wait=False)
+        self.stats_computed.connect(self._stats_computed)
+        self._stats_future.add_done_callback(lambda _: self.stats_computed.emit())
 
         layout = QVBoxLayout(self)
 
@@ -176,29 +200,36 @@ class ArtifactDetectionDialog(QDialog):
                 results[method] = params
         return results
 
+    def _stats_computed(self):
+        try:
+            self.stats = self._stats_future.result()
+        # compute the statistics again when detecting (and fail there)
+        except Exception:
+            self.stats = {}
+        if self.pending_methods:
+            self.run_detection()
+
     def schedule_detection(self, changed_method=None):
-        """Schedule detection run with a short delay."""
+        """Run detection as soon as the epoch statistics are available."""
         selected = self.get_selected_methods()
 
         # reset if no methods are selected
         if not selected:
-            self.detection_results = {}
+            self.detection_results[:] = False
             self.detection_done = False
             self.info_label.setText("")
             self.preview_button.setEnabled(False)
             self.button_box.button(QDialogButtonBox.StandardButton.Ok).setEnabled(False)
-            self.detection_timer.stop()
             self.pending_methods.clear()
             return
 
-        self.info_label.setText("Detecting artifacts...")
-
         if changed_method is not None:
             self.pending_methods.add(changed_method)
 
-        # 500ms debounce
-        self.detection_timer.stop()
-        self.detection_timer.start(500)
+        if self.stats is None:
+            self.info_label.setText("Computing epoch statistics...")
+        else:
+            self.run_detection()
 
     def update_info_label(self):
         """Update info label and OK button tooltip based on detection state."""
@@ -207,7 +238,7 @@ class ArtifactDetectionDialog(QDialog):
             return
 
         n_total = len(self.detection_results)
-        n_rejected = len(self.get_bad_epochs())
+        n_rejected = np.count_nonzero(self.detection_results[:, -1])
 
         # update label
         self.info_label.setText(
@@ -223,11 +254,7 @@ class ArtifactDetectionDialog(QDialog):
     def run_detection(self):
         """Performs detection and updates UI."""
         selected = self.get_selected_methods()
-        n_epochs = len(self.data)
-
-        # initialize if first run
-        if not self.detection_results:
-            self.detection_results = {i: {} for i in range(n_epochs)}
+        columns = {method: col for col, method in enumerate(self.detection_methods)}
 
         pending_methods = self.pending_methods.copy()
         self.pending_methods.clear()
@@ -237,25 +264,24 @@ class ArtifactDetectionDialog(QDialog):
         methods_to_remove = {m for m in pending_methods if m not in selected}
 
         # clean up results for deselected methods
-        for idx in range(n_epochs):
-            for method in methods_to_remove:
-                self.detection_results[idx].pop(method, None)
+        for method in methods_to_remove:
+            self.detection_results[:, columns[method]] = False
 
         # detection for relevant methods
-        for method, params in methods_to_run.items():
-            detection_func = self.detection_methods[method]["function"]
-            bad_epochs = detection_func(self.data, **params)
-
-            for idx in range(n_epochs):
-                self.detection_results[idx][method] = bool(bad_epochs[idx])
-
-        # OR logic across all methods
-        method_names = list(selected.keys())
-        for idx in range(n_epochs):
-            self.detection_results[idx]["reject"] = any(
-                self.detection_results[idx].get(method, False)
-                for method in method_names
-            )
+        masks = find_bad_epochs(
+            self.data,
+            {
+                self.detection_methods[method]["method"]: params.get("threshold")
+                for method, params in methods_to_run.items()
+            },
+            stats=self.stats,
+        )
+        for method in methods_to_run:
+            bad_epochs = masks[self.detection_methods[method]["method"]]
+            self.detection_results[:, columns[method]] = bad_epochs
+
+        # OR logic across all methods (deselected methods are all False)
+        self.detection_results[:, -1] = self.detection_results[:, :-1].any(axis=1)
 
         # update UI state
         self.detection_done = True
@@ -265,18 +291,21 @@ class ArtifactDetectionDialog(QDialog):
 
     def show_preview_table(self):
         """Show preview table dialog."""
-        dialog = ArtifactPreviewTable(self, self.data, self.detection_results)
+        columns = {
+            method: col
+            for col, method in enumerate(self.detection_methods)
+            if method in self.get_selected_methods()
+        }
+        dialog = ArtifactPreviewTable(
+            self, self.data, self.detection_results.copy(), columns
+        )
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.detection_results = dialog.detection_results
             self.update_info_label()
 
     def get_bad_epochs(self):
         """Return list of epoch indices to reject."""
-        return [
-            idx
-            for idx, results in self.detection_results.items()
-            if results.get("reject", False)
-        ]
+        return np.flatnonzero(self.detection_results[:, -1]).tolist()
 
     def get_history_code(self):
         """Generate code snippet to reproduce the artifact detection."""
@@ -305,11 +334,9 @@ class ArtifactDetectionDialog(QDialog):
         code_lines.append("bad_epochs_auto = np.where(bad_epochs_mask)[0].tolist()")
 
         # manual detection
-        auto_rejected = set()
-        for idx, results in self.detection_results.items():
-            if any(results.get(method, False) for method in selected_methods):
-                auto_rejected.add(idx)
-
+        auto_rejected = set(
+            np.flatnonzero(self.detection_results[:, :-1].any(axis=1)).tolist()
+        )
         final_rejects = set(self.get_bad_epochs())
 
         manual_added = list(final_rejects - auto_rejected)
@@ -338,24 +365,39 @@ class ArtifactDetectionDialog(QDialog):
 
 
 class ArtifactPreviewTable(QDialog):
-    def __init__(self, parent, data, detection_results):
+    def __init__(self, parent, data, detection_results, columns):
         super().__init__(parent)
         self.setWindowTitle("Artifact Detection Preview")
-        n_methods = len(detection_results[0].keys()) - 1
-        width = min(800, 200 + n_methods * 120)
+        width = min(800, 200 + len(columns) * 120)
         self.setFixedSize(width, 400)
 
         self.data = data
-        self.detection_results = {
-            idx: results.copy() for idx, results in detection_results.items()
-        }
+        self.detection_results = detection_results
         layout = QVBoxLayout(self)
 
         self.table_view = QTableView()
-        self.model = QStandardItemModel()
-        self.proxy_model = NumberSortProxyModel()
-        self.proxy_model.setSourceModel(self.model)
-        self.table_view.setModel(self.proxy_model)
+        self.model = ArrayTableModel(
+            [
+                ArrayColumn("Epoch", np.arange(len(detection_results))),
+                *(
+                    ArrayColumn(
+                        method,
+                        detection_results[:, col],
+                        fmt=lambda bad: "✔" if bad else "",
+                        align="c",
+                        background=lambda bad: _BAD_BACKGROUND if bad else None,
+                        foreground=lambda bad: _BAD_FOREGROUND if bad else None,
+                    )
+                    for method, col in columns.items()
+                ),
+                ArrayColumn(
+                    "Reject", detection_results[:, -1], align="c", checkable=True
+                ),
+            ],
+            self,
+        )
+        self.reject_col_idx = self.model.columnCount() - 1
+        self.table_view.setModel(self.model)
 
         self.table_view.setSortingEnabled(True)
         self.table_view.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
@@ -367,8 +409,17 @@ class ArtifactPreviewTable(QDialog):
         self.table_view.verticalHeader().setVisible(False)
 
         self.checkbox_delegate = CheckBoxDelegate()
+        self.table_view.setItemDelegateForColumn(
+            self.reject_col_idx, self.checkbox_delegate
+        )
 
-        self.populate_table()
+        # set column widths
+        header = self.table_view.horizontalHeader()
+        header.setSectionResizeMode(0, QHeaderView.ResizeMode.ResizeToContents)
+        for col in range(1, self.model.columnCount()):
+            header.setSectionResizeMode(col, QHeaderView.ResizeMode.Stretch)
+        # initial sort by epoch index
+        self.table_view.sortByColumn(0, Qt.SortOrder.AscendingOrder)
         layout.addWidget(self.table_view)
 
         self.info_label = QLabel()
@@ -391,101 +442,17 @@ class ArtifactPreviewTable(QDialog):
 
         self.model.dataChanged.connect(self.update_info_label)
 
-    def populate_table(self):
-        """Populate table with detection results."""
-        n_epochs = len(self.detection_results)
-
-        method_cols = [key for key in self.detection_results[0] if key != "reject"]
-        header_labels = ["Epoch"] + method_cols + ["Reject"]
-        self.model.setHorizontalHeaderLabels(header_labels)
-        set_header_alignments(self.model, "r" + "c" * (len(method_cols) + 1))
-
-        self.reject_col_idx = len(header_labels) - 1
-
-        for epoch_idx in range(n_epochs):
-            results = self.detection_results[epoch_idx]
-            row_items = []
-
-            item = QStandardItem()
-            item.setData(epoch_idx, Qt.ItemDataRole.DisplayRole)
-            item.setData(epoch_idx, Qt.ItemDataRole.UserRole)
-            item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
-            item.setTextAlignment(
-                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
-            )
-            row_items.append(item)
-
-            # method columns
-            for col_name in method_cols:
-                bad_epochs = results.get(col_name, False)
-                label = "✔" if bad_epochs else ""
-                item = QStandardItem(label)
-                item.setTextAlignment(Qt.AlignmentFlag.AlignCenter)
-                if bad_epochs:
-                    color = QColor(255, 0, 0, 20)
-                    item.setBackground(QBrush(color))
-                    item.setForeground(QColor(220, 45, 45))
-
-                item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
-                item.setData(int(bad_epochs), Qt.ItemDataRole.UserRole)
-                row_items.append(item)
-
-            reject_item = QStandardItem()
-            reject_item.setFlags(
-                Qt.ItemFlag.ItemIsEnabled
-                | Qt.ItemFlag.ItemIsUserCheckable
-                | Qt.ItemFlag.ItemIsSelectable
-            )
-            check_state = (
-                Qt.CheckState.Checked
-                if results.get("reject", False)
-                else Qt.CheckState.Unchecked
-            )
-            reject_item.setData(check_state, Qt.ItemDataRole.CheckStateRole)
-            row_items.append(reject_item)
-
-            self.model.appendRow(row_items)
-
-        self.table_view.setItemDelegateForColumn(
-            self.reject_col_idx, self.checkbox_delegate
-        )
-
-        # set column widths
-        self.table_view.horizontalHeader().setSectionResizeMode(
-            0, QHeaderView.ResizeMode.ResizeToContents
-        )
-        for col in range(1, len(header_labels)):
-            self.table_view.horizontalHeader().setSectionResizeMode(
-                col, QHeaderView.ResizeMode.Stretch
-            )
-        # initial sort by epoch index
-        self.table_view.sortByColumn(0, Qt.SortOrder.AscendingOrder)
-
     def update_info_label(self):
         """Update label showing rejection statistics."""
-        n_total = self.model.rowCount()
-        n_rejected = 0
-        for row in range(n_total):
-            if (
-                self.model.item(row, self.reject_col_idx).checkState()
-                == Qt.CheckState.Checked
-            ):
-                n_rejected += 1
-
+        n_total = len(self.detection_results)
+        n_rejected = np.count_nonzero(self.detection_results[:, -1])
         self.info_label.setText(
             f"<i>{n_rejected}/{n_total} epochs marked for rejection.</i>"
         )
 
     def show_epoch_visualization(self):
         """Show epoch visualization from the preview table."""
-
-        self.sync_results_from_table()
-
-        flagged_idx = [
-            idx
-            for idx, results in self.detection_results.items()
-            if results.get("reject", False)
-        ]
+        flagged_idx = np.flatnonzero(self.detection_results[:, -1]).tolist()
 
         fig = self.data.plot(scalings="auto", block=False, show=False)
 
@@ -493,6 +460,8 @@ class ArtifactPreviewTable(QDialog):
         fig.mne.bad_epochs = flagged_idx.copy()
 
         if isinstance(fig, QWidget):  # Qt backend
+            from matplotlib.colors import to_rgba_array
+
             fig.mne.epoch_color_ref[:, flagged_idx] = to_rgba_array(
                 fig.mne.epoch_color_bad
             )
@@ -518,51 +487,10 @@ class ArtifactPreviewTable(QDialog):
 
     def _update_from_visualization(self, viz):
         """Called when visualization window closes to update detection results."""
-
-        # reset all rejections
-        for idx in self.detection_results:
-            self.detection_results[idx]["reject"] = False
-
-        # set rejections based on visualization
-        for idx in viz.flagged_epochs:
-            if idx in self.detection_results:
-                self.detection_results[idx]["reject"] = True
-
-        self.refresh_table()
-
-    def refresh_table(self):
-        """Refresh table to reflect updated metadata."""
-        for row_idx in range(len(self.detection_results)):
-            # update the reject checkbox
-            reject_item = self.model.item(row_idx, self.reject_col_idx)
-            check_state = (
-                Qt.CheckState.Checked
-                if self.detection_results[row_idx].get("reject", False)
-                else Qt.CheckState.Unchecked
-            )
-            reject_item.setData(check_state, Qt.ItemDataRole.CheckStateRole)
-
-        self.update_info_label()
-
-    def sync_results_from_table(self):
-        """Sync detection results with current table state."""
-        for proxy_row in range(self.proxy_model.rowCount()):
-            proxy_index = self.proxy_model.index(proxy_row, 0)
-            source_index = self.proxy_model.mapToSource(proxy_index)
-            real_row_idx = source_index.row()
-
-            reject_item = self.model.item(real_row_idx, self.reject_col_idx)
-            is_checked = (
-                reject_item.data(Qt.ItemDataRole.CheckStateRole)
-                == Qt.CheckState.Checked
-            )
-
-            self.detection_results[real_row_idx]["reject"] = is_checked
-
-    def accept(self):
-        """Update detection results based on user changes."""
-        self.sync_results_from_table()
-        super().accept()
+        rejected = self.detection_results[:, -1]
+        rejected[:] = False
+        rejected[[idx for idx in viz.flagged_epochs if idx < len(rejected)]] = True
+        self.model.column_changed(self.reject_col_idx)
 
 
 class EpochVisualization(QDialog):
@@ -585,6 +513,8 @@ class EpochVisualization(QDialog):
                 child.installEventFilter(self)
         else:
             # Matplotlib backend
+            from matplotlib.backends.backend_qtagg import FigureCanvas
+
             self.canvas = FigureCanvas(self.fig)
             self.canvas.installEventFilter(self)
             self.canvas.setFocusPolicy(Qt.FocusPolicy.StrongFocus)
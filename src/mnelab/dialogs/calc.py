@@ -2,18 +2,59 @@
 #
 # License: BSD (3-clause)
 
-from PySide6.QtWidgets import QDialog, QDialogButtonBox, QLabel, QVBoxLayout
+from PySide6.QtCore import QTimer
+from PySide6.QtWidgets import (
+    QDialog,
+    QDialogButtonBox,
+    QLabel,
+    QProgressBar,
+    QVBoxLayout,
+)
 
 
 class CalcDialog(QDialog):
-    def __init__(self, parent, title, message):
+    """Show that a computation is running and allow cancelling it.
+
+    Parameters
+    ----------
+    parent : QWidget
+        The parent widget.
+    title : str
+        The window title.
+    message : str
+        The message shown above the progress bar.
+    progress : callable | None
+        Polled periodically while the dialog is open. Returns a tuple of (done, total)
+        to update the progress bar, or None to leave it unchanged. If None, the
+        progress bar shows a busy indicator.
+    """
+
+    def __init__(self, parent, title, message, progress=None):
         super().__init__(parent)
         self.setWindowTitle(title)
         vbox = QVBoxLayout(self)
         label = QLabel(message)
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)  # busy indicator until progress is known
+        self.progress_bar.setTextVisible(False)
         button = QDialogButtonBox(QDialogButtonBox.StandardButton.Cancel)
         button.rejected.connect(self.close)
         vbox.addWidget(label)
+        vbox.addWidget(self.progress_bar)
         vbox.addWidget(button)
         self.resize(300, 100)
         self.setFocus()
+        self._progress = progress
+        if progress is not None:
+            self._timer = QTimer(self)
+            self._timer.setInterval(100)
+            self._timer.timeout.connect(self._update_progress)
+            self._timer.start()
+
+    def _update_progress(self):
+        progress = self._progress()
+        if progress is not None:
+            done, total = progress
+            self.progress_bar.setTextVisible(True)
+            self.progress_bar.setRange(0, total)
+            self.progress_bar.setValue(done)
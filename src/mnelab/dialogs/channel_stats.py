@@ -6,10 +6,11 @@ import csv
 from datetime import datetime
 from pathlib import Path
 
+import numpy as np
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QStandardItem, QStandardItemModel
 from PySide6.QtWidgets import (
     QAbstractItemView,
+    QCheckBox,
     QDialog,
     QDialogButtonBox,
     QFileDialog,
@@ -19,15 +20,15 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
-from mnelab.dialogs.utils import NumberSortProxyModel, set_header_alignments
-from mnelab.utils import calculate_channel_stats
+from mnelab.dialogs.utils import ArrayColumn, ArrayTableModel
 
 
 class ChannelStats(QDialog):
     _last_directory = None  # track last used directory
 
-    def __init__(self, parent, raw):
+    def __init__(self, parent, get_stats):
         super().__init__(parent=parent)
+        self.get_stats = get_stats
 
         # window
         self.setWindowTitle("Channel Stats")
@@ -35,15 +36,11 @@ class ChannelStats(QDialog):
         layout = QVBoxLayout(self)
 
         # populate model
-        self.populate_model(raw)
-
-        # create proxy model for sorting
-        self.proxy_model = NumberSortProxyModel()
-        self.proxy_model.setSourceModel(self.model)
+        self.populate_model(*get_stats(exact=False))
 
         # create table view
         self.view = QTableView(self)
-        self.view.setModel(self.proxy_model)
+        self.view.setModel(self.model)
         self.view.setSelectionMode(QAbstractItemView.SelectionMode.NoSelection)
         self.view.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)
         self.view.setSortingEnabled(True)
@@ -61,6 +58,10 @@ class ChannelStats(QDialog):
 
         layout.addWidget(self.view)
 
+        self.exact = QCheckBox("Exact quartiles (slow for long recordings)")
+        self.exact.toggled.connect(self._toggle_exact)
+        layout.addWidget(self.exact)
+
         # add buttons
         buttonbox = QDialogButtonBox(QDialogButtonBox.StandardButton.Close)
         savebutton = QPushButton("Save to CSV...")
@@ -74,64 +75,33 @@ class ChannelStats(QDialog):
         self.resize(800, 550)
         self.setFocus()
 
-    def populate_model(self, raw):
-        cols, nchan = calculate_channel_stats(raw)
-        headers = [
-            "Channel",
-            "Name",
-            "Type",
-            "Unit",
-            "Min",
-            "Q1",
-            "Mean",
-            "Median",
-            "Q3",
-            "Max",
+    def populate_model(self, cols, nchan):
+        columns = [
+            ArrayColumn("Channel", np.arange(nchan)),
+            ArrayColumn("Name", np.asarray(cols["name"]), align="l"),
+            ArrayColumn("Type", np.char.upper(np.asarray(cols["type"])), align="l"),
+            ArrayColumn("Unit", np.asarray(cols["unit"]), align="l"),
         ]
-
-        self.model = QStandardItemModel(nchan, len(headers))
-        self.model.setHorizontalHeaderLabels(headers)
-        set_header_alignments(self.model, "rlll" + "r" * 6)
-
-        for i in range(nchan):
-            # Channel
-            item = QStandardItem()
-            item.setData(i, Qt.ItemDataRole.UserRole)
-            item.setData(i, Qt.ItemDataRole.DisplayRole)
-            item.setFlags(Qt.ItemFlag.ItemIsEnabled)
-            item.setTextAlignment(
-                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
-            )
-            self.model.setItem(i, 0, item)
-
-            # Name
-            item = QStandardItem(cols["name"][i])
-            item.setFlags(Qt.ItemFlag.ItemIsEnabled)
-            self.model.setItem(i, 1, item)
-
-            # Type
-            item = QStandardItem(cols["type"][i].upper())
-            item.setFlags(Qt.ItemFlag.ItemIsEnabled)
-            self.model.setItem(i, 2, item)
-
-            # Unit
-            item = QStandardItem(cols["unit"][i])
-            item.setFlags(Qt.ItemFlag.ItemIsEnabled)
-            self.model.setItem(i, 3, item)
-
-            # Numeric columns (Min, Q1, Mean, Median, Q3, Max)
-            for j, key in enumerate(
-                ["min", "Q1", "mean", "median", "Q3", "max"], start=4
-            ):
-                value = cols[key][i]
-                item = QStandardItem()
-                item.setData(f"{value:.2f}", Qt.ItemDataRole.DisplayRole)
-                item.setData(value, Qt.ItemDataRole.UserRole)
-                item.setFlags(Qt.ItemFlag.ItemIsEnabled)
-                item.setTextAlignment(
-                    Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
-                )
-                self.model.setItem(i, j, item)
+        for name, key in [
+            ("Min", "min"),
+            ("Q1", "Q1"),
+            ("Mean", "mean"),
+            ("Median", "median"),
+            ("Q3", "Q3"),
+            ("Max", "max"),
+        ]:
+            columns.append(ArrayColumn(name, np.asarray(cols[key]), fmt=".2f"))
+        self.model = ArrayTableModel(columns, self)
+
+    def _toggle_exact(self, exact):
+        """Replace the statistics with exact or estimated quartiles."""
+        column = self.view.horizontalHeader().sortIndicatorSection()
+        order = self.view.horizontalHeader().sortIndicatorOrder()
+        old_model = self.model
+        self.populate_model(*self.get_stats(exact=exact))
+        self.view.setModel(self.model)
+        old_model.deleteLater()
+        self.view.sortByColumn(column, order)
 
     def _save_to_csv(self):
         """Save channel statistics to a CSV file."""
@@ -157,26 +127,12 @@ class ChannelStats(QDialog):
                 writer = csv.writer(f)
 
                 # write header
-                headers = [
-                    self.model.headerData(
-                        col, Qt.Orientation.Horizontal, Qt.ItemDataRole.DisplayRole
-                    )
-                    for col in range(self.model.columnCount())
-                ]
-                writer.writerow(headers)
+                writer.writerow(column.name for column in self.model.columns)
 
                 # write data rows with full precision for numeric columns
                 for row in range(self.model.rowCount()):
-                    row_data = []
-                    for col in range(self.model.columnCount()):
-                        item = self.model.item(row, col)
-                        user_data = item.data(Qt.ItemDataRole.UserRole)
-                        if user_data is not None and isinstance(
-                            user_data, (int, float)
-                        ):
-                            row_data.append(user_data)
-                        else:
-                            row_data.append(item.data(Qt.ItemDataRole.DisplayRole))
-                    writer.writerow(row_data)
+                    writer.writerow(
+                        column.values[row].item() for column in self.model.columns
+                    )
 
             ChannelStats._last_directory = str(Path(filename).parent)
@@ -14,7 +14,7 @@ from PySide6.QtWidgets import (
 )
 
 from mnelab.dialogs.utils import select_all
-from mnelab.widgets import FlatDoubleSpinBox
+from mnelab.widgets import FlatDoubleSpinBox, FlatSpinBox
 
 
 class ERDSDialog(QDialog):
@@ -82,6 +82,12 @@ class ERDSDialog(QDialog):
         self._b2.setSuffix(" s")
         grid.addWidget(self._b2, 3, 2)
 
+        grid.addWidget(QLabel("Decimation:"), 4, 0)
+        self._decim = FlatSpinBox()
+        self._decim.setRange(1, 100)
+        self._decim.setValue(1)
+        grid.addWidget(self._decim, 4, 1)
+
         self.significance_mask = QCheckBox("Significance Level:")
         self.significance_mask.setChecked(False)
         self.alpha = FlatDoubleSpinBox()
@@ -89,8 +95,15 @@ class ERDSDialog(QDialog):
         self.alpha.setValue(0.05)
         self.alpha.setDecimals(2)
         self.alpha.setSingleStep(0.01)
-        grid.addWidget(self.significance_mask, 4, 0)
-        grid.addWidget(self.alpha, 4, 1)
+        grid.addWidget(self.significance_mask, 5, 0)
+        grid.addWidget(self.alpha, 5, 1)
+
+        grid.addWidget(QLabel("Permutations:"), 6, 0)
+        self._n_permutations = FlatSpinBox()
+        self._n_permutations.setRange(10, 100_000)
+        self._n_permutations.setValue(100)
+        self._n_permutations.setSingleStep(100)
+        grid.addWidget(self._n_permutations, 6, 1)
         self.significance_mask.toggled.connect(self.toggle_alpha)
         self.toggle_alpha()
 
@@ -132,9 +145,18 @@ class ERDSDialog(QDialog):
     def b2(self):
         return self._b2.value()
 
+    @property
+    def decim(self):
+        return self._decim.value()
+
+    @property
+    def n_permutations(self):
+        return self._n_permutations.value()
+
     @Slot()
     def toggle_alpha(self):
         self.alpha.setEnabled(self.significance_mask.isChecked())
+        self._n_permutations.setEnabled(self.significance_mask.isChecked())
 
 
 class ERDSTopomapsDialog(QDialog):
@@ -212,6 +234,12 @@ class ERDSTopomapsDialog(QDialog):
         self._step.setSuffix(" Hz")
         grid.addWidget(self._step, 4, 1)
 
+        grid.addWidget(QLabel("Decimation:"), 5, 0)
+        self._decim = FlatSpinBox()
+        self._decim.setRange(1, 100)
+        self._decim.setValue(1)
+        grid.addWidget(self._decim, 5, 1)
+
         vbox.addLayout(grid)
         self.buttonbox = QDialogButtonBox(
             QDialogButtonBox.StandardButton.Ok | QDialogButtonBox.StandardButton.Cancel
@@ -255,3 +283,7 @@ class ERDSTopomapsDialog(QDialog):
     @property
     def b2(self):
         return self._b2.value()
+
+    @property
+    def decim(self):
+        return self._decim.value()
@@ -5,28 +5,35 @@
 from datetime import datetime
 from pathlib import Path
 
+from PySide6.QtCore import Qt
 from PySide6.QtGui import QGuiApplication
 from PySide6.QtWidgets import (
+    QAbstractItemView,
     QDialog,
     QDialogButtonBox,
     QFileDialog,
+    QHeaderView,
     QPlainTextEdit,
     QPushButton,
+    QTableWidget,
+    QTableWidgetItem,
     QTabWidget,
     QVBoxLayout,
 )
 
+from mnelab.model import summarize_operations, write_operations
 from mnelab.utils import CodeEditor, PythonHighlighter, format_code, monospace_font
 
 
 class HistoryDialog(QDialog):
     _last_directory = None  # track last used directory
 
-    def __init__(self, parent, history, log):
+    def __init__(self, parent, history, log, operations=()):
         super().__init__(parent=parent)
         self.setWindowTitle("History")
         self.history = format_code("\n".join(history))
         self.log = "\n".join(log)
+        self.operations = list(operations)
 
         font = monospace_font()
 
@@ -44,6 +51,7 @@ class HistoryDialog(QDialog):
         self.tabs = QTabWidget()
         self.tabs.addTab(history_text, "History")
         self.tabs.addTab(log_text, "MNE Log")
+        self.tabs.addTab(self._profile_table(), "Profile")
 
         layout = QVBoxLayout()
         layout.addWidget(self.tabs)
@@ -63,18 +71,64 @@ class HistoryDialog(QDialog):
         self.resize(750, 500)
         self.setFocus()
 
+    def _profile_table(self):
+        """Create a table with the time and memory spent per type of operation."""
+        columns = [
+            "Operation",
+            "Count",
+            "Total (s)",
+            "Mean (s)",
+            "Max (s)",
+            "Memory (MB)",
+        ]
+        summary = summarize_operations(self.operations)
+        table = QTableWidget(len(summary), len(columns))
+        table.setHorizontalHeaderLabels(columns)
+        table.verticalHeader().setVisible(False)
+        table.setEditTriggers(QAbstractItemView.EditTrigger.NoEditTriggers)
+        table.horizontalHeader().setSectionResizeMode(
+            QHeaderView.ResizeMode.ResizeToContents
+        )
+        table.horizontalHeader().setStretchLastSection(True)
+        for row, entry in enumerate(summary):
+            values = [
+                entry["name"],
+                str(entry["count"]),
+                f"{entry['total']:.3f}",
+                f"{entry['mean']:.3f}",
+                f"{entry['max']:.3f}",
+                f"{entry['memory_delta'] / 1024**2:+.2f}",
+            ]
+            for column, value in enumerate(values):
+                item = QTableWidgetItem(value)
+                if column > 0:
+                    item.setTextAlignment(
+                        Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+                    )
+                table.setItem(row, column, item)
+        return table
+
     def _copy_to_clipboard(self):
         clipboard = QGuiApplication.clipboard()
         if self.tabs.currentIndex() == 0:
             clipboard.setText(self.history)
-        else:
+        elif self.tabs.currentIndex() == 1:
             clipboard.setText(self.log)
+        else:
+            rows = summarize_operations(self.operations)
+            clipboard.setText(
+                "\n".join(
+                    "\t".join(str(value) for value in row.values()) for row in rows
+                )
+            )
 
     def _save_to_file(self):
         if self.tabs.currentIndex() == 0:
             self._save_history()
-        else:
+        elif self.tabs.currentIndex() == 1:
             self._save_log()
+        else:
+            self._save_operations()
 
     def _save_history(self):
         """Save history to a file."""
@@ -120,3 +174,25 @@ class HistoryDialog(QDialog):
                 f.write(self.log)
                 f.write("\n")
             HistoryDialog._last_directory = str(Path(filename).parent)
+
+    def _save_operations(self):
+        """Save the operation records to a JSON file."""
+        if HistoryDialog._last_directory is not None:
+            start_dir = HistoryDialog._last_directory
+        else:
+            start_dir = str(Path.home())
+
+        filename, _ = QFileDialog.getSaveFileName(
+            self,
+            "Save Operations",
+            str(
+                Path(start_dir)
+                / f"{datetime.now().strftime('%Y-%m-%dT%H-%M-%S')}-operations.json"
+            ),
+            "JSON Files (*.json);;All Files (*)",
+        )
+
+        if filename:
+            filename = str(Path(filename).with_suffix(".json"))
+            write_operations(filename, self.operations)
+            HistoryDialog._last_directory = str(Path(filename).parent)
@@ -2,11 +2,9 @@
 #
 # License: BSD (3-clause)
 
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_qtagg import FigureCanvas
-from mnextend import plot_ica_components
+import numpy as np
 from PySide6.QtCore import Qt
-from PySide6.QtGui import QBrush, QColor, QStandardItem, QStandardItemModel
+from PySide6.QtGui import QBrush, QColor
 from PySide6.QtWidgets import (
     QAbstractItemView,
     QCheckBox,
@@ -21,14 +19,14 @@ from PySide6.QtWidgets import (
     QVBoxLayout,
 )
 
-from mnelab.dialogs.utils import (
-    CheckBoxDelegate,
-    NumberSortProxyModel,
-    set_header_alignments,
-)
+from mnelab.dialogs.utils import ArrayColumn, ArrayTableModel, CheckBoxDelegate
 from mnelab.widgets import FlatDoubleSpinBox
 
 
+def _probability_background(prob):
+    return QBrush(QColor(34, 139, 34, int(prob * 200)))
+
+
 class PlotDetailDialog(QDialog):
     def __init__(self, parent, fig):
         super().__init__(parent)
@@ -39,6 +37,8 @@ class PlotDetailDialog(QDialog):
         layout = QVBoxLayout(self)
         layout.setContentsMargins(0, 0, 0, 0)
 
+        from matplotlib.backends.backend_qtagg import FigureCanvas
+
         self.canvas = FigureCanvas(self.fig)
         layout.addWidget(self.canvas)
 
@@ -46,6 +46,8 @@ class PlotDetailDialog(QDialog):
         self.setFocus()
 
     def closeEvent(self, event):
+        import matplotlib.pyplot as plt
+
         plt.close(self.fig)
         super().closeEvent(event)
 
@@ -130,65 +132,31 @@ class ICLabelDialog(QDialog):
         else:
             self.labels = labels
 
-        if exclude is None:
-            exclude_set = set()
-        else:
-            exclude_set = {int(x) for x in exclude}
-
-        headers = ["IC"] + self.labels + ["Exclude"]
-        self.check_col = len(headers) - 1
-
-        self.model = QStandardItemModel(len(self.probs), len(headers))
-        self.model.setHorizontalHeaderLabels(headers)
-        set_header_alignments(self.model, "r" * (1 + len(self.labels)) + "c")
-
-        row_labels = [str(i + 1) for i in range(len(self.probs))]
-        self.model.setVerticalHeaderLabels(row_labels)
-
-        n_components = len(self.probs)
-        for row_id in range(n_components):
-            item = QStandardItem()
-            item.setData(row_id, Qt.ItemDataRole.UserRole)
-            item.setData(row_id, Qt.ItemDataRole.DisplayRole)
-            item.setFlags(Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable)
-            item.setTextAlignment(
-                Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
-            )
-            self.model.setItem(row_id, 0, item)
-
-            for col_id, prob in enumerate(self.probs[row_id]):
-                prob_item = QStandardItem()
-                prob_item.setData(f"{prob:.2f}", Qt.ItemDataRole.DisplayRole)
-                prob_item.setData(prob, Qt.ItemDataRole.UserRole)
-                prob_item.setFlags(
-                    Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
-                )
-                prob_item.setTextAlignment(
-                    Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
-                )
-
-                alpha = int(prob * 200)
-                color = QColor(34, 139, 34, alpha)
-                prob_item.setBackground(QBrush(color))
-
-                self.model.setItem(row_id, col_id + 1, prob_item)
-
-            exclude = QStandardItem()
-            exclude.setFlags(
-                Qt.ItemFlag.ItemIsUserCheckable
-                | Qt.ItemFlag.ItemIsEnabled
-                | Qt.ItemFlag.ItemIsSelectable
-            )
-            is_excluded = row_id in exclude_set
-            state = Qt.CheckState.Checked if is_excluded else Qt.CheckState.Unchecked
-            exclude.setData(state, Qt.ItemDataRole.CheckStateRole)
-            self.model.setItem(row_id, self.check_col, exclude)
-
-        self.proxy_model = NumberSortProxyModel()
-        self.proxy_model.setSourceModel(self.model)
+        self.excluded = np.zeros(len(self.probs), dtype=bool)
+        if exclude is not None:
+            self.excluded[[int(x) for x in exclude]] = True
+
+        probs = np.asarray(self.probs)
+        self.model = ArrayTableModel(
+            [
+                ArrayColumn("IC", np.arange(len(probs))),
+                *(
+                    ArrayColumn(
+                        label,
+                        probs[:, col],
+                        fmt=".2f",
+                        background=_probability_background,
+                    )
+                    for col, label in enumerate(self.labels)
+                ),
+                ArrayColumn("Exclude", self.excluded, align="c", checkable=True),
+            ],
+            self,
+        )
+        self.check_col = self.model.columnCount() - 1
 
         self.view = QTableView()
-        self.view.setModel(self.proxy_model)
+        self.view.setModel(self.model)
         self.view.setItemDelegateForColumn(self.check_col, CheckBoxDelegate(self))
 
         self.view.setSelectionBehavior(QAbstractItemView.SelectionBehavior.SelectRows)
@@ -241,46 +209,19 @@ class ICLabelDialog(QDialog):
             self.apply_auto_selection(rules)
 
     def apply_auto_selection(self, rules):
-        label_col_map = {name: i + 1 for i, name in enumerate(self.labels)}
-
-        exclude_col = self.model.columnCount() - 1
-
-        for row in range(self.model.rowCount()):
-            should_exclude = False
-
-            for label, threshold in rules.items():
-                col_idx = label_col_map.get(label)
-                if col_idx:
-                    prob_item = self.model.item(row, col_idx)
-                    prob = prob_item.data(Qt.ItemDataRole.UserRole)
-
-                    if prob >= threshold:
-                        should_exclude = True
-                        break
-
-            exclude_item = self.model.item(row, exclude_col)
-            new_state = (
-                Qt.CheckState.Checked if should_exclude else Qt.CheckState.Unchecked
-            )
-            exclude_item.setData(new_state, Qt.ItemDataRole.CheckStateRole)
+        probs = np.asarray(self.probs)
+        self.excluded[:] = False
+        for label, threshold in rules.items():
+            if label in self.labels:
+                self.excluded |= probs[:, self.labels.index(label)] >= threshold
+        self.model.column_changed(self.check_col)
 
     def get_excluded_indices(self):
-        excluded_comp = []
-        for row in range(self.model.rowCount()):
-            last_col_idx = self.model.columnCount() - 1
-            item = self.model.item(row, last_col_idx)
-
-            if item.checkState() == Qt.CheckState.Checked:
-                id_item = self.model.item(row, 0)
-                comp_id = id_item.data(Qt.ItemDataRole.UserRole)
-                excluded_comp.append(comp_id)
-        return excluded_comp
+        return np.flatnonzero(self.excluded).tolist()
 
     def reset_exclusions(self):
-        exclude_col = self.model.columnCount() - 1
-        for row in range(self.model.rowCount()):
-            item = self.model.item(row, exclude_col)
-            item.setData(Qt.CheckState.Unchecked, Qt.ItemDataRole.CheckStateRole)
+        self.excluded[:] = False
+        self.model.column_changed(self.check_col)
 
     def selection_state(self):
         has_selection = self.view.selectionModel().hasSelection()
@@ -289,9 +230,9 @@ class ICLabelDialog(QDialog):
     def plot_ic_properties(self):
         selected_rows = self.view.selectionModel().selectedRows()
 
-        proxy_index = selected_rows[0]
-        source_index = self.proxy_model.mapToSource(proxy_index)
-        comp_id = self.model.item(source_index.row(), 0).data(Qt.ItemDataRole.UserRole)
+        comp_id = self.model.source_row(selected_rows[0].row())
+
+        from mnextend import plot_ica_components
 
         fig = plot_ica_components(
             self.data, self.ica, self.probs, picks=comp_id, show=False
@@ -4,8 +4,6 @@
 
 from pathlib import Path
 
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
 from mne.channels import make_standard_montage, read_custom_montage
 from PySide6.QtCore import Qt
 from PySide6.QtWidgets import (
@@ -76,6 +74,9 @@ class MontageDialog(QDialog):
 
         hbox = QHBoxLayout()
         hbox.addLayout(vbox, stretch=1)
+        from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+        from matplotlib.figure import Figure
+
         self.figure = Figure()
         self.canvas = FigureCanvas(self.figure)
         self.canvas_container = QWidget(self)
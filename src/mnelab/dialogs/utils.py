@@ -2,7 +2,11 @@
 #
 # License: BSD (3-clause)
 
-from PySide6.QtCore import QEvent, QRect, QSortFilterProxyModel, Qt
+from collections.abc import Callable
+from dataclasses import dataclass
+
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QEvent, QRect, Qt
 from PySide6.QtWidgets import (
     QStyle,
     QStyledItemDelegate,
@@ -11,6 +15,12 @@ from PySide6.QtWidgets import (
     QTableWidgetItem,
 )
 
+_ALIGNMENTS = {
+    "l": Qt.AlignmentFlag.AlignLeft,
+    "c": Qt.AlignmentFlag.AlignCenter,
+    "r": Qt.AlignmentFlag.AlignRight,
+}
+
 
 def select_all(list_widget):
     """Select all items in a QListWidget."""
@@ -32,15 +42,10 @@ def set_header_alignments(model, alignments):
         String of alignment characters, one per column. Use `"l"` for left, `"c"` for
         center, and `"r"` for right alignment.
     """
-    _map = {
-        "l": Qt.AlignmentFlag.AlignLeft,
-        "c": Qt.AlignmentFlag.AlignCenter,
-        "r": Qt.AlignmentFlag.AlignRight,
-    }
     for col, char in enumerate(alignments):
         item = model.horizontalHeaderItem(col)
         if item is not None:
-            item.setTextAlignment(_map[char] | Qt.AlignmentFlag.AlignVCenter)
+            item.setTextAlignment(_ALIGNMENTS[char] | Qt.AlignmentFlag.AlignVCenter)
 
 
 class IntTableWidgetItem(QTableWidgetItem):
@@ -99,26 +104,155 @@ class FloatTableWidgetItem(QTableWidgetItem):
         return float(self.data(Qt.ItemDataRole.DisplayRole))
 
 
-class NumberSortProxyModel(QSortFilterProxyModel):
-    """Helper class to sort columns with numerical data."""
+@dataclass
+class ArrayColumn:
+    """A column of an `ArrayTableModel`.
+
+    Parameters
+    ----------
+    name : str
+        The column header.
+    values : numpy.ndarray, shape (n_rows,)
+        The values of the column. Values of checkable columns are written to this
+        array when they are (un)checked, so it can be a view of a larger array.
+    fmt : str | callable
+        Format specification (e.g. ".2f") or function converting a value to its
+        displayed text.
+    align : {"l", "c", "r"}
+        Alignment of the cells and the header (like in `set_header_alignments()`).
+    checkable : bool
+        If True, the (boolean) values are shown and edited as check boxes.
+    background : callable | None
+        Function returning the background (or None) of a cell given its value.
+    foreground : callable | None
+        Function returning the text color (or None) of a cell given its value.
+    """
+
+    name: str
+    values: np.ndarray
+    fmt: str | Callable = ""
+    align: str = "r"
+    checkable: bool = False
+    background: Callable | None = None
+    foreground: Callable | None = None
 
-    def lessThan(self, left, right):
-        left_data = self.sourceModel().data(left, Qt.ItemDataRole.UserRole)
-        if left_data is None:
-            left_data = self.sourceModel().data(left, Qt.ItemDataRole.CheckStateRole)
-        right_data = self.sourceModel().data(right, Qt.ItemDataRole.UserRole)
-        if right_data is None:
-            right_data = self.sourceModel().data(right, Qt.ItemDataRole.CheckStateRole)
 
-        if left_data is None:
-            return True
-        if right_data is None:
-            return False
+class ArrayTableModel(QAbstractTableModel):
+    """Table model showing columns stored in NumPy arrays.
 
-        try:
-            return float(left_data) < float(right_data)
-        except (ValueError, TypeError):
-            return str(left_data) < str(right_data)
+    Cells are formatted only when a view requests them. Sorting computes a new row
+    order with `np.argsort()` and never moves the data, so tables with many rows open
+    and sort without delay. The vertical header shows the original row numbers
+    (starting at 1).
+
+    Parameters
+    ----------
+    columns : list of ArrayColumn
+        The columns, all with the same number of rows.
+    parent : QObject | None
+        The parent object.
+    """
+
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self._order = np.arange(len(columns[0].values) if columns else 0)
+
+    def source_row(self, row):
+        """Return the original row (the index into the arrays) of a displayed row."""
+        return int(self._order[row])
+
+    def rowCount(self, parent=None):
+        return 0 if parent is not None and parent.isValid() else len(self._order)
+
+    def columnCount(self, parent=None):
+        return 0 if parent is not None and parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        column = self.columns[index.column()]
+        value = column.values[self._order[index.row()]]
+        if role == Qt.ItemDataRole.DisplayRole:
+            if column.checkable:
+                return None
+            if callable(column.fmt):
+                return column.fmt(value)
+            return format(value, column.fmt)
+        if role == Qt.ItemDataRole.UserRole:
+            return value.item() if isinstance(value, np.generic) else value
+        if role == Qt.ItemDataRole.CheckStateRole and column.checkable:
+            return Qt.CheckState.Checked if value else Qt.CheckState.Unchecked
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            return _ALIGNMENTS[column.align] | Qt.AlignmentFlag.AlignVCenter
+        if role == Qt.ItemDataRole.BackgroundRole and column.background:
+            return column.background(value)
+        if role == Qt.ItemDataRole.ForegroundRole and column.foreground:
+            return column.foreground(value)
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        column = self.columns[index.column()] if index.isValid() else None
+        if column is None or not column.checkable:
+            return False
+        if role != Qt.ItemDataRole.CheckStateRole:
+            return False
+        column.values[self._order[index.row()]] = (
+            Qt.CheckState(value) == Qt.CheckState.Checked
+        )
+        self.dataChanged.emit(index, index, [role])
+        return True
+
+    def flags(self, index):
+        flags = Qt.ItemFlag.ItemIsEnabled | Qt.ItemFlag.ItemIsSelectable
+        if index.isValid() and self.columns[index.column()].checkable:
+            flags |= Qt.ItemFlag.ItemIsUserCheckable
+        return flags
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Vertical:
+            if role == Qt.ItemDataRole.DisplayRole:
+                return int(self._order[section]) + 1
+            return None
+        if role == Qt.ItemDataRole.DisplayRole:
+            return self.columns[section].name
+        if role == Qt.ItemDataRole.TextAlignmentRole:
+            align = self.columns[section].align
+            return _ALIGNMENTS[align] | Qt.AlignmentFlag.AlignVCenter
+        return None
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        keys = self.columns[column].values
+        if order == Qt.SortOrder.AscendingOrder:
+            new_order = np.argsort(keys, kind="stable")
+        else:  # keep rows with equal keys in their original order
+            new_order = len(keys) - 1 - np.argsort(keys[::-1], kind="stable")[::-1]
+        self.layoutAboutToBeChanged.emit()
+        persistent = self.persistentIndexList()
+        rows = [self._order[index.row()] for index in persistent]
+        self._order = new_order
+        position = np.empty_like(new_order)
+        position[new_order] = np.arange(len(new_order))
+        self.changePersistentIndexList(
+            persistent,
+            [
+                self.index(int(position[row]), index.column())
+                for row, index in zip(rows, persistent)
+            ],
+        )
+        self.layoutChanged.emit()
+
+    def column_changed(self, column):
+        """Notify views that the values of a column have been changed directly.
+
+        Parameters
+        ----------
+        column : int
+            The column.
+        """
+        self.dataChanged.emit(
+            self.index(0, column), self.index(self.rowCount() - 1, column)
+        )
 
 
 class CheckBoxDelegate(QStyledItemDelegate):
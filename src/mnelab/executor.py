@@ -0,0 +1,279 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import mmap
+import multiprocessing as mp
+import sys
+from contextlib import nullcontext, suppress
+from functools import partial
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from queue import Empty
+
+import numpy as np
+from mne.epochs import BaseEpochs
+from mne.io import BaseRaw
+
+from mnelab.utils import have, without_samples
+
+_progress = None  # progress queue of the current worker process
+_attached = []  # shared memory segments attached by the current job
+
+
+def _init_worker(queue):
+    global _progress
+    _progress = queue
+
+
+def _run(func, args, kwds):
+    if have["joblib"]:
+        from joblib import parallel_config
+
+        # workers are daemonic and cannot start processes, so use threads for n_jobs
+        context = parallel_config(backend="threading")
+    else:
+        context = nullcontext()
+    try:
+        with context:
+            return func(*args, **kwds)
+    finally:
+        while _attached:
+            shm = _attached.pop()
+            # segments still referenced by the result are closed when collected
+            with suppress(BufferError):
+                shm.close()
+
+
+def _attach(name, shape, dtype, shell):
+    """Rebuild a Raw or Epochs object around a shared memory segment."""
+    if sys.version_info >= (3, 13):
+        shm = SharedMemory(name, track=False)
+    else:
+        # the segment is owned by the main process, which shares its resource tracker
+        # with the workers, so registering it again does not change anything
+        shm = SharedMemory(name)
+    _attached.append(shm)
+    shell._data = np.ndarray(shape, dtype, buffer=shm.buf)
+    return shell
+
+
+def _map(filename, offset, shape, dtype, order, shell):
+    """Rebuild a Raw or Epochs object around a mapping of its sample file."""
+    # copy-on-write, so changes made by the worker do not end up in the file
+    shell._data = np.memmap(filename, dtype, "c", offset, shape, order)
+    return shell
+
+
+class MappedData:
+    """Send a memory-mapped Raw or Epochs object to a worker without its samples.
+
+    When pickled, only the location of the samples in their file and the remaining
+    attributes are sent, and the worker maps the same file again. Changes made by the
+    main process are visible to the worker, because both map the file as shared.
+
+    Parameters
+    ----------
+    inst : mne.io.Raw | mne.Epochs
+        The object to share. Its samples must be a memory-mapped file (see
+        `_is_file_mapping()`).
+    """
+
+    def __init__(self, inst):
+        data = inst._data
+        order = "F" if data.flags.f_contiguous and not data.flags.c_contiguous else "C"
+        self._layout = data.filename, data.offset, data.shape, data.dtype, order
+        self._shell = without_samples(inst)
+
+    def __reduce__(self):
+        return _map, (*self._layout, self._shell)
+
+
+def _is_file_mapping(data):
+    """Check if an array maps a complete file region that other processes can map."""
+    return (
+        isinstance(data, np.memmap)
+        and isinstance(data.base, mmap.mmap)  # not a view of another memmap
+        and data.filename is not None
+        and data.mode in ("r", "r+", "w+")  # changes in mode "c" are private
+    )
+
+
+class SharedData:
+    """Send a preloaded Raw or Epochs object to a worker without pickling its samples.
+
+    The samples are copied into a shared memory segment once. When pickled, only the
+    name of the segment and the remaining attributes (info, annotations, events, and
+    so on) are sent, and the worker rebuilds the object around a view of the segment.
+
+    Parameters
+    ----------
+    inst : mne.io.Raw | mne.Epochs
+        The object to share. Its data must be preloaded.
+    """
+
+    def __init__(self, inst):
+        data = inst._data
+        self._shm = SharedMemory(create=True, size=data.nbytes)
+        np.copyto(np.ndarray(data.shape, data.dtype, buffer=self._shm.buf), data)
+        self._shape = data.shape
+        self._dtype = data.dtype
+        self._shell = without_samples(inst)
+
+    def __reduce__(self):
+        return _attach, (self._shm.name, self._shape, self._dtype, self._shell)
+
+    def release(self):
+        """Free the shared memory segment."""
+        if self._shm is not None:
+            self._shm.close()
+            self._shm.unlink()
+            self._shm = None
+
+
+def _share(value):
+    if (
+        isinstance(value, (BaseRaw, BaseEpochs))
+        and value.preload
+        and value._data.nbytes > 0
+    ):
+        if _is_file_mapping(value._data):
+            return MappedData(value)
+        return SharedData(value)
+    return value
+
+
+def report_progress(done, total):
+    """Report the progress of the current job to the main process.
+
+    This function does nothing if it is not called from a `ComputeExecutor` worker, so
+    computations can call it unconditionally.
+
+    Parameters
+    ----------
+    done : int
+        Number of completed steps.
+    total : int
+        Total number of steps.
+    """
+    if _progress is not None:
+        _progress.put((done, total))
+
+
+class ComputeExecutor:
+    """Run long computations in persistent worker processes.
+
+    The worker pool is started when the first job is submitted and reused for all
+    subsequent jobs, so only the first job pays for starting the interpreter and
+    importing MNE. Jobs submitted while another job is running are queued.
+
+    Preloaded Raw and Epochs objects passed as arguments are sent through shared memory
+    (see `SharedData`), which is freed when the job has finished. Memory-mapped objects
+    are mapped again by the worker instead (see `MappedData`).
+
+    Parameters
+    ----------
+    processes : int
+        Number of worker processes.
+    """
+
+    def __init__(self, processes=1):
+        self.processes = processes
+        self._pool = None
+        self._queue = None
+        self._shared = {}  # job → shared data sent with it
+
+    def _start(self):
+        ctx = mp.get_context()
+        if sys.platform != "win32":
+            # started before the workers so that they share it (see `_attach`)
+            resource_tracker.ensure_running()
+        self._queue = ctx.Queue()
+        self._pool = ctx.Pool(
+            processes=self.processes, initializer=_init_worker, initargs=(self._queue,)
+        )
+
+    def submit(self, func, args=(), kwds=None, callback=None, error_callback=None):
+        """Submit a job.
+
+        Parameters
+        ----------
+        func : callable
+            The function to run in a worker process. It must be picklable.
+        args : tuple
+            Positional arguments passed to `func`.
+        kwds : dict | None
+            Keyword arguments passed to `func`.
+        callback : callable | None
+            Called with the result when the job has finished. Runs on a helper thread,
+            so GUI code must queue any work to the main thread.
+        error_callback : callable | None
+            Called with the exception if the job has failed. Runs on a helper thread.
+
+        Returns
+        -------
+        result : multiprocessing.pool.AsyncResult
+            The pending result.
+        """
+        if self._pool is None:
+            self._start()
+        self.progress()  # discard progress reported by previous jobs
+        args = tuple(_share(arg) for arg in args)
+        kwds = {key: _share(value) for key, value in (kwds or {}).items()}
+        shared = [
+            value for value in (*args, *kwds.values()) if isinstance(value, SharedData)
+        ]
+        job = object()
+        self._shared[job] = shared
+        return self._pool.apply_async(
+            _run,
+            (func, args, kwds),
+            callback=partial(self._finished, job, callback),
+            error_callback=partial(self._finished, job, error_callback),
+        )
+
+    def _finished(self, job, callback, result):
+        for shared in self._shared.pop(job, ()):
+            shared.release()
+        if callback is not None:
+            callback(result)
+
+    def progress(self):
+        """Return the most recent progress reported by a worker.
+
+        Returns
+        -------
+        progress : tuple of (int, int) | None
+            The number of completed steps and the total number of steps, or None if no
+            progress has been reported since the last call.
+        """
+        latest = None
+        if self._queue is not None:
+            try:
+                while True:
+                    latest = self._queue.get_nowait()
+            except Empty:
+                pass
+        return latest
+
+    def cancel(self):
+        """Cancel all running and queued jobs.
+
+        The worker processes are terminated and restarted on the next submission.
+        """
+        self.shutdown()
+
+    def shutdown(self):
+        """Terminate the worker processes."""
+        if self._pool is not None:
+            self._pool.terminate()
+            self._pool.join()
+            self._pool = None
+        while self._shared:
+            _, shared = self._shared.popitem()
+            for data in shared:
+                data.release()
+        if self._queue is not None:
+            self._queue.close()
+            self._queue.join_thread()
+            self._queue = None
@@ -4,31 +4,27 @@
 
 import json
 import logging
-import multiprocessing as mp
 import sys
 import traceback
+from concurrent.futures import CancelledError
+from contextlib import contextmanager
 from functools import partial
 from operator import itemgetter
 from pathlib import Path
 from sys import version_info
+from time import perf_counter
 from urllib.request import Request, urlopen
 
 import mne
 import numpy as np
 from mne import channel_type
-from mnextend import read_raw, split_name_ext
-from mnextend.io.bvrf import read_bvrf_header
-from mnextend.io.mat import parse_mat
-from mnextend.io.npy import parse_npy
-from mnextend.io.readers import raw_readers
-from mnextend.io.writers import epochs_writers, raw_writers
-from mnextend.io.xdf import get_xml, list_chunks, resolve_streams
 from PySide6.QtCore import (
     QEvent,
     QMetaObject,
     Qt,
     QTimer,
     QUrl,
+    Signal,
     Slot,
 )
 from PySide6.QtGui import QAction, QDesktopServices, QIcon, QKeySequence
@@ -51,6 +47,7 @@ from PySide6.QtWidgets import (
 from mnelab import IS_DEV_VERSION, __version__
 from mnelab.dialogs import *
 from mnelab.dialogs.channel_stats import ChannelStats
+from mnelab.executor import ComputeExecutor
 from mnelab.model import (
     InvalidAnnotationsError,
     InvalidBadChannelsError,
@@ -66,9 +63,11 @@ from mnelab.utils import (
     have,
     image_path,
     natural_sort,
+    run_iclabel_cached,
 )
 from mnelab.viz import (
     _calc_tfr,
+    _calc_tfr_topomaps,
     plot_erds,
     plot_erds_topomaps,
     plot_evoked,
@@ -95,6 +94,8 @@ class _MNELogHandler(logging.Handler):
 class MainWindow(QMainWindow):
     """MNELAB main window."""
 
+    dataset_reloaded = Signal(int)  # dataset ID, emitted from the I/O thread
+
     def __init__(self, model: Model):
         """Initialize MNELAB main window.
 
@@ -106,6 +107,10 @@ class MainWindow(QMainWindow):
         """
         super().__init__()
         self.model = model  # data model
+        self.executor = ComputeExecutor()  # worker process for long computations
+        self._apply_model_settings()
+        self._loading_id = None  # ID of the dataset currently being reloaded
+        self.dataset_reloaded.connect(self._select_dataset)
         self.setWindowTitle("MNELAB")
         self.setMinimumSize(600, 500)
         sys.excepthook = self._excepthook
@@ -136,8 +141,12 @@ class MainWindow(QMainWindow):
         if plot_backend not in self.plot_backends:
             plot_backend = "Matplotlib"
         mne.viz.set_browser_backend(plot_backend)
-        self.model.history.append(f'mne.viz.set_browser_backend("{plot_backend}")')
-        self.model.history.append("")
+        self.model.add_code(
+            f'mne.viz.set_browser_backend("{plot_backend}")',
+            "",
+            name="set_browser_backend",
+            interactive=True,
+        )
 
         # trigger theme setting
         QIcon.setThemeSearchPaths(
@@ -174,12 +183,7 @@ class MainWindow(QMainWindow):
         )
         file_menu.addSeparator()
         self.export_menu = file_menu.addMenu(QIcon.fromTheme("export"), "Export")
-        for ext, description in raw_writers.items():
-            action = "export_data" + ext.replace(".", "_")
-            self.all_actions[action] = self.export_menu.addAction(
-                f"{ext[1:].upper()} ({description[1]})...",
-                partial(self.export_file, model.export_data, "Export data", "*" + ext),
-            )
+        self.export_menu.aboutToShow.connect(self._populate_export_menu)
         file_menu.addSeparator()
         self.all_actions["xdf_metadata"] = file_menu.addAction(
             QIcon.fromTheme("xdf-metadata"),
@@ -589,31 +593,23 @@ class MainWindow(QMainWindow):
 
     def data_changed(self):
         # update sidebar
+        changes = self.model.take_changes()
         if len(self.model.data) > 0:
             self.sidebar_container.show()
-            # block signals during rebuild to prevent spurious currentItemChanged or
+            # block signals during the update to prevent spurious currentItemChanged or
             # itemChanged callbacks that would corrupt model.index or dataset names
             self.sidebar.blockSignals(True)
-            self.sidebar.clear()
-            id_to_item = {}
-            for dataset in self.model.data:
-                item = self.sidebar.make_item(dataset["name"], dataset["id"])
-                self.sidebar.set_dtype(item, dataset["dtype"] or "")
-                parent_id = dataset["parent_id"]
-                if parent_id is not None and parent_id in id_to_item:
-                    id_to_item[parent_id].addChild(item)
-                else:
-                    self.sidebar.addTopLevelItem(item)
-                id_to_item[dataset["id"]] = item
-            self.sidebar.expandAll()
+            if not self._update_sidebar(changes):
+                self._rebuild_sidebar()
             self.sidebar.set_badges_visible(read_settings("dtype_badges"))
-            current_id = self.model.data[self.model.index]["id"]
-            if current_id in id_to_item:
-                self.sidebar.setCurrentItem(id_to_item[current_id])
+            current_item = self.sidebar.find_item(self.model.current["id"])
+            if current_item is not None:
+                self.sidebar.setCurrentItem(current_item)
             self.sidebar.blockSignals(False)
             self.sidebar.style_items()
             self.sidebar.setFocus()
         else:
+            self.sidebar.clear()
             self.sidebar_container.hide()
 
         # update info widget
@@ -625,8 +621,19 @@ class MainWindow(QMainWindow):
 
         # update status bar
         if self.model.data:
+            self.model.cache.enforce()
+            self.model.cache.prefetch()
             mb = self.model.nbytes / 1024**2
-            self.status_label.setText(f"Total Memory: {mb:.2f} MB")
+            text = f"Total Memory: {mb:.2f} MB"
+            if disk := self.model.nbytes_on_disk:
+                text += f" ({disk / 1024**2:.2f} MB on disk)"
+            cache = self.model.cache
+            if cache.budget is not None:
+                text += (
+                    f" | Cache: {cache.hits} hits, {cache.misses} misses, "
+                    f"{cache.evictions} evictions"
+                )
+            self.status_label.setText(text)
         else:
             self.status_label.clear()
 
@@ -714,17 +721,49 @@ class MainWindow(QMainWindow):
             self.all_actions["xdf_metadata"].setEnabled(
                 enabled and self.model.current["ftype"] in ["XDF", "XDFZ", "XDF.GZ"]
             )
-            # disable unsupported exporters for epochs (all must support raw)
-            if self.model.current["dtype"] == "epochs":
-                for ext in raw_writers:
-                    action = "export_data" + ext.replace(".", "_")
-                    self.all_actions[action].setEnabled(ext in epochs_writers)
+            if self.export_menu.actions():
+                self._toggle_export_actions()
         # add to recent files
         if len(self.model) > 0:
             self._add_recent(self.model.current["fname"])
 
+    def _populate_export_menu(self):
+        """Add export actions for all supported formats when first shown."""
+        if self.export_menu.actions():
+            return
+        from mnextend.io.writers import raw_writers
+
+        for ext, description in raw_writers.items():
+            action = "export_data" + ext.replace(".", "_")
+            self.all_actions[action] = self.export_menu.addAction(
+                f"{ext[1:].upper()} ({description[1]})...",
+                partial(
+                    self.export_file, self.model.export_data, "Export data", "*" + ext
+                ),
+            )
+        self._toggle_export_actions()
+
+    def _toggle_export_actions(self):
+        """Enable export actions supported by the current data set."""
+        from mnextend.io.writers import epochs_writers, raw_writers
+
+        epochs = bool(self.model.data) and self.model.current["dtype"] == "epochs"
+        for ext in raw_writers:
+            action = "export_data" + ext.replace(".", "_")
+            # disable unsupported exporters for epochs (all must support raw)
+            self.all_actions[action].setEnabled(
+                bool(self.model.data) and (ext in epochs_writers or not epochs)
+            )
+
     def open_data(self, path=None):
         """Open raw file."""
+        from mnextend import read_raw, split_name_ext
+        from mnextend.io.bvrf import read_bvrf_header
+        from mnextend.io.mat import parse_mat
+        from mnextend.io.npy import parse_npy
+        from mnextend.io.readers import raw_readers
+        from mnextend.io.xdf import resolve_streams
+
         if path is None:
             # getOpenFileNames returns a tuple (filenames, selected_filter)
             fnames, _ = QFileDialog.getOpenFileNames(
@@ -740,11 +779,11 @@ class MainWindow(QMainWindow):
                 )
                 return
 
-            if read_settings("memory_saving") and self.model.data:
-                self.model.evict_dataset(self.model.index)
-
             self._set_last_dir(fname)
             ext = "".join(Path(fname).suffixes)
+            preload = {"preload": True, "lazy": False, "memmap": "memmap"}.get(
+                read_settings("data_loading"), True
+            )
 
             if any(ext.endswith(e) for e in (".xdf", ".xdfz", ".xdf.gz")):  # XDF
                 rows = [
@@ -773,6 +812,7 @@ class MainWindow(QMainWindow):
                         prefix_markers=dialog.prefix_markers,
                         fs_new=fs_new,
                         gap_threshold=gap_threshold,
+                        preload=preload,
                     )
             elif ext.lower() == ".mat":
                 dialog = MatDialog(self, Path(fname).name, parse_mat(fname))
@@ -782,16 +822,19 @@ class MainWindow(QMainWindow):
                         variable=dialog.name,
                         fs=dialog.fs,
                         transpose=dialog.transpose,
+                        preload=preload,
                     )
             elif ext == ".npy":
                 dialog = NpyDialog(self, parse_npy(fname))
                 if dialog.exec_():
-                    self.model.load(fname, dialog.fs, dialog.transpose)
+                    self.model.load(fname, dialog.fs, dialog.transpose, preload=preload)
             elif ext == ".vhdr":
                 dialog = BrainVisionDialog(self)
                 if dialog.exec():
                     self.model.load(
-                        fname, ignore_marker_types=dialog.ignore_marker_types
+                        fname,
+                        ignore_marker_types=dialog.ignore_marker_types,
+                        preload=preload,
                     )
             elif ext in (".bvrh", ".bvrd", ".bvrm", ".bvri"):
                 try:
@@ -814,15 +857,18 @@ class MainWindow(QMainWindow):
                                     )
                             else:
                                 self.model.load(
-                                    fname, participants=selected, split=False
+                                    fname,
+                                    participants=selected,
+                                    split=False,
+                                    preload=preload,
                                 )
                     else:  # single participant, load directly
-                        self.model.load(fname)
+                        self.model.load(fname, preload=preload)
                 except Exception as e:
                     QMessageBox.critical(self, "Error loading BVRF file", str(e))
             else:  # all other file formats
                 try:
-                    self.model.load(fname)
+                    self.model.load(fname, preload=preload)
                 except FileNotFoundError as e:
                     QMessageBox.critical(self, "File not found", str(e))
                 except ValueError as e:
@@ -844,6 +890,8 @@ class MainWindow(QMainWindow):
         )[0]
         if fname:
             self._set_last_dir(fname)
+            from mnextend.io.xdf import list_chunks
+
             chunks = list_chunks(fname)
             dialog = XDFChunksDialog(self, chunks, fname)
             dialog.exec()
@@ -1000,6 +1048,8 @@ class MainWindow(QMainWindow):
         """Show XDF metadata."""
         if fname is None:
             fname = self.model.current["fname"]
+        from mnextend.io.xdf import get_xml
+
         xml = get_xml(fname)
         dialog = XDFMetadataDialog(self, xml)
         dialog.exec()
@@ -1154,6 +1204,8 @@ class MainWindow(QMainWindow):
         # self.bads is needed to update history if bad channels are selected in the
         # interactive plot window (see also self.eventFilter)
         self.bads = self.model.current["data"].info["bads"]
+        # epochs marked as bad are dropped when the window is closed
+        self.selection = getattr(self.model.current["data"], "selection", None)
         nchan = min(
             self.model.current["data"].info["nchan"], read_settings("max_channels")
         )
@@ -1192,7 +1244,9 @@ class MainWindow(QMainWindow):
         fig = self.model.current["data"].plot(
             scalings="auto" if scalings == "auto" else None, **kwargs
         )
-        self.model.history.append(f"data.plot({', '.join(hist_parts)})")
+        self.model.add_code(
+            f"data.plot({', '.join(hist_parts)})", name="plot_data", interactive=True
+        )
         if mne.viz.get_browser_backend() == "matplotlib":
             win = fig.canvas.manager.window
             win.setWindowTitle(self.model.current["name"])
@@ -1214,21 +1268,21 @@ class MainWindow(QMainWindow):
 
         if dialog.exec():
             psd_kwds = {"fmin": dialog.fmin, "fmax": dialog.fmax}
+            if self.model.n_jobs != 1:
+                psd_kwds["n_jobs"] = self.model.n_jobs
             plot_kwds = {
                 "spatial_colors": dialog.spatial_colors,
                 "exclude": dialog.exclude,
             }
-            fig = (
-                self.model.current["data"]
-                .compute_psd(**psd_kwds)
-                .plot(show=False, **plot_kwds)
-            )
+            with self._timed("Computing the PSD"):
+                spectrum = self.model.current["data"].compute_psd(**psd_kwds)
+            fig = spectrum.plot(show=False, **plot_kwds)
             psd_kwds = ", ".join(f"{key}={value}" for key, value in psd_kwds.items())
             plot_kwds = ", ".join(
                 f"{key}={value!r}" for key, value in plot_kwds.items()
             )
             hist = f"data.compute_psd({psd_kwds}).plot({plot_kwds})"
-            self.model.history.append(hist)
+            self.model.add_code(hist, name="plot_psd", interactive=True)
             win = fig.canvas.manager.window
             win.setWindowTitle("Power spectral density")
             fig.show()
@@ -1249,7 +1303,7 @@ class MainWindow(QMainWindow):
             figs = [figs]
         # refresh UI after closing the plots to reflect changes in ICA exclusions
         for fig in figs:
-            fig.canvas.mpl_connect("close_event", lambda _: self.data_changed())
+            fig.canvas.mpl_connect("close_event", self._ica_plot_closed)
 
     def plot_ica_sources(self):
         self.model.current["ica"].plot_sources(inst=self.model.current["data"])
@@ -1270,23 +1324,35 @@ class MainWindow(QMainWindow):
             if dialog.significance_mask.isChecked():
                 alpha = dialog.alpha.value()
 
-            calc = CalcDialog(self, "Calculating ERDS maps", "Calculating ERDS maps...")
+            calc = CalcDialog(
+                self,
+                "Calculating ERDS maps",
+                "Calculating ERDS maps...",
+                progress=self.executor.progress,
+            )
 
             def callback(x):
                 QMetaObject.invokeMethod(
                     calc, "accept", Qt.ConnectionType.QueuedConnection
                 )
 
-            pool = mp.Pool(processes=1)
-            res = pool.apply_async(
-                func=_calc_tfr,
-                args=(data, freqs, baseline, times, alpha),
-                callback=callback,
-            )
-            pool.close()
+            with self._timed("Calculating ERDS maps"):
+                res = self.executor.submit(
+                    _calc_tfr,
+                    args=(data, freqs, baseline, times, alpha),
+                    kwds={
+                        "n_permutations": dialog.n_permutations,
+                        "decim": dialog.decim,
+                        "key": self._tfr_key(),
+                        "n_jobs": self.model.n_jobs,
+                    },
+                    callback=callback,
+                    error_callback=callback,
+                )
+                accepted = calc.exec()
 
-            if not calc.exec():
-                pool.terminate()
+            if not accepted:
+                self.executor.cancel()
                 print("ERDS map calculation aborted.")
             else:
                 tfr_and_masks = res.get(timeout=1)
@@ -1302,15 +1368,50 @@ class MainWindow(QMainWindow):
 
         dialog = ERDSTopomapsDialog(self, t_range, f_range, epochs.event_id)
         if dialog.exec():
-            figs = plot_erds_topomaps(
-                epochs,
-                events=[item.text() for item in dialog.events.selectedItems()],
-                freqs=np.arange(dialog.f1, dialog.f2, dialog.step),
-                baseline=(dialog.b1, dialog.b2),
-                times=[dialog.t1, dialog.t2],
+            calc = CalcDialog(
+                self, "Calculating ERDS topomaps", "Calculating ERDS topomaps..."
             )
-            for fig in figs:
-                fig.show()
+
+            def callback(x):
+                QMetaObject.invokeMethod(
+                    calc, "accept", Qt.ConnectionType.QueuedConnection
+                )
+
+            with self._timed("Calculating ERDS topomaps"):
+                res = self.executor.submit(
+                    _calc_tfr_topomaps,
+                    args=(
+                        epochs,
+                        [item.text() for item in dialog.events.selectedItems()],
+                        np.arange(dialog.f1, dialog.f2, dialog.step),
+                        (dialog.b1, dialog.b2),
+                        [dialog.t1, dialog.t2],
+                    ),
+                    kwds={
+                        "decim": dialog.decim,
+                        "key": self._tfr_key(),
+                        "n_jobs": self.model.n_jobs,
+                    },
+                    callback=callback,
+                    error_callback=callback,
+                )
+                accepted = calc.exec()
+
+            if not accepted:
+                self.executor.cancel()
+                print("ERDS topomap calculation aborted.")
+            else:
+                for fig in plot_erds_topomaps(res.get(timeout=1)):
+                    fig.show()
+
+    def _tfr_key(self):
+        """Identify the current version of the current data set for `_compute_tfr()`.
+
+        Bad channels are excluded from the TFR, and they can be changed in the data
+        browser without creating a new version.
+        """
+        current = self.model.current
+        return current["id"], current["_version"], tuple(current["data"].info["bads"])
 
     def plot_evoked(self):
         """Plot evoked potentials for individual channels."""
@@ -1414,31 +1515,36 @@ class MainWindow(QMainWindow):
                 history += f", fit_params={fit_params})"
             else:
                 history += ")"
-            self.model.history.append(history)
-
-            pool = mp.Pool(processes=1)
 
             def callback(x):
                 QMetaObject.invokeMethod(
                     calc, "accept", Qt.ConnectionType.QueuedConnection
                 )
 
-            res = pool.apply_async(
-                func=ica.fit,
+            res = self.executor.submit(
+                ica.fit,
                 args=(self.model.current["data"],),
                 kwds={"reject_by_annotation": exclude_bad_segments},
                 callback=callback,
+                error_callback=callback,
             )
-            pool.close()
 
             if not calc.exec():
-                pool.terminate()
+                self.executor.cancel()
                 print("ICA calculation aborted...")
             else:
                 self.model.current["ica"] = res.get(timeout=1)
                 self.model.current["iclabel"] = None
-                self.model.history.append(
-                    f"ica.fit(inst=raw, reject_by_annotation={exclude_bad_segments})"
+                self.model.invalidate_info("ICA")
+                self.model.add_code(
+                    history,
+                    f"ica.fit(inst=data, reject_by_annotation={exclude_bad_segments})",
+                    name="run_ica",
+                    params={
+                        "method": method,
+                        "fit_params": fit_params,
+                        "reject_by_annotation": exclude_bad_segments,
+                    },
                 )
                 self.data_changed()
 
@@ -1451,16 +1557,43 @@ class MainWindow(QMainWindow):
         """Label ICA components."""
         data = self.model.current["data"]
         ica = self.model.current["ica"]
-        probs = self.model.get_iclabels()
+        try:
+            probs = self.model.get_iclabels(run=self._run_iclabel)
+        except CancelledError:
+            print("ICLabel classification aborted.")
+            return
 
         dialog = ICLabelDialog(self, data, ica, probs, exclude=ica.exclude)
         if dialog.exec():
             exclude_indices = dialog.get_excluded_indices()
 
             ica.exclude = sorted([int(x) for x in exclude_indices])
-            self.model.history.append(f"ica.exclude = {ica.exclude}")
+            self.model.add_code(
+                f"ica.exclude = {ica.exclude}",
+                name="label_ica",
+                params={"exclude": ica.exclude},
+            )
+            self.model.invalidate_info("ICA")
             self.data_changed()
 
+    def _run_iclabel(self, data, ica):
+        """Classify independent components in the background (see `label_ica()`)."""
+        calc = CalcDialog(self, "Labeling ICs", "Classifying independent components...")
+
+        def callback(x):
+            QMetaObject.invokeMethod(calc, "accept", Qt.ConnectionType.QueuedConnection)
+
+        res = self.executor.submit(
+            run_iclabel_cached,
+            args=(data, ica),
+            callback=callback,
+            error_callback=callback,
+        )
+        if not calc.exec():
+            self.executor.cancel()
+            raise CancelledError
+        return res.get(timeout=1)
+
     def interpolate_bads(self):
         """Interpolate bad channels."""
         duplicated = self.auto_duplicate()
@@ -1484,7 +1617,8 @@ class MainWindow(QMainWindow):
         dialog = FilterDialog(self)
         if dialog.exec():
             self.auto_duplicate()
-            self.model.filter(dialog.lower, dialog.upper, dialog.notch)
+            with self._timed("Filtering"):
+                self.model.filter(dialog.lower, dialog.upper, dialog.notch)
 
     def resample_data(self):
         """Resample data."""
@@ -1492,7 +1626,8 @@ class MainWindow(QMainWindow):
         dialog = ResampleDialog(self, current_sfreq)
         if dialog.exec():
             self.auto_duplicate()
-            self.model.resample(dialog.new_sfreq)
+            with self._timed("Resampling"):
+                self.model.resample(dialog.new_sfreq)
 
     def find_events(self):
         info = self.model.current["data"].info
@@ -1552,9 +1687,10 @@ class MainWindow(QMainWindow):
                         **interval_data,
                     )
                     self.model.current["data"].set_annotations(existing + new)
+                    self.model.invalidate_info("Annotations")
                     self.data_changed()
 
-                    self.model.history.append(
+                    self.model.add_code(
                         f"annotations = annotations_between_events(\n"
                         f"    events=events,\n"
                         f'    sfreq=data.info["sfreq"],\n'
@@ -1568,7 +1704,9 @@ class MainWindow(QMainWindow):
                         f"    extend_end={interval_data['extend_end']},\n"
                         f"    orig_time=data.annotations.orig_time,\n"
                         f")\n"
-                        f"data.set_annotations(data.annotations + annotations)"
+                        f"data.set_annotations(data.annotations + annotations)",
+                        name="annotations_between_events",
+                        params=interval_data,
                     )
                 except Exception as e:
                     msgbox = ErrorMessageBox(
@@ -1643,7 +1781,7 @@ class MainWindow(QMainWindow):
             self.auto_duplicate()
             self.model.drop_detected_artifacts(bad_epochs)
             self.data_changed()
-            self.model.history.append(dialog.get_history_code())
+            self.model.add_code(dialog.get_history_code(), name="artifact_detection")
 
     def change_reference(self):
         """Change reference."""
@@ -1678,12 +1816,14 @@ class MainWindow(QMainWindow):
 
     def show_history(self):
         """Show history."""
-        dialog = HistoryDialog(self, self.model.history, self.model.log)
+        dialog = HistoryDialog(
+            self, self.model.history, self.model.log, self.model.operations
+        )
         dialog.exec()
 
     def show_channel_stats(self):
         """Show channel stats."""
-        dialog = ChannelStats(self, self.model.current["data"])
+        dialog = ChannelStats(self, self.model.get_channel_stats)
         dialog.exec_()
 
     def show_about(self):
@@ -1783,12 +1923,17 @@ class MainWindow(QMainWindow):
         old_badges = read_settings("dtype_badges")
         old_menu_icons = read_settings("menu_icons")
         SettingsDialog(self, self.plot_backends, initial_page=page).exec()
+        self._apply_model_settings()
         new_backend = read_settings("plot_backend")
         new_badges = read_settings("dtype_badges")
         new_menu_icons = read_settings("menu_icons")
         if old_backend != new_backend:
             mne.viz.set_browser_backend(new_backend)
-            self.model.history.append(f'mne.viz.set_browser_backend("{new_backend}")')
+            self.model.add_code(
+                f'mne.viz.set_browser_backend("{new_backend}")',
+                name="set_browser_backend",
+                interactive=True,
+            )
         if old_badges != new_badges:
             self.sidebar.set_badges_visible(new_badges)
         if old_menu_icons != new_menu_icons:
@@ -1798,6 +1943,97 @@ class MainWindow(QMainWindow):
                 'The "Menu icons" setting will take effect after restarting MNELAB.',
             )
 
+    def _rebuild_sidebar(self):
+        """Recreate all sidebar items from the model."""
+        self.sidebar.clear()
+        for dataset in self.model.data:
+            item = self.sidebar.make_item(dataset["name"], dataset["id"])
+            self.sidebar.set_dtype(item, dataset["dtype"] or "")
+            parent = self.sidebar.find_item(dataset["parent_id"])
+            if parent is not None:
+                parent.addChild(item)
+            else:
+                self.sidebar.addTopLevelItem(item)
+        self.sidebar.expandAll()
+
+    def _update_sidebar(self, changes):
+        """Apply model changes to the existing sidebar items.
+
+        Parameters
+        ----------
+        changes : list of tuple of (str, int)
+            Changes returned by `Model.take_changes()`.
+
+        Returns
+        -------
+        updated : bool
+            False if the changes cannot be applied incrementally and the sidebar needs
+            to be rebuilt.
+        """
+        removed = {dataset_id for kind, dataset_id in changes if kind == "removed"}
+        for kind, dataset_id in changes:
+            if kind == "moved":
+                return False
+            if kind == "removed":
+                item = self.sidebar.find_item(dataset_id)
+                if item is None:
+                    continue  # already removed together with its parent
+                for child in self.model.find_children(dataset_id):
+                    if child["id"] not in removed:
+                        return False  # orphaned children move to the top level
+                self.sidebar.take_item(dataset_id)
+                continue
+            index = self.model.find_index_by_id(dataset_id)
+            if index < 0:
+                continue  # removed later on
+            dataset = self.model.data[index]
+            if kind == "inserted":
+                item = self.sidebar.make_item(dataset["name"], dataset_id)
+                parent = self.sidebar.find_item(dataset["parent_id"])
+                siblings = [
+                    ds["id"]
+                    for ds in self.model.data[:index]
+                    if self.sidebar.find_item(ds["parent_id"]) is parent
+                    and self.sidebar.find_item(ds["id"]) is not None
+                ]
+                if parent is not None:
+                    parent.insertChild(len(siblings), item)
+                    parent.setExpanded(True)
+                else:
+                    self.sidebar.insertTopLevelItem(len(siblings), item)
+            item = self.sidebar.find_item(dataset_id)
+            if item is None:
+                return False
+            if item.text(0) != dataset["name"]:
+                item.setText(0, dataset["name"])
+            self.sidebar.set_dtype(item, dataset["dtype"] or "")
+        if self.sidebar.count_items() != len(self.model.data):
+            return False
+        current = self.sidebar.find_item(self.model.current["id"])
+        if current is not None:  # the current dataset may have been changed directly
+            current.setText(0, self.model.current["name"])
+            self.sidebar.set_dtype(current, self.model.current["dtype"] or "")
+        return current is not None
+
+    def _apply_model_settings(self):
+        """Apply the memory budget and parallel jobs settings to the model."""
+        if read_settings("memory_saving"):
+            self.model.cache.budget = read_settings("memory_budget") * 1024**2
+        else:
+            self.model.cache.budget = None
+        self.model.n_jobs = read_settings("n_jobs") if have["joblib"] else 1
+
+    @contextmanager
+    def _timed(self, operation):
+        """Show how long an operation took in the status bar."""
+        start = perf_counter()
+        yield
+        n_jobs = self.model.n_jobs
+        self.statusBar().showMessage(
+            f"{operation} took {perf_counter() - start:.2f} s "
+            f"({n_jobs} job{'s' if n_jobs > 1 else ''})"
+        )
+
     def auto_duplicate(self):
         """Automatically duplicate current data set.
 
@@ -1814,10 +2050,7 @@ class MainWindow(QMainWindow):
         """
         # if current data is stored in a file create a new data set
         if self.model.current["fname"]:
-            parent_index = self.model.index
             self.model.duplicate_data()
-            if read_settings("memory_saving"):
-                self.model.evict_dataset(parent_index)
             return True
         # otherwise ask the user
         msg = QMessageBox(self)
@@ -1842,10 +2075,7 @@ class MainWindow(QMainWindow):
         if msg.clickedButton() == overwrite_button:
             return False
         else:
-            parent_index = self.model.index
             self.model.duplicate_data()
-            if read_settings("memory_saving"):
-                self.model.evict_dataset(parent_index)
             return True
 
     def _add_recent(self, fname):
@@ -1891,14 +2121,46 @@ class MainWindow(QMainWindow):
             return
         dataset_id = item.data(0, Qt.ItemDataRole.UserRole)
         new_index = self.model.find_index_by_id(dataset_id)
-        if new_index != self.model.index:
-            if read_settings("memory_saving"):
-                self.model.evict_dataset(self.model.index)
-            if self.model.data[new_index]["data"] is None:
-                self.model.reload_dataset(new_index)
-            self.model.index = new_index
-            self.data_changed()
-            self.model.history.append(f"data = datasets[{self.model.index}]")
+        if new_index == self.model.index:
+            if self._loading_id is not None:  # switched back during a reload
+                self._loading_id = None
+                self.data_changed()
+            return
+        self._loading_id = dataset_id
+        future = self.model.prefetch_dataset(new_index)
+        if future.done():
+            self._select_dataset(dataset_id)
+            return
+        self.infowidget.setCurrentIndex(0)
+        self.infowidget.widget(0).set_loading(self.model.data[new_index]["name"])
+        for name, action in self.all_actions.items():
+            if name not in self.always_enabled:
+                action.setEnabled(False)
+        future.add_done_callback(lambda _: self.dataset_reloaded.emit(dataset_id))
+
+    @Slot(int)
+    def _select_dataset(self, dataset_id):
+        """Make a dataset current once its data is available.
+
+        Parameters
+        ----------
+        dataset_id : int
+            The dataset ID.
+        """
+        if dataset_id != self._loading_id:
+            return  # another dataset has been selected in the meantime
+        self._loading_id = None
+        index = self.model.find_index_by_id(dataset_id)
+        if index < 0:
+            return
+        self.model.cache.access(index)
+        self.model.index = index
+        self.data_changed()
+        self.model.add_code(
+            f"data = datasets[{self.model.index}]",
+            name="select_data",
+            params={"index": self.model.index},
+        )
 
     @Slot()
     def _update_recent_menu(self):
@@ -1964,10 +2226,23 @@ class MainWindow(QMainWindow):
     def _plot_closed(self, event=None):
         if self.model.current is None:
             return
+        self.model.invalidate_info("Channels", "Annotations")  # edited in the browser
         self.data_changed()
-        bads = self.model.current["data"].info["bads"]
+        data = self.model.current["data"]
+        bads = data.info["bads"]
         if self.bads != bads:
-            self.model.history.append(f'data.info["bads"] = {bads}')
+            self.model.add_code(
+                f'data.info["bads"] = {bads}', name="set_bads", params={"bads": bads}
+            )
+        if self.selection is not None and len(data) != len(self.selection):
+            dropped = np.flatnonzero(~np.isin(self.selection, data.selection))
+            self.model.record_dropped_epochs(dropped.tolist())
+
+    def _ica_plot_closed(self, event=None):
+        if self.model.current is None:
+            return
+        self.model.invalidate_info("ICA")  # components may have been (de)selected
+        self.data_changed()
 
     def event(self, event):
         if event.type() == QEvent.Type.Close:
@@ -1980,6 +2255,7 @@ class MainWindow(QMainWindow):
             if self.model.history:
                 print("\n# Command History\n")
                 print(format_code("\n".join(self.model.history)))
+            self.executor.shutdown()
             self.model.cleanup()
             event.accept()
         elif event.type() == QEvent.Type.PaletteChange:
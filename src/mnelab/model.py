@@ -2,27 +2,35 @@
 #
 # License: BSD (3-clause)
 
+import json
 import os
+import pickle
 import tempfile
-from collections import Counter, defaultdict
+from collections import Counter, OrderedDict, defaultdict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 from copy import deepcopy
+from dataclasses import asdict, dataclass, field
 from functools import wraps
+from inspect import signature
 from os.path import getsize
 from pathlib import Path
+from time import perf_counter, time
 
 import mne
 import numpy as np
-from mnextend import (
-    read_epochs,
-    read_raw,
-    run_iclabel,
-    split_name_ext,
-    write_epochs,
-    write_raw,
+from mne._fiff.pick import _picks_to_idx
+from mne.filter import _filt_update_info
+
+from mnelab.utils import (
+    Montage,
+    calculate_channel_stats,
+    count_locations,
+    design_filter,
+    filter_blockwise,
+    run_iclabel_cached,
+    without_samples,
 )
-from mnextend.io.readers import raw_readers
-
-from mnelab.utils import Montage, count_locations
 
 
 class LabelsNotFoundError(Exception):
@@ -41,19 +49,248 @@ class AddReferenceError(Exception):
     pass
 
 
-def data_changed(_func=None, *, invalidate_cache=True):
-    """Call view.data_changed() after f(), optionally invalidating cache."""
+# rows shown in the info widget, in display order
+_INFO_KEYS = (
+    "File Name",
+    "File Type",
+    "Data Type",
+    "Size on Disk",
+    "Size in Memory",
+    "Channels",
+    "Samples",
+    "Sampling Frequency",
+    "Length",
+    "Events",
+    "Annotations",
+    "Reference",
+    "Montage",
+    "ICA",
+)
+
+
+def _data_nbytes(data):
+    """Return the number of bytes of samples held in memory by `data`.
+
+    Lazily opened data (no samples read yet) and memory-mapped data (samples backed
+    by a file on disk) do not count towards memory usage.
+    """
+    if data is None or not data.preload or isinstance(data._data, np.memmap):
+        return 0
+    return data._data.nbytes
+
+
+def _buffer_key(array):
+    """Return a key identifying the memory buffer that an array (or view) uses."""
+    while isinstance(array.base, np.ndarray):
+        array = array.base
+    return id(array)
+
+
+def _samples_path(path):
+    """Return the path of the sample array belonging to a cache file."""
+    return str(Path(path).with_suffix(".npy"))
+
+
+def _unlink(path):
+    """Delete a file, ignoring files that are missing or still memory-mapped."""
+    with suppress(PermissionError):  # Windows cannot delete mapped files
+        Path(path).unlink(missing_ok=True)
+
+
+@dataclass
+class Operation:
+    """Record of an operation performed by the model (see `Model.operations`).
+
+    Attributes
+    ----------
+    name : str
+        Name of the `Model` method.
+    params : dict
+        Arguments of the method (values which cannot be stored as JSON are replaced by
+        their repr).
+    dataset_id : int | None
+        ID of the current data set after the operation.
+    start : float
+        Start time (seconds since the epoch).
+    duration : float
+        Duration in seconds.
+    memory_delta : int
+        Change of `Model.nbytes` in bytes.
+    code : list of str
+        Lines of code reproducing the operation. The history script consists of the
+        code of all operations (see `Model.history`).
+    interactive : bool
+        Whether the operation only plots or shows something. Interactive operations
+        are skipped when the operations are applied to other files (see
+        `mnelab.batch.pipeline_from_operations()`).
+    """
+
+    name: str
+    params: dict
+    dataset_id: int | None
+    start: float
+    duration: float
+    memory_delta: int
+    code: list[str] = field(default_factory=list)
+    interactive: bool = False
+
+
+# imports at the beginning of the history script
+HISTORY_HEADER = (
+    "from copy import deepcopy",
+    "import mne",
+    "from mnextend import read_epochs, read_raw, run_iclabel",
+    "from mnelab.utils import annotations_between_events",
+    "import numpy as np",
+    (
+        "from mnelab.utils import ("
+        "find_bad_epochs_amplitude,"
+        "find_bad_epochs_autoreject,"
+        "find_bad_epochs_kurtosis,"
+        "find_bad_epochs_ptp,"
+        ")"
+    ),
+    "",
+    "datasets = []",
+)
+
+
+def read_code(reader, fname, args=(), kwargs=None):
+    """Return the code which reads a file (the first line of a load operation).
+
+    Parameters
+    ----------
+    reader : {"read_raw", "read_epochs"}
+        The reader.
+    fname : str
+        Code for the file name, for example a quoted path or a variable name.
+    args : list
+        Additional positional arguments passed to the reader.
+    kwargs : dict | None
+        Additional keyword arguments passed to the reader.
+
+    Returns
+    -------
+    str
+        The code.
+    """
+    argstr = "".join(f", {v}" for v in args)
+    argstr += "".join(f", {k}={v!r}" for k, v in (kwargs or {}).items())
+    return f"data = {reader}({fname}{argstr}, preload=True)".replace("'", '"')
+
+
+def _jsonable(value):
+    """Convert a value to a JSON-compatible equivalent (or its repr)."""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [_jsonable(v) for v in value]
+    if isinstance(value, dict) and all(isinstance(key, str) for key in value):
+        return {key: _jsonable(v) for key, v in value.items()}
+    if isinstance(value, Path):
+        return str(value)
+    if callable(value) and hasattr(value, "__qualname__"):
+        return f"{value.__module__}.{value.__qualname__}"
+    return repr(value)
+
+
+def summarize_operations(operations):
+    """Summarize the time and memory spent per type of operation.
+
+    Parameters
+    ----------
+    operations : list of Operation
+        The operations.
+
+    Returns
+    -------
+    summary : list of dict
+        One entry per operation name with keys "name", "count", "total" (total duration
+        in seconds), "mean", "max", and "memory_delta" (total memory change in bytes),
+        sorted by decreasing total duration.
+    """
+    groups = defaultdict(list)
+    for operation in operations:
+        groups[operation.name].append(operation)
+    summary = [
+        {
+            "name": name,
+            "count": len(group),
+            "total": sum(op.duration for op in group),
+            "mean": sum(op.duration for op in group) / len(group),
+            "max": max(op.duration for op in group),
+            "memory_delta": sum(op.memory_delta for op in group),
+        }
+        for name, group in groups.items()
+    ]
+    return sorted(summary, key=lambda row: row["total"], reverse=True)
+
+
+def write_operations(fname, operations):
+    """Write operation records to a JSON file.
+
+    Parameters
+    ----------
+    fname : str | Path
+        The file name.
+    operations : list of Operation
+        The operations.
+    """
+    with open(fname, "w", encoding="utf-8") as f:
+        json.dump([asdict(op) for op in operations], f, indent=2)
+
+
+def read_operations(fname):
+    """Read operation records from a JSON file (see `write_operations()`).
+
+    Parameters
+    ----------
+    fname : str | Path
+        The file name.
+
+    Returns
+    -------
+    operations : list of Operation
+        The operations.
+    """
+    with open(fname, encoding="utf-8") as f:
+        return [Operation(**op) for op in json.load(f)]
+
+
+def data_changed(_func=None, *, invalidate_cache=True, info_fields=None):
+    """Call view.data_changed() after f(), optionally invalidating cache.
+
+    `info_fields` lists the fields of `Model.get_info()` that f() may change. These
+    fields are recomputed the next time `get_info()` is called. If None, all fields
+    are recomputed.
+
+    Each call is recorded in `Model.operations` (calls from within another decorated
+    method are part of the outer operation).
+    """
 
     def decorator(f):
+        parameters = signature(f)
+
         @wraps(f)
         def wrapper(self, *args, **kwargs):
             if invalidate_cache and self.current is not None:
                 self._invalidate_cache()
-            if self.view is not None:
+            bound = parameters.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            params = {k: v for k, v in bound.arguments.items() if k != "self"}
+            with self._operation(f.__name__, params):
                 result = f(self, *args, **kwargs)
+                if self.current is not None:
+                    if invalidate_cache:
+                        self.current["_version"] = (self.current["_version"] or 0) + 1
+                    if info_fields is None or info_fields:
+                        self.invalidate_info(*(info_fields or ()))
+                    self._update_size(self.current)
+                    self._notify("changed", self.current["id"])
+            if self.view is not None:
                 self.view.data_changed()
-            else:
-                result = f(self, *args, **kwargs)
             return result
 
         return wrapper
@@ -63,6 +300,120 @@ def data_changed(_func=None, *, invalidate_cache=True):
     return decorator
 
 
+class DatasetCache:
+    """Keep datasets in memory up to a byte budget and spill the rest to disk.
+
+    Datasets are tracked in least-recently-used order. When the total size of all
+    in-memory datasets exceeds the budget, the least recently used datasets are evicted
+    until the total fits again. The current dataset is never evicted.
+
+    Parameters
+    ----------
+    model : Model
+        The model whose datasets are managed.
+    budget : int | None
+        Memory budget in bytes. If None, datasets are never evicted.
+    """
+
+    def __init__(self, model, budget=None):
+        self.model = model
+        self.budget = budget
+        self.hits = 0  # dataset was in memory when accessed
+        self.misses = 0  # dataset had to be reloaded from disk when accessed
+        self.evictions = 0  # number of datasets spilled to disk
+        self._order = OrderedDict()  # dataset IDs, least recently used first
+
+    def touch(self, dataset_id):
+        """Mark a dataset as most recently used."""
+        self._order[dataset_id] = None
+        self._order.move_to_end(dataset_id)
+
+    def discard(self, dataset_id):
+        """Stop tracking a dataset."""
+        self._order.pop(dataset_id, None)
+
+    def access(self, index):
+        """Make sure the dataset at index is in memory and mark it as used.
+
+        Parameters
+        ----------
+        index : int
+            Index into `model.data`.
+        """
+        dataset = self.model.data[index]
+        if dataset["data"] is None:
+            self.misses += 1
+            self.model.reload_dataset(index)
+        else:
+            self.hits += 1
+        self.touch(dataset["id"])
+
+    def enforce(self):
+        """Evict least recently used datasets until the budget is met.
+
+        Returns
+        -------
+        evicted : list of int
+            IDs of the evicted datasets.
+        """
+        evicted = []
+        if self.budget is None or self.model.current is None:
+            return evicted
+        pinned = self.model.current["id"]
+        self.touch(pinned)
+        total = self.model.nbytes
+        if total <= self.budget:
+            return evicted
+        known = set(self._order)
+        untracked = [ds["id"] for ds in self.model.data if ds["id"] not in known]
+        for dataset_id in untracked + list(self._order):
+            if total <= self.budget:
+                break
+            if dataset_id == pinned:
+                continue
+            index = self.model.find_index_by_id(dataset_id)
+            if index < 0:
+                self.discard(dataset_id)
+                continue
+            dataset = self.model.data[index]
+            if not dataset["_nbytes"]:  # already evicted, lazy or memory-mapped
+                continue
+            if dataset["_buffer"] == self.model.current["_buffer"]:
+                continue  # samples are shared with the current dataset
+            self.model.evict_dataset(index, background=True)
+            self.evictions += 1
+            total = self.model.nbytes
+            evicted.append(dataset_id)
+        return evicted
+
+    def prefetch(self):
+        """Start reading the parent and children of the current dataset from disk.
+
+        Only evicted datasets whose cache files fit into the remaining budget are
+        prefetched, so that selecting them in the sidebar does not block on disk I/O.
+        """
+        current = self.model.current
+        if self.budget is None or current is None:
+            return
+        ids = [current["parent_id"]]
+        ids.extend(
+            ds["id"] for ds in self.model.data if ds["parent_id"] == current["id"]
+        )
+        free = self.budget - self.model.nbytes
+        for dataset_id in ids:
+            index = self.model.find_index_by_id(dataset_id)
+            if index < 0:
+                continue
+            dataset = self.model.data[index]
+            if dataset["data"] is not None or dataset["_cache_path"] is None:
+                continue
+            size = getsize(dataset["_cache_path"])
+            if size > free:
+                continue
+            free -= size
+            self.model.prefetch_dataset(index)
+
+
 class Model:
     """Data model for MNELAB."""
 
@@ -70,28 +421,22 @@ class Model:
         self.view = None  # current view
         self.data = []  # list of data sets
         self.index = -1  # index of currently active data set
+        self._positions = {}  # dataset ID → index into self.data
+        self._children = defaultdict(list)  # dataset ID → IDs of child datasets
+        self._changes = []  # (kind, dataset ID) tuples not yet consumed by the view
         self._next_id = 1  # monotonically increasing dataset ID counter
-        self._temp_files = set()  # paths of temporary .fif cache files
+        self._temp_files = set()  # paths of temporary cache files
+        self.cache = DatasetCache(self)  # budgeted in-memory dataset cache
+        self._io = None  # background thread for cache file writes and reads
+        self._pending = {}  # dataset ID → (future, data) of in-flight cache writes
+        self._prefetched = {}  # dataset ID → future of a cache file read
+        self.n_jobs = 1  # number of parallel jobs for MNE functions that support it
+        self.operations = []  # Operation records of all changes to the data sets
+        self._operation_depth = 0  # number of operations currently running
+        self._running = None  # Operation record of the outermost running operation
         self.log = []  # captured MNE log messages
-        self.history = [
-            "from copy import deepcopy",
-            "import mne",
-            "from mnextend import read_raw, run_iclabel",
-            "from mnelab.utils import annotations_between_events",
-            "import numpy as np",
-            (
-                "from mnelab.utils import ("
-                "detect_extreme_values,"
-                "detect_kurtosis,"
-                "detect_peak_to_peak,"
-                "detect_with_autoreject,"
-                ")"
-            ),
-            "",
-            "datasets = []",
-        ]
 
-    @data_changed(invalidate_cache=False)
+    @data_changed(invalidate_cache=False, info_fields=())
     def insert_data(self, dataset, parent_id=None):
         """Insert data set after current index."""
         dataset["id"] = self._next_id
@@ -99,37 +444,103 @@ class Model:
         self._next_id += 1
         self.index += 1
         self.data.insert(self.index, dataset)
-        self.history.append(f"datasets.insert({self.index}, data)")
+        self._reindex()
+        self._notify("inserted", dataset["id"])
+        self.add_code(f"datasets.insert({self.index}, data)")
 
     @data_changed(invalidate_cache=False)
     def update_data(self, dataset):
         """Update/overwrite data set at current index."""
         self.current = dataset
+        self._reindex()
 
-    @data_changed(invalidate_cache=False)
+    @data_changed(invalidate_cache=False, info_fields=())
     def remove_data(self, index=-1):
         """Remove data set at current index."""
         if index == -1:
             index = self.index
 
         self._cleanup_dataset_cache(self.data[index])
-        self.data.pop(index)
-        self.history.append(f"datasets.pop({index})")
+        self.cache.discard(self.data[index]["id"])
+        self._notify("removed", self.data.pop(index)["id"])
+        self._reindex()
+        self.add_code(f"datasets.pop({index})")
 
         if self.index >= len(self.data):  # if last entry was removed
             self.index = len(self.data) - 1  # reset index to last entry
 
-    @data_changed(invalidate_cache=False)
+    @data_changed(
+        invalidate_cache=False, info_fields=("File Name", "File Type", "Size on Disk")
+    )
     def duplicate_data(self):
-        """Duplicate current data set."""
+        """Duplicate current data set.
+
+        The sample array is not copied. Instead, it is shared between both data sets
+        and marked read-only until an operation needs to modify it in place (see
+        `_ensure_writable()`).
+        """
         parent_id = self.current["id"]
-        self.insert_data(deepcopy(self.current), parent_id=parent_id)
-        self.history[-1] = self.history[-1][:-5] + "deepcopy(data))"
-        self.history.append(f"data = datasets[{self.index}]")
+        data = self.current["data"]
+        memo = {}
+        if data.preload:
+            data._data.flags.writeable = False
+            memo[id(data._data)] = data._data
+        self.insert_data(deepcopy(self.current, memo), parent_id=parent_id)
+        code = self._running.code
+        code[-1] = code[-1][:-5] + "deepcopy(data))"
+        self.add_code(f"data = datasets[{self.index}]")
         self.current["fname"] = None
         self.current["ftype"] = None
         self.current["_cache_path"] = None  # don't share the parent's cache file
 
+    @property
+    def history(self):
+        """Return the history script as a list of lines.
+
+        The script consists of `HISTORY_HEADER` followed by the code of all operations
+        (see `operations`), including the currently running one.
+        """
+        lines = list(HISTORY_HEADER)
+        for operation in self.operations:
+            lines.extend(operation.code)
+        if self._running is not None:
+            lines.extend(self._running.code)
+        return lines
+
+    def add_code(self, *lines, name="code", params=None, interactive=False):
+        """Add code to the history.
+
+        Within an operation, the lines are added to its code. Otherwise, they are
+        recorded as a new operation, for example for steps performed by the main window
+        such as plotting or fitting ICA.
+
+        Parameters
+        ----------
+        *lines : str
+            The lines of code.
+        name : str
+            Name of the new operation.
+        params : dict | None
+            Parameters of the new operation.
+        interactive : bool
+            Whether the new operation only plots or shows something.
+        """
+        if self._running is not None:
+            self._running.code.extend(lines)
+            return
+        self.operations.append(
+            Operation(
+                name=name,
+                params={key: _jsonable(v) for key, v in (params or {}).items()},
+                dataset_id=self.current["id"] if self.current else None,
+                start=time(),
+                duration=0,
+                memory_delta=0,
+                code=list(lines),
+                interactive=interactive,
+            )
+        )
+
     @property
     def names(self):
         """Return list of all data set names."""
@@ -137,13 +548,33 @@ class Model:
 
     @property
     def nbytes(self):
-        """Return size (in bytes) of all data sets."""
+        """Return size (in bytes) of all data sets in memory.
+
+        Samples shared between data sets are counted once.
+        """
+        buffers = {}
+        for item in self.data:
+            if item["_nbytes"] is None:
+                self._update_size(item)
+            key = item["_buffer"]
+            buffers[key] = max(buffers.get(key, 0), item["_nbytes"])
+        return sum(buffers.values())
+
+    @property
+    def nbytes_on_disk(self):
+        """Return size (in bytes) of the samples of all evicted data sets."""
         return sum(
-            item["data"].get_data().nbytes
-            for item in self.data
-            if item["data"] is not None
+            item["_disk_nbytes"] or 0 for item in self.data if item["data"] is None
         )
 
+    def _update_size(self, dataset):
+        """Update the tracked in-memory size of a data set."""
+        dataset["_nbytes"] = _data_nbytes(dataset["data"])
+        if dataset["_nbytes"]:
+            dataset["_buffer"] = _buffer_key(dataset["data"]._data)
+        else:
+            dataset["_buffer"] = None
+
     @property
     def current(self):
         """Return current data set."""
@@ -159,47 +590,108 @@ class Model:
         """Return number of data sets."""
         return len(self.data)
 
+    def _reindex(self):
+        """Rebuild the lookup tables from dataset IDs to indices and children."""
+        self._positions = {ds["id"]: i for i, ds in enumerate(self.data)}
+        self._children = defaultdict(list)
+        for ds in self.data:
+            if ds["parent_id"] is not None:
+                self._children[ds["parent_id"]].append(ds["id"])
+
+    def _notify(self, kind, dataset_id):
+        """Record a change for the view.
+
+        Parameters
+        ----------
+        kind : {"inserted", "removed", "changed", "moved"}
+            The kind of change.
+        dataset_id : int
+            The ID of the affected dataset.
+        """
+        if self.view is not None:
+            self._changes.append((kind, dataset_id))
+
+    def take_changes(self):
+        """Return and clear the changes recorded since the last call.
+
+        Returns
+        -------
+        changes : list of tuple of (str, int)
+            The kind of change and the affected dataset ID, in chronological order.
+        """
+        changes, self._changes = self._changes, []
+        return changes
+
+    @contextmanager
+    def _operation(self, name, params):
+        """Record the operation performed in this context in `self.operations`."""
+        self._operation_depth += 1
+        try:
+            if self._operation_depth > 1:  # part of an enclosing operation
+                yield
+                return
+            start, nbytes = perf_counter(), self.nbytes
+            self._running = Operation(
+                name=name,
+                params={key: _jsonable(value) for key, value in params.items()},
+                dataset_id=None,
+                start=time(),
+                duration=0,
+                memory_delta=0,
+            )
+            yield
+            operation = self._running
+            operation.dataset_id = self.current["id"] if self.current else None
+            operation.duration = perf_counter() - start
+            operation.memory_delta = self.nbytes - nbytes
+            self.operations.append(operation)
+        finally:
+            self._operation_depth -= 1
+            if not self._operation_depth:
+                self._running = None  # code of failed operations is discarded
+
     def find_index_by_id(self, dataset_id):
         """Return the list index of the dataset with the given stable ID."""
-        for i, dataset in enumerate(self.data):
-            if dataset["id"] == dataset_id:
-                return i
-        return -1
+        index = self._positions.get(dataset_id, -1)
+        if index < 0 or index >= len(self.data) or self.data[index]["id"] != dataset_id:
+            self._reindex()  # self.data has been modified directly
+            index = self._positions.get(dataset_id, -1)
+        return index
+
+    def find_children(self, dataset_id):
+        """Return all datasets that are direct children of dataset_id."""
+        return [self.data[self.find_index_by_id(i)] for i in self._children[dataset_id]]
 
     def find_descendants(self, dataset_id):
         """Return all datasets that are direct or indirect children of dataset_id."""
         descendants = []
-        queue = [dataset_id]
+        queue = deque([dataset_id])
         while queue:
-            cur = queue.pop(0)
-            for ds in self.data:
-                if ds["parent_id"] == cur:
-                    descendants.append(ds)
-                    queue.append(ds["id"])
+            for ds in self.find_children(queue.popleft()):
+                descendants.append(ds)
+                queue.append(ds["id"])
         return descendants
 
-    @data_changed(invalidate_cache=False)
+    @data_changed(invalidate_cache=False, info_fields=())
     def remove_data_cascade(self, dataset_id):
         """Remove a dataset and all its descendants."""
-        ids_to_remove = set()
-        queue = [dataset_id]
-        while queue:
-            cur = queue.pop(0)
-            ids_to_remove.add(cur)
-            queue.extend(ds["id"] for ds in self.data if ds["parent_id"] == cur)
+        ids_to_remove = {dataset_id}
+        ids_to_remove.update(ds["id"] for ds in self.find_descendants(dataset_id))
         # remove from highest index to lowest to keep earlier indices valid
         indices = sorted(
-            [i for i, ds in enumerate(self.data) if ds["id"] in ids_to_remove],
+            (self.find_index_by_id(i) for i in ids_to_remove),
             reverse=True,
         )
         for i in indices:
             self._cleanup_dataset_cache(self.data[i])
-            self.data.pop(i)
-            self.history.append(f"datasets.pop({i})")
+            self.cache.discard(self.data[i]["id"])
+            self._notify("removed", self.data.pop(i)["id"])
+            self.add_code(f"datasets.pop({i})")
+        self._reindex()
         if self.index >= len(self.data):
             self.index = len(self.data) - 1
 
-    @data_changed(invalidate_cache=False)
+    @data_changed(invalidate_cache=False, info_fields=())
     def load_data(self, data, fname, name=None):
         """Load a Raw or Epochs object as a new dataset.
 
@@ -212,6 +704,9 @@ class Model:
         name : str, optional
             Custom name for the dataset. If None, uses the filename.
         """
+        from mnextend import split_name_ext
+        from mnextend.io.readers import raw_readers
+
         fname = str(Path(fname).resolve().as_posix())
         fsize = getsize(fname) / 1024**2  # convert to MB
         if name is None:
@@ -249,37 +744,60 @@ class Model:
             )
         )
 
-    @data_changed(invalidate_cache=False)
-    def load(self, fname, *args, **kwargs):
-        """Load data set from file."""
+    @data_changed(invalidate_cache=False, info_fields=())
+    def load(self, fname, *args, preload=True, **kwargs):
+        """Load data set from file.
+
+        Parameters
+        ----------
+        fname : str
+            The file path.
+        *args
+            Additional positional arguments passed to the reader.
+        preload : bool | "memmap"
+            If True, read all samples into memory. If False, only read the header and
+            defer reading samples until an operation needs them. If "memmap", store the
+            samples in a memory-mapped temporary file. Readers that do not support
+            deferred loading always read all samples into memory (and the temporary
+            file is removed), and epochs are loaded on demand instead of memory-mapped.
+        **kwargs
+            Additional keyword arguments passed to the reader.
+        """
+        # mnextend imports all readers and ICLabel, so only load it when needed
+        from mnextend import read_epochs, read_raw, split_name_ext
+        from mnextend.io.readers import raw_readers
+
         fname = str(Path(fname).resolve().as_posix())
+        if preload == "memmap":
+            fd, path = tempfile.mkstemp(suffix=".dat", prefix="mnelab_")
+            os.close(fd)
+            self._temp_files.add(path)
+            raw_preload = path
+        else:
+            raw_preload = preload
         try:
-            data = read_raw(fname, *args, **kwargs, preload=True)
+            data = read_raw(fname, *args, **kwargs, preload=raw_preload)
         except ValueError as e:
             try:
-                data = read_epochs(fname, *args, **kwargs, preload=True)
+                data = read_epochs(fname, *args, **kwargs, preload=preload is True)
             except ValueError:
                 raise e
-            self.history.append(
-                f'data = read_epochs("{fname}", preload=True)'.replace("'", '"')
-            )
+            reader = "read_epochs"
         else:
-            argstr = ", " + f"{', '.join(f'{v}' for v in args)}" if args else ""
-            if kwargs:
-                kwargstr = (
-                    ", " + f"{', '.join(f'{k}={v!r}' for k, v in kwargs.items())}"
-                )
-            else:
-                kwargstr = ""
-            self.history.append(
-                f'data = read_raw("{fname}"{argstr}{kwargstr}, preload=True)'.replace(
-                    "'", '"'
-                )
-            )
+            reader = "read_raw"
+        # the reader is needed to read other files in the same way (see mnelab.batch)
+        self._running.params["reader"] = reader
+        self.add_code(read_code(reader, f'"{fname}"', args, kwargs))
+        if preload == "memmap":
+            samples = getattr(data, "_data", None)
+            if not (isinstance(samples, np.memmap) and samples.filename == path):
+                # the reader does not support memory-mapping and read into memory
+                self._temp_files.discard(path)
+                Path(path).unlink(missing_ok=True)
         name, _ = split_name_ext(fname, raw_readers)
         self.load_data(data, fname, name=name)
 
-    @data_changed
+    @data_changed(info_fields=("Events",))
     def find_events(
         self,
         stim_channel,
@@ -314,9 +832,9 @@ class Model:
             if shortest_event != 2:
                 hist += f", shortest_event={shortest_event!r}"
             hist += ")"
-            self.history.append(hist)
+            self.add_code(hist)
 
-    @data_changed
+    @data_changed(info_fields=("Events",))
     def events_from_annotations(self):
         """Convert annotations to events."""
         events, mapping = mne.events_from_annotations(self.current["data"])
@@ -325,9 +843,9 @@ class Model:
             mapping = {v: k for k, v in mapping.items()}
             self.current["events"] = events
             self.current["event_mapping"] = mapping
-            self.history.append("events, _ = mne.events_from_annotations(data)")
+            self.add_code("events, _ = mne.events_from_annotations(data)")
 
-    @data_changed
+    @data_changed(info_fields=("Annotations",))
     def annotations_from_events(self):
         """Convert events to annotations."""
         unique_events = {
@@ -357,10 +875,12 @@ class Model:
                 hist += f", event_desc={mapping}"
             hist += ")\n"
             hist += "data.set_annotations(data.annotations + annots)"
-            self.history.append(hist)
+            self.add_code(hist)
 
     def export_data(self, fname):
         """Export data to file."""
+        from mnextend import write_epochs, write_raw
+
         if isinstance(self.current["data"], mne.BaseEpochs):
             write_epochs(fname, self.current["data"])
         else:
@@ -407,7 +927,7 @@ class Model:
         """Export ICA solution to file."""
         self.current["ica"].save(fname, overwrite=True)
 
-    @data_changed
+    @data_changed(info_fields=("Channels",))
     def import_bads(self, fname):
         """Import bad channels info from a CSV file."""
         try:
@@ -441,7 +961,7 @@ class Model:
             )
         self.current["data"].info["bads"] = bads
 
-    @data_changed
+    @data_changed(info_fields=("Events",))
     def import_events(self, fname):
         """Import events from a CSV or FIF file."""
         if fname.lower().endswith(".csv"):
@@ -463,7 +983,7 @@ class Model:
         else:
             raise ValueError(f"Unsupported event file: {fname}")
 
-    @data_changed
+    @data_changed(info_fields=("Annotations",))
     def import_annotations(self, fname, types=None, description=None, unit="seconds"):
         """Import annotations from a CSV file.
 
@@ -536,16 +1056,19 @@ class Model:
         new = mne.Annotations(onsets, durations, descs, orig_time=existing.orig_time)
         self.current["data"].set_annotations(existing + new)
 
-    @data_changed
+    @data_changed(info_fields=("ICA",))
     def import_ica(self, fname):
         """Import ICA solution from file."""
         self.current["ica"] = mne.preprocessing.read_ica(fname)
         self.current["iclabel"] = None
-        self.history.append(f"ica = mne.preprocessing.read_ica({fname!r})")
+        self.add_code(f"ica = mne.preprocessing.read_ica({fname!r})")
 
     def get_info(self):
         """Get basic information on current data set.
 
+        Fields are computed once per data set and cached until an operation
+        invalidates them (see `invalidate_info()`).
+
         Returns
         -------
         info : dict
@@ -553,16 +1076,79 @@ class Model:
         """
         if self.current["data"] is None:
             self.reload_dataset(self.index)
-        data = self.current["data"]
+        memo = self.current["_info"]
+        if memo is None:
+            memo = self.current["_info"] = {}
+        for keys, compute in (
+            (("File Name", "File Type", "Size on Disk"), self._info_file),
+            (("Data Type",), self._info_dtype),
+            (("Channels",), self._info_channels),
+            (("Samples", "Sampling Frequency", "Length"), self._info_times),
+            (("Events",), self._info_events),
+            (("Annotations",), self._info_annotations),
+            (("Reference",), self._info_reference),
+            (("Montage",), self._info_montage),
+            (("ICA",), self._info_ica),
+        ):
+            if any(key not in memo for key in keys):
+                memo.update(compute())
+        memo["Size in Memory"] = self._info_size_in_memory()
+        return {key: memo[key] for key in _INFO_KEYS}
+
+    def invalidate_info(self, *fields):
+        """Mark fields of `get_info()` for the current data set as outdated.
+
+        Parameters
+        ----------
+        *fields : str
+            The fields to recompute. If no fields are given, all fields are recomputed.
+        """
+        memo = self.current["_info"]
+        if memo is None:
+            return
+        if not fields:
+            memo.clear()
+        for key in fields:
+            memo.pop(key, None)
+
+    def _info_file(self):
         fname = self.current["fname"]
         ftype = self.current["ftype"]
         fsize = self.current["fsize"]
-        dtype = self.current["dtype"].capitalize()
-        reference = self.current["reference"]
-        events = self.current["events"]
-        montage = self.current["montage"]
-        ica = self.current["ica"]
+        return {
+            "File Name": fname if fname else "–",
+            "File Type": ftype.removesuffix(".GZ") if ftype else "–",
+            "Size on Disk": f"{fsize:.2f}\u2009MB" if fname else "–",
+        }
+
+    def _info_dtype(self):
+        return {"Data Type": self.current["dtype"].capitalize()}
 
+    def _info_size_in_memory(self):
+        data = self.current["data"]
+        if not data.preload:
+            return "not loaded"
+        if isinstance(data._data, np.memmap):
+            return "memory-mapped"
+        if self.current["_nbytes"] is None:
+            self._update_size(self.current)
+        return f"{self.current['_nbytes'] / 1024**2:.2f}\u2009MB"
+
+    def _info_channels(self):
+        info = self.current["data"].info
+        if info["bads"]:
+            nbads = len(info["bads"])
+            nchan = f"{info['nchan']} ({nbads} bad)"
+        else:
+            nchan = info["nchan"]
+        chans = Counter(info.get_channel_types())
+        # sort by channel type (always move "stim" to end of list)
+        chans = sorted(dict(chans).items(), key=lambda x: (x[0] == "stim", x[0]))
+        chans = ", ".join([" ".join([str(v), k.upper()]) for k, v in chans])
+        return {"Channels": f"{nchan} (" + chans + ")"}
+
+    def _info_times(self):
+        data = self.current["data"]
         fs = data.info["sfreq"]
         n_samples = len(data.times)
         samples = f"{n_samples:,}".replace(",", "\u2009")
@@ -579,49 +1165,62 @@ class Model:
             length = f"{seconds:.3g}\u2009s"
 
         if self.current["dtype"] == "epochs":  # add epoch count
-            length = f"{self.current['data'].events.shape[0]} x {length}"
-            samples = f"{self.current['data'].events.shape[0]} x {samples}"
-
-        if data.info["bads"]:
-            nbads = len(data.info["bads"])
-            nchan = f"{data.info['nchan']} ({nbads} bad)"
-        else:
-            nchan = data.info["nchan"]
-        chans = Counter(
-            [mne.channel_type(data.info, i) for i in range(data.info["nchan"])]
-        )
-        # sort by channel type (always move "stim" to end of list)
-        chans = sorted(dict(chans).items(), key=lambda x: (x[0] == "stim", x[0]))
-        chans = ", ".join([" ".join([str(v), k.upper()]) for k, v in chans])
+            length = f"{data.events.shape[0]} x {length}"
+            samples = f"{data.events.shape[0]} x {samples}"
+        return {
+            "Samples": samples,
+            "Sampling Frequency": f"{fs:.6g}\u2009Hz",
+            "Length": length,
+        }
 
+    def _info_events(self):
+        events = self.current["events"]
         if events is not None and events.shape[0] > 0:
             unique, counts = np.unique(events[:, 2], return_counts=True)
-            events = f"{events.shape[0]} ("
+            text = f"{events.shape[0]} ("
             if len(unique) < 8:
-                events += ", ".join([f"{u}: {c}" for u, c in zip(unique, counts)])
+                text += ", ".join([f"{u}: {c}" for u, c in zip(unique, counts)])
             elif 8 <= len(unique) <= 12:
-                events += ", ".join([f"{u}" for u in unique])
+                text += ", ".join([f"{u}" for u in unique])
             else:
                 first = ", ".join([f"{u}" for u in unique[:6]])
                 last = ", ".join([f"{u}" for u in unique[-6:]])
-                events += f"{first}, ..., {last}"
-            events += ")"
+                text += f"{first}, ..., {last}"
+            text += ")"
         else:
-            events = "–"
+            text = "–"
+        return {"Events": text}
 
+    def _info_annotations(self):
+        data = self.current["data"]
+        if hasattr(data, "annotations") and data.annotations is not None:
+            annots = len(data.annotations.description)
+            if annots == 0:
+                annots = "–"
+        else:
+            annots = "–"
+        return {"Annotations": annots}
+
+    def _info_reference(self):
+        reference = self.current["reference"]
         if isinstance(reference, list):
             reference = ",".join(reference)
+        return {"Reference": reference if reference else "–"}
 
-        locations = count_locations(self.current["data"].info)
-
+    def _info_montage(self):
+        info = self.current["data"].info
+        montage = self.current["montage"]
+        locations = count_locations(info)
         if montage is None and not locations:
             montage_text = "–"
         elif montage is None and locations:
-            montage_text = f"custom ({locations}/{data.info['nchan']} locations)"
+            montage_text = f"custom ({locations}/{info['nchan']} locations)"
         else:
-            montage_text = (
-                f"{montage.name} ({locations}/{data.info['nchan']} locations)"
-            )
+            montage_text = f"{montage.name} ({locations}/{info['nchan']} locations)"
+        return {"Montage": montage_text}
+
+    def _info_ica(self):
+        ica = self.current["ica"]
         if ica is not None:
             method = ica.method.title()
             if method == "Fastica":
@@ -630,60 +1229,66 @@ class Model:
             ica = f"{method} ({n_active}/{ica.n_components_} components)"
         else:
             ica = "–"
+        return {"ICA": ica}
 
-        size_disk = f"{fsize:.2f}\u2009MB" if fname else "–"
+    def get_channel_stats(self, exact=False):
+        """Get summary statistics of each channel of the current data set.
 
-        if hasattr(data, "annotations") and data.annotations is not None:
-            annots = len(data.annotations.description)
-            if annots == 0:
-                annots = "–"
-        else:
-            annots = "–"
-        return {
-            "File Name": fname if fname else "–",
-            "File Type": ftype.removesuffix(".GZ") if ftype else "–",
-            "Data Type": dtype,
-            "Size on Disk": size_disk,
-            "Size in Memory": f"{data.get_data().nbytes / 1024**2:.2f}\u2009MB",
-            "Channels": f"{nchan} (" + chans + ")",
-            "Samples": samples,
-            "Sampling Frequency": f"{fs:.6g}\u2009Hz",
-            "Length": length,
-            "Events": events,
-            "Annotations": annots,
-            "Reference": reference if reference else "–",
-            "Montage": montage_text,
-            "ICA": ica,
-        }
+        Statistics are computed once per version of the data set (see
+        `calculate_channel_stats()`), so they are available immediately until an
+        operation changes the data.
 
-    @data_changed
+        Parameters
+        ----------
+        exact : bool
+            Compute exact quartiles instead of estimating them.
+
+        Returns
+        -------
+        cols : dict
+            The statistics of each channel.
+        nchan : int
+            Number of channels.
+        """
+        memo = self.current["_channel_stats"]
+        if memo is None or memo["version"] != self.current["_version"]:
+            memo = self.current["_channel_stats"] = {
+                "version": self.current["_version"]
+            }
+        if exact not in memo:
+            if self.current["data"] is None:
+                self.reload_dataset(self.index)
+            memo[exact] = calculate_channel_stats(self.current["data"], exact=exact)
+        return memo[exact]
+
+    @data_changed(info_fields=("Channels", "Montage"))
     def pick_channels(self, picks):
         self.current["data"] = self.current["data"].pick(picks)
         self.current["name"] += " (channels picked)"
-        self.history.append(f"data.pick({picks})")
+        self.add_code(f"data.pick({picks})")
 
-    @data_changed
+    @data_changed(info_fields=("Channels", "Montage"))
     def set_channel_properties(self, bads=None, names=None, types=None):
         if bads != self.current["data"].info["bads"]:
             self.current["data"].info["bads"] = bads
-            self.history.append(f"data.info['bads'] = {bads}")
+            self.add_code(f"data.info['bads'] = {bads}")
         if names:
             mne.rename_channels(self.current["data"].info, names)
-            self.history.append(f"mne.rename_channels(data.info, {names})")
+            self.add_code(f"mne.rename_channels(data.info, {names})")
         if types:
             self.current["data"].set_channel_types(types)
-            self.history.append(f"data.set_channel_types({types})")
+            self.add_code(f"data.set_channel_types({types})")
 
-    @data_changed
+    @data_changed(info_fields=("Channels", "Montage"))
     def rename_channels(self, new_names):
         old_names = self.current["data"].info["ch_names"]
         mapping = {o: n for o, n in zip(old_names, new_names) if o != n}
         if not mapping:
             return
         mne.rename_channels(self.current["data"].info, mapping)
-        self.history.append(f"mne.rename_channels(data.info, {mapping})")
+        self.add_code(f"mne.rename_channels(data.info, {mapping})")
 
-    @data_changed
+    @data_changed(info_fields=("Montage",))
     def set_montage(
         self,
         montage,
@@ -706,53 +1311,107 @@ class Model:
                 on_missing="ignore",
             )
         if montage is None:
-            self.history.append("data.set_montage(None)")
+            self.add_code("data.set_montage(None)")
         elif not montage.embedded:
             if montage.path is not None:
-                self.history.append(
-                    f"montage = mne.read_custom_montage('{montage.path}')"
-                )
+                self.add_code(f"montage = mne.read_custom_montage('{montage.path}')")
             else:
-                self.history.append(
+                self.add_code(
                     f"montage = mne.channels.make_standard_montage('{montage.name}')"
                 )
-            self.history.append(
+            self.add_code(
                 f"data.set_montage(montage, match_case={match_case}, "
                 f"match_alias={match_alias}, on_missing={on_missing!r})"
             )
             self.current["iclabel"] = None
 
-    @data_changed
+    @data_changed(info_fields=())
     def filter(self, lower=None, upper=None, notch=None):
-        """Apply filters to the current data based on provided parameters."""
+        """Apply filters to the current data based on provided parameters.
+
+        Memory-mapped raw data is filtered out of core in blocks (see
+        `filter_blockwise()`), so memory usage does not grow with the length of the
+        recording. The result is the same as filtering in memory.
+        """
+        if not self._filter_blockwise(lower, upper, notch):
+            self._ensure_loaded()
+            self._ensure_writable()
+            if lower is not None or upper is not None:
+                self.current["data"].filter(lower, upper, n_jobs=self.n_jobs)
+            elif notch is not None:
+                self.current["data"].notch_filter(notch, n_jobs=self.n_jobs)
+        n_jobs = self._n_jobs_arg()
         if lower is not None and upper is not None:  # bandpass filter
-            self.current["data"].filter(lower, upper)
             self.current["name"] += f" ({lower}-{upper}\u2009Hz)"
-            self.history.append(f"data.filter({lower}, {upper})")
+            self.add_code(f"data.filter({lower}, {upper}{n_jobs})")
         elif lower is not None:  # highpass filter
-            self.current["data"].filter(lower, None)
             self.current["name"] += f" (>{lower}\u2009Hz)"
-            self.history.append(f"data.filter({lower}, None)")
+            self.add_code(f"data.filter({lower}, None{n_jobs})")
         elif upper is not None:  # lowpass filter
-            self.current["data"].filter(None, upper)
             self.current["name"] += f" (<{upper}\u2009Hz)"
-            self.history.append(f"data.filter(None, {upper})")
+            self.add_code(f"data.filter(None, {upper}{n_jobs})")
         elif notch is not None:  # notch filter
-            self.current["data"].notch_filter(notch)
             self.current["name"] += f" (notch {notch}\u2009Hz)"
-            self.history.append(f"data.notch_filter({notch})")
+            self.add_code(f"data.notch_filter({notch}{n_jobs})")
 
-    @data_changed
+    def _n_jobs_arg(self):
+        """Return the n_jobs argument for the history (empty for a single job)."""
+        return f", n_jobs={self.n_jobs}" if self.n_jobs != 1 else ""
+
+    def _filter_blockwise(self, lower, upper, notch):
+        """Filter memory-mapped raw data block by block.
+
+        Returns
+        -------
+        filtered : bool
+            False if the data cannot be filtered out of core (it is not memory-mapped,
+            it is too short, or it consists of several segments separated by "edge" or
+            "bad_acq_skip" annotations).
+        """
+        if lower is not None or upper is not None:
+            notch = None  # same precedence as in filter()
+        elif notch is None:
+            return False
+        data = self.current["data"]
+        if (
+            self.current["dtype"] != "raw"
+            or not data.preload
+            or not isinstance(data._data, np.memmap)
+        ):
+            return False
+        if any(
+            description.lower().startswith(("edge", "bad_acq_skip"))
+            for description in data.annotations.description
+        ):
+            return False
+        h = design_filter(data.info["sfreq"], lower, upper, notch)
+        if data.n_times <= len(h):
+            return False
+        dst = data._data
+        if not dst.flags.writeable:  # shared with a duplicate, write to a new file
+            fd, path = tempfile.mkstemp(suffix=".dat", prefix="mnelab_")
+            os.close(fd)
+            self._temp_files.add(path)
+            dst = np.memmap(path, dst.dtype, "w+", shape=dst.shape)
+        picks = _picks_to_idx(data.info, None, "data_or_ica", exclude=())
+        filter_blockwise(data._data, dst, h, picks, n_jobs=self.n_jobs)
+        data._data = dst
+        if notch is None:
+            _filt_update_info(data.info, True, lower, upper)
+        return True
+
+    @data_changed(info_fields=("Samples", "Sampling Frequency", "Length"))
     def resample(self, sfreq):
-        self.current["data"].resample(sfreq)
+        self._ensure_loaded()
+        self.current["data"].resample(sfreq, n_jobs=self.n_jobs)
         self.current["name"] += f" ({sfreq}\u2009Hz)"
-        self.history.append(f"data.resample({sfreq})")
+        self.add_code(f"data.resample({sfreq}{self._n_jobs_arg()})")
 
-    @data_changed
+    @data_changed(info_fields=("Samples", "Length", "Annotations"))
     def crop(self, start, stop):
         self.current["data"].crop(start, stop)
         self.current["name"] += " (cropped)"
-        self.history.append(f"data.crop({start}, {stop})")
+        self.add_code(f"data.crop({start}, {stop})")
 
     def get_compatibles(self):
         """Return indices and names of datasets compatible with the current one.
@@ -808,11 +1467,13 @@ class Model:
             compatibles.append((idx, d["name"]))
         return compatibles
 
-    @data_changed
+    @data_changed(info_fields=("Samples", "Length", "Annotations"))
     def append_data(self, selected_idx):
         """Append the given raw data sets."""
         for idx in selected_idx:  # ensure all source datasets are in memory
             self.reload_dataset(idx)
+            self._ensure_loaded(idx)
+        self._ensure_loaded()
         self.current["name"] += " (appended)"
         datasets = [self.current["data"]]
         indices = []
@@ -823,36 +1484,52 @@ class Model:
 
         if self.current["dtype"] == "raw":
             self.current["data"] = mne.concatenate_raws(datasets)
-            self.history.append(f"mne.concatenate_raws(data, {', '.join(indices)})")
+            self.add_code(f"mne.concatenate_raws(data, {', '.join(indices)})")
         elif self.current["dtype"] == "epochs":
             self.current["data"] = mne.concatenate_epochs(datasets)
-            self.history.append(f"mne.concatenate_epochs(data, {', '.join(indices)})")
+            self.add_code(f"mne.concatenate_epochs(data, {', '.join(indices)})")
 
-    @data_changed
+    @data_changed(info_fields=())
     def apply_ica(self):
+        self._ensure_loaded()
+        self._ensure_writable()
         self.current["ica"].apply(self.current["data"])
-        self.history.append(
-            f"ica.apply(inst=data, exclude={self.current['ica'].exclude})"
-        )
+        self.add_code(f"ica.apply(inst=data, exclude={self.current['ica'].exclude})")
         self.current["name"] += " (ICA)"
 
-    @data_changed(invalidate_cache=False)
-    def get_iclabels(self):
-        """Get ICLabel classifications for current ICA solution."""
+    @data_changed(invalidate_cache=False, info_fields=())
+    def get_iclabels(self, run=run_iclabel_cached):
+        """Get ICLabel classifications for current ICA solution.
+
+        Parameters
+        ----------
+        run : callable
+            Function that classifies the components given the data and the ICA
+            solution, for example by running `run_iclabel_cached()` in a background
+            job. If it raises an exception (for example, because the user cancelled the
+            job), no classifications are stored.
+
+        Returns
+        -------
+        numpy.ndarray, shape (n_components, n_classes)
+            The probability of each class for each component.
+        """
         if self.current["iclabel"] is None:
             if self.current["data"].get_montage() is None:
                 raise ValueError("Montage must be set before ICLabel classification.")
             if self.current["ica"] is None:
                 raise ValueError("No ICA solution found in current data set.")
-            probs = run_iclabel(self.current["data"], self.current["ica"])
+            probs = run(self.current["data"], self.current["ica"])
             self.current["iclabel"] = probs
-            self.history.append("probs = run_iclabel(data, ica)")
+            self.add_code("probs = run_iclabel(data, ica)")
         return self.current["iclabel"]
 
-    @data_changed
+    @data_changed(info_fields=("Channels",))
     def interpolate_bads(self):
+        self._ensure_loaded()
+        self._ensure_writable()
         self.current["data"].interpolate_bads()
-        self.history.append("data.interpolate_bads()")
+        self.add_code("data.interpolate_bads()")
         self.current["name"] += " (interpolated)"
 
     @data_changed
@@ -865,7 +1542,7 @@ class Model:
             baseline=baseline,
             preload=True,
         )
-        self.history.append(
+        self.add_code(
             f"data = mne.Epochs(data, events[np.isin(events[:, 2], {event_id})], "
             f"tmin={tmin}, tmax={tmax}, baseline={baseline}, preload=True)"
         )
@@ -873,23 +1550,39 @@ class Model:
         self.current["dtype"] = "epochs"
         self.current["events"] = self.current["data"].events
 
-    @data_changed
+    @data_changed(info_fields=("Samples", "Length"))
     def drop_bad_epochs(self, reject, flat):
         self.current["data"].drop_bad(reject, flat)
         self.current["name"] += " (dropped bad epochs)"
-        self.history.append(f"data.drop_bad({reject}, {flat})")
+        self.add_code(f"data.drop_bad({reject}, {flat})")
 
-    @data_changed
+    @data_changed(info_fields=("Samples", "Length"))
+    def record_dropped_epochs(self, indices):
+        """Record epochs that were dropped interactively in the data browser.
+
+        The browser drops the epochs itself, so this only marks the data set as changed
+        and adds the equivalent code to the history.
+
+        Parameters
+        ----------
+        indices : list of int
+            Indices of the dropped epochs (before dropping).
+        """
+        self.add_code(f'data.drop({indices}, reason="USER")')
+
+    @data_changed(info_fields=("Samples", "Length"))
     def drop_detected_artifacts(self, indices):
         self.current["data"].drop(indices, reason="ARTIFACT_DETECTION")
         self.current["name"] += " (dropped detected epochs)"
 
-    @data_changed
+    @data_changed(info_fields=("Channels", "Reference", "Montage"))
     def change_reference(self, add, ref):
+        self._ensure_loaded()
+        self._ensure_writable()
         self.current["reference"] = ref
         if add:
             mne.add_reference_channels(self.current["data"], add, copy=False)
-            self.history.append(f"mne.add_reference_channels(data, {add}, copy=False)")
+            self.add_code(f"mne.add_reference_channels(data, {add}, copy=False)")
         if ref is None:
             return
 
@@ -899,19 +1592,19 @@ class Model:
         else:
             self.current["name"] += " (" + ",".join(ref) + ")"
         self.current["data"].set_eeg_reference(ref)
-        self.history.append(f"data.set_eeg_reference({ref!r})")
+        self.add_code(f"data.set_eeg_reference({ref!r})")
 
-    @data_changed
+    @data_changed(info_fields=("Events",))
     def set_events(self, events):
         self.current["events"] = events
 
-    @data_changed
+    @data_changed(info_fields=("Annotations",))
     def set_annotations(self, onset, duration, description):
         self.current["data"].set_annotations(
             mne.Annotations(onset, duration, description)
         )
 
-    @data_changed(invalidate_cache=False)
+    @data_changed(invalidate_cache=False, info_fields=())
     def move_data(self, source, target):
         """
         Change the position of a single data set in `self.data`.
@@ -926,22 +1619,55 @@ class Model:
 
         # pop and save
         item = self.data.pop(source)
-        self.history.append(f"item = datasets.pop({source})")
+        self.add_code(f"item = datasets.pop({source})")
 
         # insert
         self.data.insert(target, item)
-        self.history.append(f"datasets.insert({target}, item)")
+        self._reindex()
+        self._notify("moved", item["id"])
+        self.add_code(f"datasets.insert({target}, item)")
 
         # select
         self.index = target
-        self.history.append(f"data = datasets[{target}]")
+        self.add_code(f"data = datasets[{target}]")
+
+    def _ensure_loaded(self, index=None):
+        """Read the samples of a lazily opened dataset into memory.
+
+        Parameters
+        ----------
+        index : int, optional
+            Index into `self.data`. If None, the current dataset is used.
+        """
+        dataset = self.current if index is None else self.data[index]
+        if not dataset["data"].preload:
+            dataset["data"].load_data()
+            self._update_size(dataset)
+
+    def _ensure_writable(self):
+        """Give the current dataset its own copy of samples shared with another one.
+
+        Samples are shared read-only after `duplicate_data()`. Operations that modify
+        samples in place must call this method first. Operations that replace the
+        sample array (e.g. picking channels, cropping, resampling) do not need to.
+        """
+        data = self.current["data"]
+        if data.preload and not data._data.flags.writeable:
+            data._data = data._data.copy()
 
     def _cleanup_dataset_cache(self, dataset):
-        """Delete the temp cache file for a dataset, if one exists."""
+        """Delete the temp cache files for a dataset, if they exist."""
+        future = self._prefetched.pop(dataset["id"], None)
+        if future is not None:
+            future.cancel()
+        entry = self._pending.pop(dataset["id"], None)
+        if entry is not None:
+            entry[0].result()  # the file must be closed before it can be deleted
         path = dataset["_cache_path"]
         if path:
-            Path(path).unlink(missing_ok=True)
-            self._temp_files.discard(path)
+            for cache_file in (path, _samples_path(path)):
+                _unlink(cache_file)
+                self._temp_files.discard(cache_file)
             dataset["_cache_path"] = None
 
     def _invalidate_cache(self):
@@ -952,23 +1678,81 @@ class Model:
         """
         self.current["_cache_path"] = None
 
-    def evict_dataset(self, index):
+    def _submit(self, fn, *args, **kwargs):
+        """Run fn on the background I/O thread and return its future."""
+        if self._io is None:
+            self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="mnelab-io")
+        return self._io.submit(fn, *args, **kwargs)
+
+    @staticmethod
+    def _write_cache(path, data):
+        """Write a Raw or Epochs object to a cache file.
+
+        Samples of preloaded data are stored as a plain array in a separate `.npy` file
+        so that they can be memory-mapped on reload. Everything else (info,
+        annotations, events, and so on) is pickled to `path`.
+        """
+        shell = data
+        if data.preload:
+            np.save(_samples_path(path), data._data)
+            shell = without_samples(data)
+        with open(path, "wb") as f:
+            pickle.dump(shell, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    @staticmethod
+    def _read_cache(path, load=False):
+        """Read a Raw or Epochs object from a cache file written by `_write_cache`.
+
+        Unless `load` is True, the samples are mapped copy-on-write, so pages are only
+        read from disk when accessed and modifications never touch the cache file.
+        Prefetching loads the samples, because accessing mapped pages later would read
+        them on the GUI thread.
+        """
+        with open(path, "rb") as f:
+            data = pickle.load(f)
+        if data.preload:
+            mmap_mode = None if load else "c"
+            data._data = np.asarray(np.load(_samples_path(path), mmap_mode=mmap_mode))
+        return data
+
+    def evict_dataset(self, index, background=False):
         """Remove the in-memory data for the dataset at index.
 
-        If no cache file exists yet the data is saved to a temporary FIF file first. If
+        If no cache file exists yet the data is saved to temporary cache files first. If
         a valid cache already exists (e.g. from a previous eviction cycle) the write is
         skipped.
+
+        Parameters
+        ----------
+        index : int
+            Index into `self.data`.
+        background : bool
+            If True, write the cache file on a background thread. The data stays
+            referenced until the write has finished, and reloading the dataset in the
+            meantime reuses it instead of reading the file.
         """
         dataset = self.data[index]
         if dataset["data"] is None:
             return  # already evicted
         if dataset["_cache_path"] is None:
-            suffix = "_raw.fif" if dataset["dtype"] == "raw" else "_epo.fif"
-            fd, path = tempfile.mkstemp(suffix=suffix, prefix="mnelab_")
+            fd, path = tempfile.mkstemp(suffix=".pkl", prefix="mnelab_")
             os.close(fd)
-            dataset["data"].save(path, overwrite=True)
+            if background:
+                dataset_id = dataset["id"]
+                data = dataset["data"]
+
+                def written(future):
+                    if future.exception() is None:  # otherwise keep the data
+                        self._pending.pop(dataset_id, None)
+
+                future = self._submit(self._write_cache, path, data)
+                self._pending[dataset_id] = (future, data)
+                future.add_done_callback(written)
+            else:
+                self._write_cache(path, dataset["data"])
+            dataset["_disk_nbytes"] = _data_nbytes(dataset["data"])
             dataset["_cache_path"] = path
-            self._temp_files.add(path)
+            self._temp_files.update((path, _samples_path(path)))
         # snapshot fields needed to check compatibility while evicted
         dataset["_evict_info"] = dataset["data"].info
         if dataset["dtype"] == "raw":
@@ -978,6 +1762,37 @@ class Model:
             dataset["_evict_tmax"] = dataset["data"].tmax
             dataset["_evict_baseline"] = dataset["data"].baseline
         dataset["data"] = None
+        self._update_size(dataset)
+
+    def prefetch_dataset(self, index):
+        """Start reading an evicted dataset from its cache file in the background.
+
+        A subsequent `reload_dataset(index)` uses the result of this read.
+
+        Parameters
+        ----------
+        index : int
+            Index into `self.data`.
+
+        Returns
+        -------
+        future : concurrent.futures.Future
+            Future that is done when `reload_dataset(index)` no longer needs to wait
+            for disk I/O.
+        """
+        dataset = self.data[index]
+        dataset_id = dataset["id"]
+        if dataset_id in self._pending:
+            return self._pending[dataset_id][0]
+        if dataset_id in self._prefetched:
+            return self._prefetched[dataset_id]
+        if dataset["data"] is not None or dataset["_cache_path"] is None:
+            future = Future()
+            future.set_result(None)
+            return future
+        future = self._submit(self._read_cache, dataset["_cache_path"], load=True)
+        self._prefetched[dataset_id] = future
+        return future
 
     def reload_dataset(self, index):
         """Restore in-memory data for the dataset at index from its cache.
@@ -995,18 +1810,32 @@ class Model:
         dataset = self.data[index]
         if dataset["data"] is not None:
             return  # already in memory
+        entry = self._pending.pop(dataset["id"], None)
+        if entry is not None:  # cache write in flight, wait for it and reuse the data
+            future, dataset["data"] = entry
+            if future.exception() is not None:  # discard the incomplete cache file
+                dataset["_cache_path"] = None
+            self._update_size(dataset)
+            return
         path = dataset["_cache_path"]
         if path is None:
             raise RuntimeError(
                 f"Dataset at index {index} has no cache file to reload from."
             )
-        if dataset["dtype"] == "raw":
-            dataset["data"] = mne.io.read_raw_fif(path, preload=True)
+        future = self._prefetched.pop(dataset["id"], None)
+        if future is not None:
+            dataset["data"] = future.result()
         else:
-            dataset["data"] = mne.read_epochs(path, preload=True)
+            dataset["data"] = self._read_cache(path)
+        self._update_size(dataset)
 
     def cleanup(self):
         """Delete all temporary cache files created during this session."""
+        if self._io is not None:
+            self._io.shutdown(wait=True, cancel_futures=True)
+            self._io = None
+        self._pending.clear()
+        self._prefetched.clear()
         for path in list(self._temp_files):
-            Path(path).unlink(missing_ok=True)
+            _unlink(path)
         self._temp_files.clear()
@@ -4,6 +4,7 @@
 
 import bisect
 import json
+import os
 from pathlib import Path
 
 from PySide6.QtCore import (
@@ -34,6 +35,7 @@ from PySide6.QtWidgets import (
     QWidget,
 )
 
+from mnelab.utils import have
 from mnelab.widgets import FlatSpinBox
 
 SETTINGS_PATH = str(
@@ -63,6 +65,9 @@ _DEFAULTS = {
     "show_menubar": True,
     "annotation_colors": {},
     "memory_saving": False,
+    "memory_budget": 1024,
+    "data_loading": "preload",
+    "n_jobs": 1,
     "scalings": "auto",
     "toolbar_actions": [
         "open_file",
@@ -196,6 +201,36 @@ class SettingsDialog(QDialog):
         self.memory_saving.setChecked(read_settings("memory_saving"))
         general_form.addRow("Save Memory:", self.memory_saving)
 
+        self.memory_budget = FlatSpinBox()
+        self.memory_budget.setRange(0, 1024**2)
+        self.memory_budget.setSingleStep(256)
+        self.memory_budget.setValue(read_settings("memory_budget"))
+        self.memory_budget.setSuffix(" MB")
+        self.memory_budget.setAlignment(Qt.AlignmentFlag.AlignRight)
+        self.memory_budget.setFixedWidth(100)
+        self.memory_budget.setEnabled(self.memory_saving.isChecked())
+        self.memory_saving.toggled.connect(self.memory_budget.setEnabled)
+        general_form.addRow("Memory Budget:", self.memory_budget)
+
+        self.data_loading = QComboBox()
+        self.data_loading.addItem("Into Memory", "preload")
+        self.data_loading.addItem("On Demand", "lazy")
+        self.data_loading.addItem("Memory-Mapped", "memmap")
+        self.data_loading.setCurrentIndex(
+            max(self.data_loading.findData(read_settings("data_loading")), 0)
+        )
+        general_form.addRow("Load Data:", self.data_loading)
+
+        self.n_jobs = FlatSpinBox()
+        self.n_jobs.setRange(1, os.cpu_count() or 1)
+        self.n_jobs.setValue(read_settings("n_jobs"))
+        self.n_jobs.setAlignment(Qt.AlignmentFlag.AlignRight)
+        self.n_jobs.setFixedWidth(100)
+        if not have["joblib"]:
+            self.n_jobs.setEnabled(False)
+            self.n_jobs.setToolTip("Parallel processing requires joblib.")
+        general_form.addRow("Parallel Jobs:", self.n_jobs)
+
         self._stack.addWidget(general_page)
 
         # Plotting page
@@ -391,6 +426,9 @@ class SettingsDialog(QDialog):
             dtype_badges=self.dtype_badges.isChecked(),
             menu_icons=self.menu_icons.isChecked(),
             memory_saving=self.memory_saving.isChecked(),
+            memory_budget=self.memory_budget.value(),
+            data_loading=self.data_loading.currentData(),
+            n_jobs=self.n_jobs.value(),
             scalings=self.scalings.currentText().lower(),
             toolbar_actions=toolbar_keys,
         )
@@ -407,6 +445,11 @@ class SettingsDialog(QDialog):
         self.dtype_badges.setChecked(_DEFAULTS["dtype_badges"])
         self.menu_icons.setChecked(_DEFAULTS["menu_icons"])
         self.memory_saving.setChecked(_DEFAULTS["memory_saving"])
+        self.memory_budget.setValue(_DEFAULTS["memory_budget"])
+        self.data_loading.setCurrentIndex(
+            self.data_loading.findData(_DEFAULTS["data_loading"])
+        )
+        self.n_jobs.setValue(_DEFAULTS["n_jobs"])
         self.plot_backend.setCurrentIndex(
             self.plot_backend.findText(_DEFAULTS["plot_backend"])
         )
@@ -3,12 +3,17 @@
 # License: BSD (3-clause)
 
 from mnelab.utils.artifact_detection import (
+    compute_epoch_stats,
+    find_bad_epochs,
     find_bad_epochs_amplitude,
     find_bad_epochs_autoreject,
     find_bad_epochs_kurtosis,
     find_bad_epochs_ptp,
+    flag_epochs,
 )
 from mnelab.utils.dependencies import have
+from mnelab.utils.filtering import design_filter, filter_blockwise
+from mnelab.utils.iclabel import iclabel_hash, run_iclabel_cached
 from mnelab.utils.syntax import CodeEditor, PythonHighlighter, format_code
 from mnelab.utils.utils import (
     Montage,
@@ -20,4 +25,5 @@ from mnelab.utils.utils import (
     merge_annotations,
     monospace_font,
     natural_sort,
+    without_samples,
 )
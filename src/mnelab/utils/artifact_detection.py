@@ -4,56 +4,117 @@
 
 import mne
 import numpy as np
-from scipy import stats
 
 from mnelab.utils.dependencies import have
 
+# statistic needed by each detection method
+METHOD_STATS = {
+    "amplitude": "amplitude",
+    "ptp": "ptp",
+    "kurtosis": "kurtosis",
+    "autoreject": "max_abs",
+}
 
-def find_bad_epochs_amplitude(data, threshold):
-    """Detect epochs with extreme amplitude values.
+
+def compute_epoch_stats(data, stats=("amplitude", "ptp", "kurtosis"), chunk_size=None):
+    """Compute statistics of each epoch and channel in a single pass over the data.
+
+    The data are read in chunks of consecutive epochs, so the full array is never
+    copied and all statistics are computed from the same chunk while it is in memory.
 
     Parameters
     ----------
-    data : mne.Epochs
+    data : mne.Epochs | numpy.ndarray, shape (n_epochs, n_channels, n_times)
         Epoched data.
-    threshold : float
-        Amplitude threshold in Volts (V). Epochs where any sample (after removing the
-        mean) falls outside the range [-threshold, +threshold] will be marked as bad.
+    stats : iterable of str
+        The statistics to compute. Can contain "amplitude" (maximum absolute deviation
+        from the epoch mean), "ptp" (peak-to-peak amplitude), "kurtosis" (Fisher
+        kurtosis), and "max_abs" (maximum absolute value).
+    chunk_size : int | None
+        Number of epochs per chunk. If None, a chunk holds about 64 MB of samples.
 
     Returns
     -------
-    numpy.ndarray, shape (n_epochs,)
-        Boolean array where True indicates a bad epoch.
+    dict[str, numpy.ndarray]
+        The statistics, each with shape (n_epochs, n_channels).
     """
-    epochs_data = data.get_data()
-    epoch_mean = epochs_data.mean(axis=-1, keepdims=True)
-    return np.any(np.abs(epochs_data - epoch_mean) > threshold, axis=(1, 2))
-
-
-def find_bad_epochs_autoreject(data):
-    """Detect epochs using autoreject-computed thresholds.
+    stats = set(stats)
+    if unknown := stats - set(METHOD_STATS.values()):
+        raise ValueError(f"Unknown statistics: {', '.join(sorted(unknown))}.")
+    if isinstance(data, np.ndarray):
+        n_epochs, n_channels, n_times = data.shape
+    else:
+        n_epochs, n_channels = len(data), data.info["nchan"]
+        n_times = len(data.times)
+    if chunk_size is None:
+        chunk_size = max(1, 2**26 // (8 * n_channels * n_times))
+    result = {stat: np.empty((n_epochs, n_channels)) for stat in stats}
+
+    for start in range(0, n_epochs, chunk_size):
+        stop = min(start + chunk_size, n_epochs)
+        if isinstance(data, np.ndarray):
+            x = data[start:stop].copy()
+        else:
+            x = data.get_data(item=slice(start, stop))
+        if "max_abs" in stats:
+            result["max_abs"][start:stop] = np.abs(x).max(axis=-1)
+        if "ptp" in stats:
+            result["ptp"][start:stop] = np.ptp(x, axis=-1)
+        if not stats & {"amplitude", "kurtosis"}:
+            continue
+        mean = x.mean(axis=-1, keepdims=True)
+        x -= mean  # x is a copy, so it can be centered in place
+        if "amplitude" in stats:
+            result["amplitude"][start:stop] = np.abs(x).max(axis=-1)
+        if "kurtosis" in stats:
+            np.square(x, out=x)
+            m2 = x.mean(axis=-1)
+            m4 = np.square(x, out=x).mean(axis=-1)
+            # like scipy.stats.kurtosis, constant signals have undefined kurtosis
+            constant = m2 <= (np.finfo(m2.dtype).resolution * mean[..., 0]) ** 2
+            with np.errstate(divide="ignore", invalid="ignore"):
+                kurtosis = m4 / m2**2 - 3
+            result["kurtosis"][start:stop] = np.where(constant, np.nan, kurtosis)
+    return result
+
+
+def flag_epochs(stats, method, threshold):
+    """Detect bad epochs from precomputed statistics.
 
     Parameters
     ----------
-    data : mne.Epochs
-        Epoched data.
+    stats : dict[str, numpy.ndarray]
+        Statistics computed by `compute_epoch_stats()`. Must contain the statistic
+        needed by `method` (see `METHOD_STATS`).
+    method : {"amplitude", "ptp", "kurtosis"}
+        The detection method (see `find_bad_epochs_amplitude()`,
+        `find_bad_epochs_ptp()`, and `find_bad_epochs_kurtosis()`).
+    threshold : float
+        The threshold of the method.
 
     Returns
     -------
     numpy.ndarray, shape (n_epochs,)
         Boolean array where True indicates a bad epoch.
-
-    Notes
-    -----
-    Requires the autoreject package to be installed.
     """
+    if method in ("amplitude", "ptp"):
+        return np.any(stats[method] > threshold, axis=1)
+    if method == "kurtosis":
+        kurt_values = stats["kurtosis"]
+        kurt_mean = np.mean(kurt_values, axis=0)
+        kurt_std = np.std(kurt_values, axis=0)
+        z_scores = np.abs((kurt_values - kurt_mean) / (kurt_std + 1e-10))
+        return np.any(z_scores > threshold, axis=1)
+    raise ValueError(f"Unknown detection method {method!r}.")
+
+
+def _flag_autoreject(data, max_abs):
     if not have["autoreject"]:
         raise ImportError("The autoreject package is required for this method.")
 
     from autoreject import get_rejection_threshold
 
     reject_dict = get_rejection_threshold(data, decim=2, verbose=False)
-    epoch_data = data.get_data()
     bad_epochs = np.zeros(len(data), dtype=bool)
     for ch_type, threshold in reject_dict.items():
         if ch_type == "eeg":
@@ -68,12 +129,85 @@ def find_bad_epochs_autoreject(data):
         if len(picks) == 0:
             continue
 
-        ch_data = epoch_data[:, picks, :]
-        bad_epochs |= np.any(np.abs(ch_data) > threshold, axis=(1, 2))
+        bad_epochs |= np.any(max_abs[:, picks] > threshold, axis=1)
 
     return bad_epochs
 
 
+def find_bad_epochs(data, methods, stats=None):
+    """Detect bad epochs with several methods at once.
+
+    All statistics needed by the methods are computed in a single pass over the data
+    (see `compute_epoch_stats()`).
+
+    Parameters
+    ----------
+    data : mne.Epochs
+        Epoched data.
+    methods : dict[str, float | None]
+        The detection methods ("amplitude", "ptp", "kurtosis", or "autoreject") and
+        their thresholds (None for "autoreject").
+    stats : dict[str, numpy.ndarray] | None
+        Precomputed statistics. Missing statistics are computed from `data`.
+
+    Returns
+    -------
+    dict[str, numpy.ndarray]
+        Boolean arrays of shape (n_epochs,) where True indicates a bad epoch, one for
+        each method.
+    """
+    stats = dict(stats or {})
+    missing = {METHOD_STATS[method] for method in methods} - set(stats)
+    if missing:
+        stats.update(compute_epoch_stats(data, missing))
+    masks = {}
+    for method, threshold in methods.items():
+        if method == "autoreject":
+            masks[method] = _flag_autoreject(data, stats["max_abs"])
+        else:
+            masks[method] = flag_epochs(stats, method, threshold)
+    return masks
+
+
+def find_bad_epochs_amplitude(data, threshold):
+    """Detect epochs with extreme amplitude values.
+
+    Parameters
+    ----------
+    data : mne.Epochs
+        Epoched data.
+    threshold : float
+        Amplitude threshold in Volts (V). Epochs where any sample (after removing the
+        mean) falls outside the range [-threshold, +threshold] will be marked as bad.
+
+    Returns
+    -------
+    numpy.ndarray, shape (n_epochs,)
+        Boolean array where True indicates a bad epoch.
+    """
+    return find_bad_epochs(data, {"amplitude": threshold})["amplitude"]
+
+
+def find_bad_epochs_autoreject(data):
+    """Detect epochs using autoreject-computed thresholds.
+
+    Parameters
+    ----------
+    data : mne.Epochs
+        Epoched data.
+
+    Returns
+    -------
+    numpy.ndarray, shape (n_epochs,)
+        Boolean array where True indicates a bad epoch.
+
+    Notes
+    -----
+    Requires the autoreject package to be installed.
+    """
+    return find_bad_epochs(data, {"autoreject": None})["autoreject"]
+
+
 def find_bad_epochs_ptp(data, threshold):
     """Detect epochs with excessive peak-to-peak amplitude.
 
@@ -90,8 +224,7 @@ def find_bad_epochs_ptp(data, threshold):
     numpy.ndarray, shape (n_epochs,)
         Boolean array where True indicates a bad epoch.
     """
-    ptp_values = np.ptp(data.get_data(), axis=2)
-    return np.any(ptp_values > threshold, axis=1)
+    return find_bad_epochs(data, {"ptp": threshold})["ptp"]
 
 
 def find_bad_epochs_kurtosis(data, threshold):
@@ -110,10 +243,4 @@ def find_bad_epochs_kurtosis(data, threshold):
     numpy.ndarray, shape (n_epochs,)
         Boolean array where True indicates a bad epoch.
     """
-    kurt_values = stats.kurtosis(data.get_data(), axis=2, fisher=True)
-
-    kurt_mean = np.mean(kurt_values, axis=0)
-    kurt_std = np.std(kurt_values, axis=0)
-
-    z_scores = np.abs((kurt_values - kurt_mean) / (kurt_std + 1e-10))
-    return np.any(z_scores > threshold, axis=1)
+    return find_bad_epochs(data, {"kurtosis": threshold})["kurtosis"]
@@ -2,7 +2,13 @@
 #
 # License: BSD (3-clause)
 
+import hashlib
+import json
+import os
+import sys
+from collections.abc import Mapping
 from importlib import import_module, metadata
+from pathlib import Path
 
 required = [
     "mne",
@@ -14,7 +20,7 @@ required = [
     "black",
     "isort",
 ]
-optional = ["autoreject", "mne-qt-browser", "picard", "sklearn"]
+optional = ["autoreject", "joblib", "mne-qt-browser", "picard", "sklearn"]
 
 _distribution_names = {
     "picard": "python-picard",
@@ -24,17 +30,106 @@ _import_names = {
     "pyside6": "PySide6",
 }
 
-have = {}
-for dep in required + optional:
-    distribution_name = _distribution_names.get(dep, dep)
-    import_name = _import_names.get(dep, dep).replace("-", "_")
+
+def _cache_dir():
+    """Return the user cache directory of MNELAB (without using Qt)."""
+    if path := os.environ.get("MNELAB_CACHE_DIR"):
+        return Path(path)
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local"
+        return Path(base) / "mnelab" / "cache"
+    if sys.platform == "darwin":
+        return Path.home() / "Library" / "Caches" / "mnelab"
+    return Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / "mnelab"
+
+
+def _fingerprint():
+    """Identify the Python environment.
+
+    Installing, upgrading, or removing a package adds or removes entries in a
+    directory on `sys.path`, which changes its modification time.
+    """
+    parts = [sys.version, sys.prefix, sys.executable]
+    for entry in sys.path:
+        try:
+            mtime = os.stat(entry or ".").st_mtime_ns
+        except OSError:
+            mtime = None
+        parts.append(f"{entry}:{mtime}")
+    return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+
+def _detect(dep):
+    """Return the installed version of a dependency (False if it is not installed)."""
     try:
-        version = metadata.version(distribution_name)
+        return metadata.version(_distribution_names.get(dep, dep))
     except metadata.PackageNotFoundError:
         try:
-            mod = import_module(import_name)
+            mod = import_module(_import_names.get(dep, dep).replace("-", "_"))
         except ImportError:
-            version = False
+            return False
+        return getattr(mod, "__version__", None) or "unknown"
+
+
+class _Dependencies(Mapping):
+    """Installed versions of dependencies (False if not installed), by distribution.
+
+    Looking up versions in the package metadata is slow in large environments or on
+    network file systems, so versions are detected only when they are first accessed.
+    Detected versions are stored in the user cache directory and reused as long as the
+    Python environment does not change (see `_fingerprint()`).
+
+    Parameters
+    ----------
+    deps : list of str
+        The dependencies.
+    """
+
+    def __init__(self, deps):
+        self._deps = {_distribution_names.get(dep, dep): dep for dep in deps}
+        self._versions = None
+        self._path = _cache_dir() / "dependencies.json"
+        self._fingerprint = None
+
+    def _load(self):
+        self._fingerprint = _fingerprint()
+        try:
+            cache = json.loads(self._path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            cache = {}
+        if cache.get("fingerprint") == self._fingerprint:
+            self._versions = cache.get("versions", {})
         else:
-            version = getattr(mod, "__version__", None) or "unknown"
-    have[distribution_name] = version
+            self._versions = {}
+
+    def _save(self):
+        cache = {"fingerprint": self._fingerprint, "versions": self._versions}
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(cache, indent=2), encoding="utf-8")
+            os.replace(tmp, self._path)
+        except OSError:  # caching is optional
+            pass
+
+    def __getitem__(self, name):
+        if name not in self._deps:
+            raise KeyError(name)
+        if self._versions is None:
+            self._load()
+        if name not in self._versions:
+            self._versions[name] = _detect(self._deps[name])
+            self._save()
+        return self._versions[name]
+
+    def __iter__(self):
+        return iter(self._deps)
+
+    def __len__(self):
+        return len(self._deps)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)})"
+
+
+have = _Dependencies(required + optional)
@@ -0,0 +1,101 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import mne
+import numpy as np
+from mne.cuda import _smart_pad
+
+
+def design_filter(sfreq, lower=None, upper=None, notch=None):
+    """Design the FIR filter used by `Raw.filter()` or `Raw.notch_filter()`.
+
+    The filter corresponds to the default arguments of these methods.
+
+    Parameters
+    ----------
+    sfreq : float
+        The sampling frequency.
+    lower : float | None
+        Lower pass-band edge (high-pass filter).
+    upper : float | None
+        Upper pass-band edge (low-pass filter).
+    notch : float | array_like | None
+        Frequencies to remove with a notch filter. If given, `lower` and `upper` are
+        ignored.
+
+    Returns
+    -------
+    h : np.ndarray
+        The filter coefficients (odd length, zero phase).
+    """
+    if notch is not None:  # see mne.filter.notch_filter
+        freqs = np.atleast_1d(notch).astype(float)
+        widths = freqs / 200
+        tb_2 = 0.5  # half of the default transition bandwidth
+        return mne.filter.create_filter(
+            None,
+            sfreq,
+            freqs + widths / 2 + tb_2,
+            freqs - widths / 2 - tb_2,
+            l_trans_bandwidth=tb_2,
+            h_trans_bandwidth=tb_2,
+            verbose=False,
+        )
+    return mne.filter.create_filter(None, sfreq, lower, upper, verbose=False)
+
+
+def filter_blockwise(src, dst, h, picks, block_size=None, n_jobs=1):
+    """Apply a zero-phase FIR filter to consecutive blocks of samples.
+
+    Each block is convolved together with the adjacent samples the filter needs, so
+    the result equals filtering the whole signal at once (up to floating point
+    rounding), but only one block has to be in memory at a time. This is useful if
+    `src` and `dst` are memory-mapped. Like MNE, the signal is extended by reflecting
+    it at both ends.
+
+    Parameters
+    ----------
+    src : np.ndarray, shape (n_channels, n_times)
+        The signal.
+    dst : np.ndarray, shape (n_channels, n_times)
+        The filtered signal. Can be `src` to filter in place. Channels not in `picks`
+        are copied from `src`.
+    h : np.ndarray
+        The filter coefficients (odd length, zero phase).
+    picks : array_like of int
+        The channels to filter.
+    block_size : int | None
+        Number of samples per block. If None, a block holds about 16 MB of samples (but
+        at least four times the length of the filter).
+    n_jobs : int
+        Number of threads used for the FFTs.
+    """
+    from scipy.fft import set_workers
+    from scipy.signal import oaconvolve
+
+    n_times = src.shape[1]
+    half = len(h) // 2
+    if n_times <= len(h):
+        raise ValueError("The signal must be longer than the filter.")
+    picks = np.asarray(picks)
+    if block_size is None:
+        block_size = max(2**24 // (src.itemsize * max(len(picks), 1)), 4 * len(h))
+    kernel = h[np.newaxis]
+    # blocks are overwritten if filtering in place, so keep the unfiltered samples
+    # preceding the current block
+    before = _smart_pad(src[picks, : half + 1], (half, 0), "reflect_limited")[:, :half]
+    end = _smart_pad(src[picks, -half - 1 :], (0, half), "reflect_limited")[
+        :, half + 1 :
+    ]
+    for start in range(0, n_times, block_size):
+        stop = min(start + block_size, n_times)
+        after = src[picks, stop : stop + half]
+        if stop + half > n_times:
+            after = np.concatenate((after, end[:, : stop + half - n_times]), axis=1)
+        block = np.concatenate((before, src[picks, start:stop], after), axis=1)
+        before = block[:, -2 * half : -half]
+        if dst is not src:
+            dst[:, start:stop] = src[:, start:stop]
+        with set_workers(n_jobs):
+            dst[picks, start:stop] = oaconvolve(block, kernel, mode="valid", axes=1)
@@ -0,0 +1,87 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import hashlib
+import os
+
+import numpy as np
+
+from mnelab.utils.dependencies import _cache_dir, have
+
+
+def iclabel_hash(inst, ica):
+    """Identify the inputs of an ICLabel classification.
+
+    The hash covers everything the classification depends on: the ICA solution, the
+    samples, channel names and positions, the sampling frequency, and the version of
+    mnextend (which implements ICLabel).
+
+    Parameters
+    ----------
+    inst : mne.io.Raw | mne.Epochs
+        The data.
+    ica : mne.preprocessing.ICA
+        The fitted ICA solution.
+
+    Returns
+    -------
+    str
+        The hexadecimal SHA-256 digest.
+    """
+    h = hashlib.sha256()
+    h.update(repr((type(inst).__name__, have["mnextend"])).encode())
+    h.update(repr((inst.ch_names, ica.ch_names, inst.info["sfreq"])).encode())
+    locs = np.array([ch["loc"][:3] for ch in inst.info["chs"]])
+    data = inst._data if inst.preload else inst.get_data()
+    for array in (
+        ica.unmixing_matrix_,
+        ica.mixing_matrix_,
+        ica.pca_components_,
+        ica.pca_mean_,
+        ica.pre_whitener_,
+        locs,
+        data,
+    ):
+        array = np.ascontiguousarray(array)
+        h.update(repr((array.dtype.str, array.shape)).encode())
+        h.update(array.data)
+    return h.hexdigest()
+
+
+def run_iclabel_cached(inst, ica):
+    """Classify independent components with ICLabel, reusing previous results.
+
+    Classifications are stored in the user cache directory under the hash of their
+    inputs (see `iclabel_hash()`), so they are available again after restarting
+    MNELAB.
+
+    Parameters
+    ----------
+    inst : mne.io.Raw | mne.Epochs
+        The data.
+    ica : mne.preprocessing.ICA
+        The fitted ICA solution.
+
+    Returns
+    -------
+    numpy.ndarray, shape (n_components, n_classes)
+        The probability of each class for each component.
+    """
+    from mnextend import run_iclabel
+
+    path = _cache_dir() / "iclabel" / f"{iclabel_hash(inst, ica)}.npy"
+    try:
+        return np.load(path)
+    except (OSError, ValueError):
+        pass
+    probs = run_iclabel(inst, ica)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, probs)
+        os.replace(tmp, path)
+    except OSError:  # caching is optional
+        pass
+    return probs
@@ -5,8 +5,6 @@
 import ast
 import keyword
 
-import black
-import isort
 from PySide6.QtCore import QRect, QRegularExpression, QSize, Qt
 from PySide6.QtGui import QColor, QFont, QPainter, QSyntaxHighlighter, QTextCharFormat
 from PySide6.QtWidgets import QApplication, QPlainTextEdit, QWidget
@@ -147,6 +145,10 @@ def format_code(code):
     If the code cannot be formatted (e.g., due to syntax errors), the function returns
     the original code.
     """
+    # black and isort take a while to import, so only load them when needed
+    import black
+    import isort
+
     try:
         return black.format_str(
             isort.code(_remove_unused_imports(code)), mode=black.Mode()
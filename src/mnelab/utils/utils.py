@@ -4,7 +4,9 @@
 
 import re
 import sys
+import warnings
 from collections import defaultdict
+from copy import copy
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -56,19 +58,131 @@ def natural_sort(lst):
     return sorted(lst, key=key)
 
 
-def calculate_channel_stats(raw):
+def without_samples(inst):
+    """Return a shallow copy of a Raw or Epochs object without its samples.
+
+    The copy shares everything except the sample array with `inst`, so it is cheap to
+    pickle. Array arguments recorded from the constructor (e.g. the data passed to
+    `mne.io.RawArray`) are dropped as well.
+
+    Parameters
+    ----------
+    inst : mne.io.Raw | mne.Epochs
+        The object to copy.
+
+    Returns
+    -------
+    shell : mne.io.Raw | mne.Epochs
+        The copy, with `_data` set to None.
+    """
+    shell = copy(inst)
+    shell._data = None
+    if hasattr(shell, "_init_kwargs"):
+        shell._init_kwargs = {
+            key: None if isinstance(value, np.ndarray) else value
+            for key, value in shell._init_kwargs.items()
+        }
+    return shell
+
+
+def calculate_channel_stats(raw, exact=False, n_bins=4096, chunk_size=None):
+    """Calculate summary statistics of each channel.
+
+    The data are read in chunks of consecutive samples, so memory use does not grow
+    with the length of the recording. Minimum, maximum, and mean are always exact.
+    Quartiles are estimated from a histogram of each channel with `n_bins` bins
+    between its minimum and maximum (assuming uniformly distributed values within a
+    bin), so their error is less than (max - min) / `n_bins`. Non-finite values (such
+    as NaN samples filling gaps in XDF streams) are ignored, and the statistics of
+    channels without any finite values are NaN.
+
+    Parameters
+    ----------
+    raw : mne.io.Raw
+        The data.
+    exact : bool
+        Compute exact quartiles with `numpy.percentile`. This copies and sorts all
+        samples, which is slow and needs a lot of memory for long recordings.
+    n_bins : int
+        Number of histogram bins per channel used to estimate the quartiles.
+    chunk_size : int | None
+        Number of samples per chunk. If None, a chunk holds about 64 MB of samples.
+
+    Returns
+    -------
+    cols : dict
+        The columns "name", "type", "min", "Q1", "median", "Q3", "max", "mean", and
+        "unit". Values are scaled to the unit of the channel type.
+    nchan : int
+        Number of channels.
+    """
     # extract channel info
-    nchan = raw.info["nchan"]
-    data = raw.get_data()
+    nchan, n_times = raw.info["nchan"], raw.n_times
     cols = defaultdict(list)
     cols["name"] = raw.ch_names
     cols["type"] = [channel_type(raw.info, i) for i in range(nchan)]
-
-    # vectorized calculations
-    cols["min"], cols["Q1"], cols["median"], cols["Q3"], cols["max"] = np.percentile(
-        data, [0, 25, 50, 75, 100], axis=1
-    )
-    cols["mean"] = np.mean(data, axis=1)
+    if chunk_size is None:
+        chunk_size = max(1, 2**23 // nchan)
+    starts = range(0, n_times, chunk_size)
+
+    # first pass: exact minimum, maximum, and mean
+    lo, hi = np.full(nchan, np.inf), np.full(nchan, -np.inf)
+    total = np.zeros(nchan)
+    n = np.zeros(nchan, dtype=np.int64)  # number of finite values
+    for start in starts:
+        x = raw.get_data(start=start, stop=start + chunk_size)
+        finite = np.isfinite(x)
+        np.minimum(lo, x.min(axis=1, where=finite, initial=np.inf), out=lo)
+        np.maximum(hi, x.max(axis=1, where=finite, initial=-np.inf), out=hi)
+        total += x.sum(axis=1, where=finite)
+        n += finite.sum(axis=1)
+    empty = n == 0
+    lo[empty], hi[empty] = np.nan, np.nan
+    mean = np.divide(total, n, out=np.full(nchan, np.nan), where=~empty)
+    cols["min"], cols["max"], cols["mean"] = lo, hi, mean
+
+    if exact:
+        data = raw.get_data()
+        data[~np.isfinite(data)] = np.nan
+        with warnings.catch_warnings():  # all-NaN channels
+            warnings.simplefilter("ignore", RuntimeWarning)
+            cols["Q1"], cols["median"], cols["Q3"] = np.nanpercentile(
+                data, [25, 50, 75], axis=1
+            )
+    else:
+        # second pass: histogram of each channel (constant channels use only bin 0),
+        # with an extra bin per channel for non-finite values, which is ignored
+        width = (hi - lo) / n_bins
+        scale = np.divide(1, width, out=np.zeros(nchan), where=width > 0)[:, None]
+        offset = np.where(empty, 0, lo)[:, None]
+        offsets = np.arange(nchan)[:, None] * (n_bins + 1)
+        counts = np.zeros(nchan * (n_bins + 1), dtype=np.int64)
+        for start in starts:
+            x = raw.get_data(start=start, stop=start + chunk_size)
+            missing = ~np.isfinite(x)
+            x[missing] = 0
+            x -= offset
+            x *= scale
+            bins = np.minimum(x.astype(np.intp), n_bins - 1)  # maximum is in last bin
+            bins[missing] = n_bins
+            bins += offsets
+            counts += np.bincount(bins.ravel(), minlength=nchan * (n_bins + 1))
+        counts = counts.reshape(nchan, n_bins + 1)[:, :n_bins]
+        cumulative = np.cumsum(counts, axis=1)
+        rows = np.arange(nchan)
+        for col, q in [("Q1", 0.25), ("median", 0.5), ("Q3", 0.75)]:
+            rank = q * (n - 1)  # position of the quantile in the sorted data
+            i = (cumulative <= rank[:, None]).sum(
+                axis=1
+            )  # bin containing this position
+            below = np.where(i > 0, cumulative[rows, i - 1], 0)
+            frac = np.divide(
+                rank - below + 0.5,
+                counts[rows, i],
+                out=np.full(nchan, np.nan),
+                where=~empty,
+            )
+            cols[col] = np.clip(lo + (i + frac) * width, lo, hi)
 
     # scaling and units
     scalings = _handle_default("scalings")
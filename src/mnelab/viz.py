@@ -3,13 +3,13 @@
 # License: BSD (3-clause)
 
 import math
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 import matplotlib as mpl
-import matplotlib.pyplot as plt
 import numpy as np
-from mne.stats import permutation_cluster_1samp_test as pcluster_test
-from mne.time_frequency import tfr_multitaper
-from mne.viz import plot_compare_evokeds
+
+from mnelab.executor import report_progress
 
 
 def _center_cmap(cmap, vmin, vmax, name="cmap_centered"):
@@ -72,7 +72,198 @@ def _get_rows_cols(n):
     return rows, cols
 
 
-def _calc_tfr(epochs, freqs, baseline, times, alpha=None):
+class TFRCache:
+    """Keep recently computed time-frequency representations in memory.
+
+    Entries are tracked in least-recently-used order. When the total size of all
+    entries exceeds the budget, the least recently used entries are dropped until the
+    total fits again. Entries larger than the budget are not stored.
+
+    Parameters
+    ----------
+    budget : int
+        Memory budget in bytes.
+    """
+
+    def __init__(self, budget):
+        self.budget = budget
+        self.nbytes = 0  # total size of all entries
+        self._entries = OrderedDict()  # key → TFR, least recently used first
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __iter__(self):
+        return iter(list(self._entries))
+
+    def get(self, key):
+        """Return the TFR stored under key (None if there is none)."""
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+
+    def put(self, key, tfr):
+        """Store a TFR under key and evict entries until the budget is met."""
+        self.discard(key)
+        if tfr.data.nbytes > self.budget:
+            return
+        while self._entries and self.nbytes + tfr.data.nbytes > self.budget:
+            self.discard(next(iter(self._entries)))
+        self._entries[key] = tfr
+        self.nbytes += tfr.data.nbytes
+
+    def discard(self, key):
+        """Remove the TFR stored under key (if any)."""
+        if (tfr := self._entries.pop(key, None)) is not None:
+            self.nbytes -= tfr.data.nbytes
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+        self.nbytes = 0
+
+
+_tfr_cache = TFRCache(budget=2**30)  # TFRs computed by this (worker) process
+
+
+def _compute_tfr(
+    epochs,
+    freqs,
+    n_cycles,
+    decim=1,
+    tmin=None,
+    tmax=None,
+    dtype=np.float32,
+    chunk_size=None,
+    key=None,
+    n_jobs=None,
+):
+    """
+    Compute the multitaper TFR of each epoch, reusing a previous result if possible.
+
+    The TFR is computed for chunks of consecutive epochs. Each chunk is cropped and
+    converted to `dtype` right away, so the power at all time points is only kept in
+    memory for one chunk at a time. The result is shared with later calls and must not
+    be modified in place.
+
+    Parameters
+    ----------
+    epochs : mne.epochs.Epochs
+        Epochs extracted from a Raw instance.
+    freqs : np.ndarray
+        The frequencies in Hz.
+    n_cycles : float | np.ndarray
+        The number of cycles per frequency.
+    decim : int
+        Decimation factor applied after the time-frequency decomposition.
+    tmin, tmax : float | None
+        Start and end of the time interval to keep. The TFR is still computed from the
+        whole epochs, so cropping does not introduce edge effects. If None, the first or
+        last time point is used. A cached TFR covering a longer interval is returned
+        without cropping it.
+    dtype : numpy.dtype
+        The data type of the power values.
+    chunk_size : int | None
+        Number of epochs per chunk. If None, the power of a chunk at all time points
+        takes up about 64 MB.
+    key : hashable | None
+        Identifies the version of the data in `epochs` (for example, the ID and version
+        of a data set). If None, the result is neither looked up nor stored.
+    n_jobs : int | None
+        Number of parallel jobs.
+
+    Returns
+    -------
+    mne.time_frequency.EpochsTFR
+        The TFR of each epoch.
+    """
+    from mne.time_frequency import EpochsTFRArray, tfr_multitaper
+
+    if key is not None:
+        n_cycles = np.broadcast_to(n_cycles, len(freqs))
+        key = (key, tuple(freqs), tuple(n_cycles), decim, np.dtype(dtype))
+        for cached_key in _tfr_cache:
+            if cached_key[0] == key and _contains(cached_key[1], (tmin, tmax)):
+                return _tfr_cache.get(cached_key)
+    if chunk_size is None:
+        size = epochs.info["nchan"] * len(freqs) * len(epochs.times) // decim
+        chunk_size = max(1, 2**23 // size)
+
+    power = None
+    for start in range(0, len(epochs), chunk_size):
+        tfr = tfr_multitaper(
+            epochs[start : start + chunk_size],
+            freqs,
+            n_cycles,
+            decim=decim,
+            average=False,
+            return_itc=False,
+            n_jobs=n_jobs,
+        )
+        if power is None:
+            keep = np.ones(len(tfr.times), dtype=bool)
+            if tmin is not None:
+                keep &= tfr.times >= tmin - 0.5 / tfr.info["sfreq"]
+            if tmax is not None:
+                keep &= tfr.times <= tmax + 0.5 / tfr.info["sfreq"]
+            shape = (len(epochs), *tfr.data.shape[1:-1], keep.sum())
+            power = np.empty(shape, dtype=dtype)
+            info, times = tfr.info, tfr.times[keep]
+        power[start : start + chunk_size] = tfr.data[..., keep]
+    tfr = EpochsTFRArray(
+        info,
+        power,
+        times,
+        freqs,
+        method="multitaper",
+        events=epochs.events,
+        event_id=epochs.event_id,
+        selection=epochs.selection,
+        drop_log=epochs.drop_log,
+        metadata=epochs.metadata,
+    )
+    if key is not None:
+        for cached_key in _tfr_cache:  # entries covering a shorter interval
+            if cached_key[0] == key and _contains((tmin, tmax), cached_key[1]):
+                _tfr_cache.discard(cached_key)
+        _tfr_cache.put((key, (tmin, tmax)), tfr)
+    return tfr
+
+
+def _contains(outer, inner):
+    """Check if the time interval inner lies within outer (None is unbounded)."""
+    (outer_min, outer_max), (inner_min, inner_max) = outer, inner
+    start = outer_min is None or (inner_min is not None and outer_min <= inner_min)
+    stop = outer_max is None or (inner_max is not None and inner_max <= outer_max)
+    return start and stop
+
+
+def _time_window(baseline, times):
+    """Return the time interval needed for baseline correction and cropping."""
+    tmin = None if baseline[0] is None else min(baseline[0], times[0])
+    tmax = None if baseline[1] is None else max(baseline[1], times[1])
+    return tmin, tmax
+
+
+def _baseline_and_crop(tfr, baseline, times):
+    """Apply percent baseline correction to a TFR and crop it (in place)."""
+    tfr.apply_baseline(baseline, mode="percent")
+    # the last time point of a decimated TFR can be slightly earlier than times[1]
+    return tfr.crop(max(times[0], tfr.times[0]), min(times[1], tfr.times[-1]))
+
+
+def _calc_tfr(
+    epochs,
+    freqs,
+    baseline,
+    times,
+    alpha=None,
+    n_permutations=100,
+    decim=1,
+    key=None,
+    n_jobs=None,
+):
     """
     Calculate AverageTFR and significance masks for given epochs.
 
@@ -90,6 +281,15 @@ def _calc_tfr(epochs, freqs, baseline, times, alpha=None):
         Start and end of crop time interval.
     alpha : float, optional
         If specified, calculate significance maps with threshold `alpha`.
+    n_permutations : int
+        Number of permutations of the cluster tests.
+    decim : int
+        Decimation factor applied after the time-frequency decomposition.
+    key : hashable | None
+        Identifies the version of the data in `epochs`, so that the TFR can be reused
+        (see `_compute_tfr()`).
+    n_jobs : int | None
+        Number of parallel jobs for computing the TFR and the cluster tests.
 
     Returns
     -------
@@ -98,42 +298,65 @@ def _calc_tfr(epochs, freqs, baseline, times, alpha=None):
         `tfr_ev` is the EpochsTFR object for the respective event. `masks` is again a
         dictionary, where keys are channel names and values are significance masks.
         Significance masks are `None` if `alpha` was not specified.
+
+    Notes
+    -----
+    The TFR is computed in chunks of epochs and only the time interval covering
+    `baseline` and `times` is kept (as single-precision values, see `_compute_tfr()`).
+    The cluster tests for positive and negative clusters of all events and channels
+    run in `n_jobs` threads. The threads only overlap where NumPy releases the GIL, so
+    the speedup is modest. Every test uses the same seed, so the masks do not depend
+    on the number of jobs or the order in which the tests finish.
     """
-    tfr = tfr_multitaper(epochs, freqs, freqs, average=False, return_itc=False)
-    tfr.apply_baseline(baseline, mode="percent")
-    tfr.crop(*times)
+    from mne.stats import permutation_cluster_1samp_test as pcluster_test
+
+    tmin, tmax = _time_window(baseline, times)
+    tfr = _compute_tfr(epochs, freqs, freqs, decim, tmin, tmax, key=key, n_jobs=n_jobs)
 
     pcluster_kwargs = {
-        "n_permutations": 100,
+        "n_permutations": n_permutations,
         "step_down_p": 0.05,
         "seed": 1,
         "buffer_size": None,
         "out_type": "mask",
     }
 
-    res = {}
-
+    tfrs = {}
     for event in epochs.event_id:
-        tfr_ev = tfr[event]
-        masks = {}
-        for ch in range(epochs.info["nchan"]):
-            mask = None
-            if alpha is not None:
-                # positive clusters
-                _, c1, p1, _ = pcluster_test(
-                    tfr_ev.data[:, ch], tail=1, **pcluster_kwargs
-                )
-                # negative clusters
-                _, c2, p2, _ = pcluster_test(
-                    tfr_ev.data[:, ch], tail=-1, **pcluster_kwargs
-                )
-
-                c = np.stack(c1 + c2, axis=2)  # combined clusters
-                p = np.concat((p1, p2))  # combined p-values
-                mask = c[..., p <= alpha].any(axis=-1)
-            masks[epochs.ch_names[ch]] = mask
-        res[event] = (tfr_ev, masks)
-    return res
+        # tfr[event] is a copy, so the cached TFR is not modified
+        tfrs[event] = _baseline_and_crop(tfr[event], baseline, times)
+    masks = {event: dict.fromkeys(epochs.ch_names) for event in epochs.event_id}
+    if alpha is not None:
+        done, total = 0, len(tfrs) * epochs.info["nchan"]
+        report_progress(done, total)
+        tails = {}  # (event, channel) → {tail: (clusters, p-values)}
+        with ThreadPoolExecutor(max_workers=n_jobs or 1) as executor:
+            futures = {
+                executor.submit(
+                    pcluster_test, tfr_ev.data[:, ch], tail=tail, **pcluster_kwargs
+                ): (event, ch, tail)
+                for event, tfr_ev in tfrs.items()
+                for ch in range(epochs.info["nchan"])
+                for tail in (1, -1)  # positive and negative clusters
+            }
+            for future in as_completed(futures):
+                event, ch, tail = futures[future]
+                _, clusters, p, _ = future.result()
+                result = tails.setdefault((event, ch), {})
+                result[tail] = clusters, p
+                if len(result) < 2:
+                    continue
+                # a tail without clusters is an empty array instead of a list
+                (c1, p1), (c2, p2) = result[1], result[-1]
+                mask = np.zeros(tfrs[event].data.shape[2:], dtype=bool)
+                for cluster, p in zip([*c1, *c2], np.concat((p1, p2))):
+                    if p <= alpha:
+                        mask |= cluster
+                masks[event][epochs.ch_names[ch]] = mask
+                del tails[event, ch]
+                done += 1
+                report_progress(done, total)
+    return {event: (tfrs[event], masks[event]) for event in tfrs}
 
 
 def plot_erds(tfr_and_masks):
@@ -152,6 +375,8 @@ def plot_erds(tfr_and_masks):
     list[matplotlib.figure.Figure]
         A list of the figure(s) generated, one figure per event.
     """
+    import matplotlib.pyplot as plt
+
     figs = []
 
     for event, (tfr_ev, masks) in tfr_and_masks.items():
@@ -186,9 +411,11 @@ def plot_erds(tfr_and_masks):
     return figs
 
 
-def plot_erds_topomaps(epochs, events, freqs, baseline, times):
+def _calc_tfr_topomaps(
+    epochs, events, freqs, baseline, times, decim=1, key=None, n_jobs=None
+):
     """
-    Plot ERDS topomaps, one figure per event.
+    Calculate the average TFR of each event for ERDS topomaps.
 
     Parameters
     ----------
@@ -202,6 +429,35 @@ def plot_erds_topomaps(epochs, events, freqs, baseline, times):
         Start and end times for baseline correction.
     times : tuple[float, float]
         Start and end times between which the average is taken.
+    decim : int
+        Decimation factor applied after the time-frequency decomposition.
+    key : hashable | None
+        Identifies the version of the data in `epochs`, so that the TFR can be reused
+        (see `_compute_tfr()`).
+    n_jobs : int | None
+        Number of parallel jobs for computing the TFR.
+
+    Returns
+    -------
+    dict[str, mne.time_frequency.AverageTFR]
+        The baseline-corrected and cropped average TFR of each event.
+    """
+    tmin, tmax = _time_window(baseline, times)
+    tfr = _compute_tfr(epochs, freqs, freqs, decim, tmin, tmax, key=key, n_jobs=n_jobs)
+    return {
+        event: _baseline_and_crop(tfr[event].average(), baseline, times)
+        for event in events
+    }
+
+
+def plot_erds_topomaps(tfrs):
+    """
+    Plot ERDS topomaps, one figure per event.
+
+    Parameters
+    ----------
+    tfrs : dict[str, mne.time_frequency.AverageTFR]
+        The average TFR of each event (see `_calc_tfr_topomaps()`).
 
     Returns
     -------
@@ -212,12 +468,7 @@ def plot_erds_topomaps(epochs, events, freqs, baseline, times):
     cmap = _center_cmap(mpl.colormaps["RdBu"], vmin, vmax)
 
     figs = []
-    for event in events:
-        tfr = tfr_multitaper(
-            epochs[event], freqs, freqs, average=True, return_itc=False
-        )
-        tfr.apply_baseline(baseline, mode="percent")
-        tfr.crop(*times)
+    for event, tfr in tfrs.items():
         fig = tfr.plot_topomap(
             title=f"Event: {event}",
             unit="ERDS",
@@ -338,6 +589,8 @@ def plot_evoked_comparison(
             e: epochs[e].average(picks=picks, method=average_method, by_event_type=True)
             for e in events
         }
+    from mne.viz import plot_compare_evokeds
+
     return plot_compare_evokeds(evokeds, picks=picks, combine=combine)
 
 
@@ -113,6 +113,8 @@ class InfoWidget(QWidget):
         QApplication.instance().installEventFilter(self)
         self._hover_entries = []  # list of {row_widget, btn, icon}
         self._copy_entry = None  # ref to the file name entry for restore logic
+        self._values = {}  # currently displayed values
+        self._labels = {}  # key → value label
         self._check_icon = QIcon.fromTheme("copy-done")
         self._restore_timer = QTimer(self)
         self._restore_timer.setSingleShot(True)
@@ -136,8 +138,19 @@ class InfoWidget(QWidget):
         values : dict
             Each key/value pair in this dict is displayed in a row separated by a colon.
         """
+        if (
+            values
+            and list(values) == list(self._values)
+            and values.get("File Name") == self._values.get("File Name")
+        ):  # same rows, only update the labels whose value changed
+            for key, value in values.items():
+                if value != self._values[key]:
+                    self._labels[key].setText(str(value))
+            self._values = dict(values)
+            return
         self.clear()
         if values:
+            self._values = dict(values)
             for row, (key, value) in enumerate(values.items()):
                 icon_name = _ICON_MAP.get(str(key), "placeholder")
                 icon_label = QLabel()
@@ -151,6 +164,7 @@ class InfoWidget(QWidget):
                 )
                 self.grid.addWidget(left, row, 1)
                 self.grid.addWidget(right, row, 2)
+                self._labels[key] = right
                 if key == "File Name" and value != "–":
                     right.setText(Path(str(value)).name)  # filename only, not full path
                     self._copy_entry = self._add_hover_entry(
@@ -193,6 +207,16 @@ class InfoWidget(QWidget):
                         self.reference_clicked.emit,
                     )
 
+    def set_loading(self, name):
+        """Show that the data of a data set is being loaded.
+
+        Parameters
+        ----------
+        name : str
+            Name of the data set.
+        """
+        self.set_values({"Data Set": name, "Status": "Loading…"})
+
     def _add_hover_entry(self, row, label_widget, icon_name, tooltip, on_click):
         """Create a hover-triggered action button and register it."""
         btn = QToolButton()
@@ -257,6 +281,8 @@ class InfoWidget(QWidget):
         """Clear all values."""
         self._hover_entries = []
         self._copy_entry = None
+        self._values = {}
+        self._labels = {}
         item = self.grid.takeAt(0)
         while item:
             item.widget().deleteLater()
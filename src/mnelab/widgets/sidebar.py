@@ -105,6 +105,8 @@ class SidebarTreeWidget(QTreeWidget):
         self.setItemDelegateForColumn(1, TypeBadgeDelegate(self))
         self.setAccessibleName("Opened datasets")
         self._dragging = False
+        self._items = {}  # dataset ID → tree item
+        self._close_item = None  # item currently showing the close button
         if sys.platform != "darwin":
             self._apply_base_stylesheet()
         self.viewport().installEventFilter(self)
@@ -194,6 +196,45 @@ class SidebarTreeWidget(QTreeWidget):
         """Show or hide the data type badge column."""
         self.setColumnHidden(1, not visible)
 
+    def clear(self):
+        """Remove all items."""
+        self._items.clear()
+        self._close_item = None
+        super().clear()
+
+    def count_items(self):
+        """Return the number of dataset items in the tree."""
+        return len(self._items)
+
+    def find_item(self, dataset_id):
+        """Return the tree item for a dataset, or None if there is none."""
+        return self._items.get(dataset_id)
+
+    def take_item(self, dataset_id):
+        """Remove the tree item for a dataset (including its children) from the tree.
+
+        Returns
+        -------
+        item : QTreeWidgetItem | None
+            The removed item, or None if there is no item for the dataset.
+        """
+        item = self._items.get(dataset_id)
+        if item is None:
+            return None
+        stack = [item]
+        while stack:  # forget the item and all its descendants
+            current = stack.pop()
+            self._items.pop(current.data(0, Qt.ItemDataRole.UserRole), None)
+            if current is self._close_item:
+                self._close_item = None
+            stack.extend(current.child(i) for i in range(current.childCount()))
+        parent = item.parent()
+        if parent is None:
+            self.takeTopLevelItem(self.indexOfTopLevelItem(item))
+        else:
+            parent.removeChild(item)
+        return item
+
     def make_item(self, name, dataset_id):
         """Create a styled tree item for a dataset."""
         item = QTreeWidgetItem(["", "", ""])
@@ -205,6 +246,7 @@ class SidebarTreeWidget(QTreeWidget):
             | Qt.ItemFlag.ItemIsSelectable
             | Qt.ItemFlag.ItemIsEditable
         )
+        self._items[dataset_id] = item
         return item
 
     def style_items(self):
@@ -213,20 +255,6 @@ class SidebarTreeWidget(QTreeWidget):
         hovered = self.itemAt(pos)
         self.showCloseButton(hovered)
 
-    def _all_items(self):
-        """Yield every tree item in the widget, depth-first."""
-
-        def _recurse(parent_item):
-            for i in range(parent_item.childCount()):
-                child = parent_item.child(i)
-                yield child
-                yield from _recurse(child)
-
-        for i in range(self.topLevelItemCount()):
-            top = self.topLevelItem(i)
-            yield top
-            yield from _recurse(top)
-
     def eventFilter(self, source, event):
         if source == self.viewport() and event.type() == QEvent.Type.MouseMove:
             item = self.itemAt(event.pos())
@@ -262,31 +290,31 @@ class SidebarTreeWidget(QTreeWidget):
 
     def showCloseButton(self, hovered_item):
         """Show the close button on the hovered item; remove it from all others."""
-        for item in self._all_items():
-            if item is hovered_item:
-                if self.itemWidget(item, 2) is not None:
-                    continue  # button already present, don't recreate
-                dataset_id = item.data(0, Qt.ItemDataRole.UserRole)
-                btn = QToolButton()
-                btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
-                btn.setFixedSize(24, ROW_HEIGHT)
-                btn.setIcon(QIcon.fromTheme("close-data"))
-                btn.setToolTip("Close Dataset")
-                btn.setStyleSheet("""
-                    QToolButton {
-                        background: transparent;
-                        border: none;
-                    }
-                    QToolButton:pressed {
-                        background: rgba(128, 128, 128, 0.35);
-                        border-radius: 4px;
-                    }
-                """)
-                btn.installEventFilter(self)
-                btn.clicked.connect(lambda _, did=dataset_id: self._close_dataset(did))
-                self.setItemWidget(item, 2, btn)
-            else:
-                self.removeItemWidget(item, 2)
+        if self._close_item is not None and self._close_item is not hovered_item:
+            self.removeItemWidget(self._close_item, 2)
+            self._close_item = None
+        if hovered_item is None or self.itemWidget(hovered_item, 2) is not None:
+            return  # button already present, don't recreate
+        dataset_id = hovered_item.data(0, Qt.ItemDataRole.UserRole)
+        btn = QToolButton()
+        btn.setFocusPolicy(Qt.FocusPolicy.NoFocus)
+        btn.setFixedSize(24, ROW_HEIGHT)
+        btn.setIcon(QIcon.fromTheme("close-data"))
+        btn.setToolTip("Close Dataset")
+        btn.setStyleSheet("""
+            QToolButton {
+                background: transparent;
+                border: none;
+            }
+            QToolButton:pressed {
+                background: rgba(128, 128, 128, 0.35);
+                border-radius: 4px;
+            }
+        """)
+        btn.installEventFilter(self)
+        btn.clicked.connect(lambda _, did=dataset_id: self._close_dataset(did))
+        self.setItemWidget(hovered_item, 2, btn)
+        self._close_item = hovered_item
 
     def _close_dataset(self, dataset_id):
         """Close a dataset, cascading to descendants with a confirmation dialog."""
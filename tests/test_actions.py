@@ -2,6 +2,9 @@
 #
 # License: BSD (3-clause)
 
+import numpy as np
+from edfio import Edf, EdfSignal
+
 from mnelab.mainwindow import MainWindow
 from mnelab.model import Model
 
@@ -18,3 +21,59 @@ def test_initial_actions(qtbot):
             assert action.isEnabled()
         else:
             assert not action.isEnabled()
+
+
+def test_sidebar_incremental_updates(qtbot, tmp_path):
+    """Sidebar items are added, renamed and removed without rebuilding the tree."""
+    path = tmp_path / "data.edf"
+    Edf([EdfSignal(np.zeros(256 * 10), sampling_frequency=256, label="EEG")]).write(
+        path
+    )
+    model = Model()
+    view = MainWindow(model)
+    model.view = view
+    qtbot.addWidget(view)
+
+    model.load(path)
+    parent_item = view.sidebar.find_item(model.current["id"])
+    model.duplicate_data()
+    model.crop(0, 5)
+    child_id = model.current["id"]
+    child_item = view.sidebar.find_item(child_id)
+
+    assert view.sidebar.find_item(model.data[0]["id"]) is parent_item
+    assert child_item.parent() is parent_item
+    assert child_item.text(0) == model.current["name"]
+    assert view.sidebar.currentItem() is child_item
+
+    model.remove_data_cascade(model.data[0]["id"])
+    assert view.sidebar.count_items() == 0
+
+
+def test_epochs_dropped_in_browser(qtbot, tmp_path):
+    """Epochs dropped in the browser update the info, size, and data version."""
+    path = tmp_path / "data.edf"
+    Edf([EdfSignal(np.zeros(256 * 10), sampling_frequency=256, label="EEG")]).write(
+        path
+    )
+    model = Model()
+    view = MainWindow(model)
+    model.view = view
+    qtbot.addWidget(view)
+
+    model.load(path)
+    model.set_events(np.column_stack([np.arange(1, 9) * 256, [0] * 8, [1] * 8]))
+    model.epoch_data([1], -0.5, 0.5, None)
+    assert model.get_info()["Samples"].startswith("8 x")
+    nbytes, key = model.current["_nbytes"], view._tfr_key()
+
+    # done by plot_data()
+    view.bads = model.current["data"].info["bads"]
+    view.selection = model.current["data"].selection
+    model.current["data"].drop([1, 4], reason="USER")  # done by the browser
+    view._plot_closed()
+
+    assert model.get_info()["Samples"].startswith("6 x")
+    assert model.current["_nbytes"] < nbytes
+    assert view._tfr_key() != key
+    assert model.history[-1] == 'data.drop([1, 4], reason="USER")'
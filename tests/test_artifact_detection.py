@@ -5,8 +5,16 @@
 import mne
 import numpy as np
 import pytest
+from PySide6.QtCore import Qt
+from scipy import stats
 
+from mnelab.dialogs.artifact_detection import (
+    ArtifactDetectionDialog,
+    ArtifactPreviewTable,
+)
 from mnelab.utils.artifact_detection import (
+    compute_epoch_stats,
+    find_bad_epochs,
     find_bad_epochs_amplitude,
     find_bad_epochs_kurtosis,
     find_bad_epochs_ptp,
@@ -81,3 +89,98 @@ def test_find_bad_epochs_kurtosis(clean_epochs):
 
     bad_epochs = find_bad_epochs_kurtosis(epochs, threshold=3.0)
     np.testing.assert_array_equal(np.where(bad_epochs)[0], bad_idx)
+
+
+@pytest.mark.parametrize("chunk_size", [None, 7])
+def test_compute_epoch_stats(clean_epochs, chunk_size):
+    """Test that all statistics computed in one pass match separate computations."""
+    x = clean_epochs.get_data()
+    x[4, 1] = 0  # constant signal
+    epochs = mne.EpochsArray(x, clean_epochs.info)
+
+    result = compute_epoch_stats(
+        epochs, ("amplitude", "ptp", "kurtosis", "max_abs"), chunk_size=chunk_size
+    )
+
+    centered = x - x.mean(axis=-1, keepdims=True)
+    np.testing.assert_allclose(result["amplitude"], np.abs(centered).max(axis=-1))
+    np.testing.assert_allclose(result["ptp"], np.ptp(x, axis=-1))
+    np.testing.assert_allclose(result["max_abs"], np.abs(x).max(axis=-1))
+    with np.errstate(all="ignore"):
+        expected = stats.kurtosis(x, axis=-1)
+    np.testing.assert_allclose(result["kurtosis"], expected, rtol=1e-10)
+    assert np.isnan(result["kurtosis"][4, 1])
+
+
+def test_compute_epoch_stats_from_array(clean_epochs):
+    """Test that statistics can be computed from a read-only view of the samples."""
+    samples = clean_epochs.get_data(copy=False).view()
+    samples.flags.writeable = False
+    expected = compute_epoch_stats(clean_epochs, chunk_size=7)
+
+    result = compute_epoch_stats(samples, chunk_size=7)
+
+    assert result.keys() == expected.keys()
+    for stat, values in expected.items():
+        np.testing.assert_array_equal(result[stat], values)
+
+
+def test_find_bad_epochs(clean_epochs):
+    """Test that detecting with several methods at once matches single methods."""
+    x = clean_epochs.get_data()
+    x[[2, 8], 0, 50] = 150e-6
+    x[[5, 15], :, ::20] = 100e-6
+    epochs = mne.EpochsArray(x, clean_epochs.info)
+    methods = {
+        "amplitude": (find_bad_epochs_amplitude, 100e-6),
+        "ptp": (find_bad_epochs_ptp, 150e-6),
+        "kurtosis": (find_bad_epochs_kurtosis, 3.0),
+    }
+
+    masks = find_bad_epochs(epochs, {name: t for name, (_, t) in methods.items()})
+
+    assert masks.keys() == methods.keys()
+    for name, (func, threshold) in methods.items():
+        np.testing.assert_array_equal(masks[name], func(epochs, threshold))
+    assert masks["amplitude"].any()
+
+
+def test_dialog_uses_precomputed_stats(qtbot, clean_epochs):
+    """Test that threshold changes in the dialog take effect without waiting."""
+    x = clean_epochs.get_data()
+    x[[3, 12], 1, :50] = 100e-6
+    x[[3, 12], 1, 50:] = -100e-6
+    epochs = mne.EpochsArray(x, clean_epochs.info)
+    dialog = ArtifactDetectionDialog(None, epochs)
+    qtbot.addWidget(dialog)
+    qtbot.waitUntil(lambda: dialog.stats is not None)
+
+    widgets = dialog.method_widgets["Peak-to-Peak"]
+    widgets["checkbox"].setChecked(True)
+    assert dialog.get_bad_epochs() == [3, 12]
+    widgets["inputs"]["threshold"]["spinbox"].setValue(500)
+    assert dialog.get_bad_epochs() == []
+    assert "0/30 epochs" in dialog.info_label.text()
+
+
+def test_preview_table(qtbot):
+    """Test that the preview table shows and edits the detection results array."""
+    results = np.zeros((5, 3), dtype=bool)
+    results[[1, 3], 0] = True
+    results[[3, 4], 1] = True
+    results[:, -1] = results[:, :-1].any(axis=1)
+    dialog = ArtifactPreviewTable(None, None, results, {"A": 0, "B": 1})
+    qtbot.addWidget(dialog)
+    model = dialog.model
+
+    assert (model.rowCount(), model.columnCount()) == (5, 4)
+    assert model.index(1, 1).data() == "✔"
+    assert model.index(1, 2).data() == ""
+    assert "3/5 epochs" in dialog.info_label.text()
+
+    model.sort(2, Qt.SortOrder.DescendingOrder)
+    assert [model.source_row(row) for row in range(5)] == [3, 4, 0, 1, 2]
+
+    model.setData(model.index(1, 3), Qt.CheckState.Unchecked, Qt.CheckStateRole)
+    assert not results[4, -1]
+    assert "2/5 epochs" in dialog.info_label.text()
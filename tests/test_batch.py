@@ -0,0 +1,128 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import json
+
+import mne
+import numpy as np
+import pytest
+from edfio import Edf, EdfSignal
+
+from mnelab import batch
+from mnelab.batch import (
+    STATE_FILE,
+    PipelineError,
+    load_pipeline,
+    main,
+    pipeline_from_operations,
+)
+from mnelab.model import Model, write_operations
+from mnelab.utils import format_code
+
+
+@pytest.fixture
+def edf_files(tmp_path):
+    """Generate .edf files for testing purposes."""
+    rng = np.random.default_rng(0)
+    paths = []
+    for i in range(2):
+        path = tmp_path / "data" / f"sub-{i}.edf"
+        path.parent.mkdir(exist_ok=True)
+        signal = EdfSignal(rng.standard_normal(30 * 256), sampling_frequency=256)
+        Edf([signal]).write(path)
+        paths.append(path)
+    return paths
+
+
+@pytest.fixture
+def model(edf_files):
+    """Record a pipeline in the operations of a model."""
+    model = Model()
+    model.load(edf_files[0])
+    model.filter(lower=1)
+    model.resample(128)
+    model.add_code(
+        "data.plot(n_channels=20, duration=20)", name="plot_data", interactive=True
+    )
+    return model
+
+
+@pytest.fixture(params=[".py", ".json"])
+def pipeline(request, tmp_path, model):
+    """Save the pipeline as a history script or as operations."""
+    path = tmp_path / f"pipeline{request.param}"
+    if request.param == ".py":
+        path.write_text(format_code("\n".join(model.history)))
+    else:
+        write_operations(path, model.operations)
+    return path
+
+
+def test_load_pipeline():
+    """Test that the input file is replaced and plots are removed."""
+    pipeline = load_pipeline(
+        'import mne\ndata = read_raw("a.edf", preload=True)\n'
+        "data.filter(1, None)\ndata.compute_psd().plot()\n"
+    )
+    assert "read_raw(input_fname, preload=True)" in pipeline
+    assert "data.filter(1, None)" in pipeline
+    assert "plot" not in pipeline
+
+    with pytest.raises(PipelineError, match="exactly one file"):
+        load_pipeline('data = read_raw("a.edf")\ndata2 = read_raw("b.edf")')
+
+
+def test_pipeline_from_operations(model, edf_files):
+    """Test that the reader is called with the input file and plots are removed."""
+    pipeline = pipeline_from_operations(model.operations)
+    assert "data = read_raw(input_fname, preload=True)" in pipeline
+    assert str(edf_files[0].name) not in pipeline
+    assert "data.filter(1, None)" in pipeline
+    assert "plot" not in pipeline
+    assert pipeline.startswith("\n".join(model.history[:2]))
+
+    with pytest.raises(PipelineError, match="exactly one file"):
+        pipeline_from_operations(model.operations * 2)
+
+
+def test_batch(tmp_path, edf_files, pipeline, capsys):
+    """Test that all files are processed and processed files are skipped."""
+    output_dir = tmp_path / "out"
+    pattern = str(tmp_path / "data" / "*.edf")
+    broken = tmp_path / "data" / "sub-9.edf"
+    broken.write_text("not an EDF file")
+
+    assert main([str(pipeline), pattern, "-o", str(output_dir), "-j", "2"]) == 1
+    state = json.loads((output_dir / STATE_FILE).read_text())["files"]
+    assert state[str(broken)]["status"] == "failed"
+    assert "Traceback" in (output_dir / "logs" / "sub-9.log").read_text()
+    for fname in edf_files:
+        assert state[str(fname)]["status"] == "done"
+        raw = mne.io.read_raw_fif(output_dir / f"{fname.stem}_raw.fif", verbose=False)
+        assert raw.info["sfreq"] == 128
+        assert raw.info["highpass"] == 1
+
+    # only the failed file is processed again
+    broken.unlink()
+    edf_files[0].rename(broken)
+    capsys.readouterr()
+    assert main([str(pipeline), pattern, "-o", str(output_dir), "-m", "1"]) == 0
+    assert "Skipping 1 file(s)" in capsys.readouterr().out
+    state = json.loads((output_dir / STATE_FILE).read_text())["files"]
+    assert state[str(broken)]["status"] == "done"
+
+
+def test_batch_estimates_memory_once(tmp_path, edf_files, model, monkeypatch):
+    """Test that a file waiting for memory is not estimated again."""
+    estimated = []
+
+    def estimate_memory(fname):
+        estimated.append(fname)
+        return 2**30
+
+    monkeypatch.setattr(batch, "estimate_memory", estimate_memory)
+    code = pipeline_from_operations(model.operations)
+    failed = batch.run_batch(code, edf_files, tmp_path / "out", 2, memory_budget=1)
+    assert failed == []
+    assert sorted(estimated) == sorted(map(str, edf_files))
@@ -10,7 +10,7 @@ from pathlib import Path
 from types import SimpleNamespace
 
 
-def _load_dependencies_module(monkeypatch, modules):
+def _load_dependencies_module(monkeypatch, modules, cache_dir):
     module_path = (
         Path(__file__).resolve().parents[1]
         / "src"
@@ -29,6 +29,7 @@ def _load_dependencies_module(monkeypatch, modules):
 
     monkeypatch.setattr(importlib_metadata, "version", fake_metadata_version)
     monkeypatch.setattr(importlib, "import_module", fake_import_module)
+    monkeypatch.setenv("MNELAB_CACHE_DIR", str(cache_dir))
 
     module_name = "mnelab_test_dependencies"
     sys.modules.pop(module_name, None)
@@ -41,7 +42,7 @@ def _load_dependencies_module(monkeypatch, modules):
     return module
 
 
-def test_standalone_fallback_detects_importable_dependencies(monkeypatch):
+def test_standalone_fallback_detects_importable_dependencies(monkeypatch, tmp_path):
     modules = {
         "mnextend": SimpleNamespace(__version__="0.2.0"),
         "PySide6": SimpleNamespace(__version__="6.9.4"),
@@ -51,7 +52,7 @@ def test_standalone_fallback_detects_importable_dependencies(monkeypatch):
         "picard": SimpleNamespace(__version__="0.8.0"),
     }
 
-    dependencies = _load_dependencies_module(monkeypatch, modules)
+    dependencies = _load_dependencies_module(monkeypatch, modules, tmp_path)
 
     assert dependencies.have["mnextend"] == "0.2.0"
     assert dependencies.have["pyside6"] == "6.9.4"
@@ -61,7 +62,23 @@ def test_standalone_fallback_detects_importable_dependencies(monkeypatch):
     assert dependencies.have["python-picard"] == "0.8.0"
 
 
-def test_standalone_fallback_keeps_false_for_missing_import(monkeypatch):
-    dependencies = _load_dependencies_module(monkeypatch, modules={})
+def test_standalone_fallback_keeps_false_for_missing_import(monkeypatch, tmp_path):
+    dependencies = _load_dependencies_module(monkeypatch, {}, tmp_path)
 
     assert dependencies.have["pyside6"] is False
+
+
+def test_versions_are_cached(monkeypatch, tmp_path):
+    modules = {"PySide6": SimpleNamespace(__version__="6.9.4")}
+    dependencies = _load_dependencies_module(monkeypatch, modules, tmp_path)
+    assert dependencies.have["pyside6"] == "6.9.4"
+
+    # detected versions are reused in the same environment
+    dependencies = _load_dependencies_module(monkeypatch, {}, tmp_path)
+    assert dependencies.have["pyside6"] == "6.9.4"
+    assert dependencies.have["scipy"] is False
+
+    # and detected again if the environment changes
+    dependencies = _load_dependencies_module(monkeypatch, {}, tmp_path)
+    monkeypatch.setattr(dependencies, "_fingerprint", lambda: "changed")
+    assert dependencies.have["pyside6"] is False
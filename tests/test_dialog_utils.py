@@ -0,0 +1,37 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import numpy as np
+from PySide6.QtCore import Qt
+
+from mnelab.dialogs.utils import ArrayColumn, ArrayTableModel
+
+
+def test_array_table_model(qtbot):
+    """Test formatting, sorting and checking cells of an ArrayTableModel."""
+    n = 100_000
+    values = np.arange(n) % 3 / 4
+    checked = np.zeros(n, dtype=bool)
+    model = ArrayTableModel(
+        [
+            ArrayColumn("Name", np.array([f"ch{i}" for i in range(n)]), align="l"),
+            ArrayColumn("Value", values, fmt=".2f"),
+            ArrayColumn("Checked", checked, checkable=True),
+        ]
+    )
+
+    assert (model.rowCount(), model.columnCount()) == (n, 3)
+    assert model.index(1, 1).data() == "0.25"
+    assert model.index(1, 1).data(Qt.ItemDataRole.UserRole) == 0.25
+    assert model.headerData(1, Qt.Orientation.Horizontal) == "Value"
+
+    model.sort(1, Qt.SortOrder.DescendingOrder)
+    assert [model.source_row(row) for row in range(3)] == [2, 5, 8]
+    assert model.headerData(0, Qt.Orientation.Vertical) == 3
+    model.sort(0)
+    assert model.index(1, 0).data() == "ch1"
+
+    model.setData(model.index(1, 2), Qt.CheckState.Checked, Qt.CheckStateRole)
+    assert checked[1]
+    assert model.index(1, 2).data(Qt.CheckStateRole) == Qt.CheckState.Checked
@@ -0,0 +1,106 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import os
+import pickle
+import time
+
+import mne
+import numpy as np
+import pytest
+
+from mnelab.executor import ComputeExecutor, SharedData, _share, report_progress
+
+
+def _pid():
+    return os.getpid()
+
+
+def _count(n):
+    for i in range(n):
+        report_progress(i + 1, n)
+    return n
+
+
+def _fail():
+    raise ValueError("failed")
+
+
+@pytest.fixture
+def executor():
+    executor = ComputeExecutor()
+    yield executor
+    executor.shutdown()
+
+
+def test_executor_reuses_worker(executor):
+    """Test that consecutive jobs run in the same worker process."""
+    first = executor.submit(_pid).get(timeout=30)
+    second = executor.submit(_pid).get(timeout=30)
+    assert first == second != os.getpid()
+
+
+def test_executor_cancel_restarts_worker(executor):
+    """Test that cancelling terminates the worker and the next job starts a new one."""
+    first = executor.submit(_pid).get(timeout=30)
+    executor.submit(time.sleep, (60,))
+    executor.cancel()
+    assert executor.submit(_pid).get(timeout=30) != first
+
+
+def test_executor_progress_and_errors(executor):
+    """Test that progress is reported and exceptions are propagated."""
+    assert executor.submit(_count, (5,)).get(timeout=30) == 5
+    deadline = time.monotonic() + 5
+    progress = None
+    while progress != (5, 5) and time.monotonic() < deadline:
+        progress = executor.progress() or progress
+    assert progress == (5, 5)
+    assert executor.progress() is None
+    with pytest.raises(ValueError, match="failed"):
+        executor.submit(_fail).get(timeout=30)
+    report_progress(1, 1)  # no-op in the main process
+
+
+def _sum(inst):
+    return inst.get_data().sum()
+
+
+@pytest.mark.parametrize("dtype", ["raw", "epochs"])
+def test_executor_shares_samples(executor, dtype):
+    """Test that preloaded data is sent through shared memory."""
+    rng = np.random.default_rng(1)
+    info = mne.create_info(4, 100, "eeg")
+    if dtype == "raw":
+        inst = mne.io.RawArray(rng.standard_normal((4, 10_000)), info)
+    else:
+        inst = mne.EpochsArray(rng.standard_normal((10, 4, 1_000)), info)
+    shared = SharedData(inst)
+    try:
+        assert len(pickle.dumps(shared)) < inst._data.nbytes / 10
+    finally:
+        shared.release()
+
+    total = executor.submit(_sum, (inst,)).get(timeout=30)
+    assert total == pytest.approx(inst.get_data().sum())
+    assert not executor._shared  # released after the job has finished
+
+
+def test_executor_maps_memmapped_samples(executor, tmp_path):
+    """Test that memory-mapped data is mapped again by the worker."""
+    rng = np.random.default_rng(1)
+    info = mne.create_info(4, 100, "eeg")
+    inst = mne.io.RawArray(rng.standard_normal((4, 10_000)), info)
+    samples = np.memmap(tmp_path / "samples.dat", "float64", "w+", shape=(4, 10_000))
+    samples[:] = inst._data
+    inst._data = samples
+    assert len(pickle.dumps(_share(inst))) < samples.nbytes / 10
+
+    samples[0] += 1  # changes are visible to the worker
+    total = executor.submit(_sum, (inst,)).get(timeout=30)
+    assert total == pytest.approx(samples.sum())
+    assert not executor._shared
+
+    inst._data = samples[1:]  # a view is copied to shared memory instead
+    assert isinstance(_share(inst), SharedData)
@@ -0,0 +1,50 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import mne
+import mnextend
+import numpy as np
+import pytest
+from mne.preprocessing import ICA
+
+from mnelab.utils import iclabel_hash, run_iclabel_cached
+
+
+@pytest.fixture(scope="module")
+def raw_and_ica():
+    ch_names = ["Fp1", "Fp2", "Fz", "Cz", "Pz", "Oz", "F7", "F8"]
+    info = mne.create_info(ch_names, 250, "eeg")
+    info.set_montage("easycap-M1")
+    data = np.random.default_rng(42).standard_normal((8, 250 * 20)) * 1e-5
+    raw = mne.io.RawArray(data, info, verbose=False)
+    raw.filter(1, 45, verbose=False)
+    ica = ICA(n_components=8, method="infomax", random_state=0, max_iter="auto")
+    ica.fit(raw, verbose=False)
+    return raw, ica
+
+
+def test_iclabel_results_are_cached(raw_and_ica, tmp_path, monkeypatch):
+    monkeypatch.setenv("MNELAB_CACHE_DIR", str(tmp_path))
+    calls = []
+
+    def run_iclabel(inst, ica):
+        calls.append(inst)
+        return np.full((ica.n_components_, 7), len(calls), dtype=np.float32)
+
+    monkeypatch.setattr(mnextend, "run_iclabel", run_iclabel)
+    raw, ica = raw_and_ica
+    probs = run_iclabel_cached(raw, ica)
+    assert np.array_equal(run_iclabel_cached(raw.copy(), ica.copy()), probs)
+    assert len(calls) == 1
+    assert list((tmp_path / "iclabel").iterdir()) == [
+        tmp_path / "iclabel" / f"{iclabel_hash(raw, ica)}.npy"
+    ]
+
+    # changing the data or the ICA solution requires a new classification
+    modified = ica.copy()
+    modified.unmixing_matrix_ = modified.unmixing_matrix_[::-1]
+    assert not np.array_equal(run_iclabel_cached(raw, modified), probs)
+    cropped = raw.copy().crop(0, 10)
+    assert iclabel_hash(cropped, ica) != iclabel_hash(raw, ica)
+    assert len(calls) == 2
@@ -50,3 +50,32 @@ with patch("PySide6.QtWidgets.QApplication.exec", return_value=0):
         f"Expected window title 'MNELAB', got: {result.stdout.strip()!r}\n"
         f"stderr: {result.stderr}"
     )
+
+
+def test_startup_defers_heavy_imports():
+    """Test that importing the main window does not import modules used only later."""
+    deferred = [
+        "black",
+        "isort",
+        "matplotlib.pyplot",
+        "mne.viz",
+        "mnextend",
+        "scipy.signal",
+        "scipy.stats",
+    ]
+    script = f"""
+import sys
+
+import mnelab.mainwindow
+import mnelab.model
+
+print(" ".join(m for m in {deferred!r} if m in sys.modules))
+"""
+    result = subprocess.run(
+        [sys.executable, "-c", script],
+        capture_output=True,
+        text=True,
+        timeout=60,
+        check=True,
+    )
+    assert result.stdout.strip() == ""
@@ -2,7 +2,9 @@
 #
 # License: BSD (3-clause)
 
+import json
 import math
+import tempfile
 from pathlib import Path
 
 import numpy as np
@@ -10,7 +12,15 @@ import pytest
 from edfio import Edf, EdfSignal
 from mne import Annotations
 
-from mnelab.model import InvalidAnnotationsError, Model
+from mnelab.model import (
+    HISTORY_HEADER,
+    InvalidAnnotationsError,
+    Model,
+    data_changed,
+    read_operations,
+    summarize_operations,
+    write_operations,
+)
 
 
 @pytest.fixture(scope="module")
@@ -105,6 +115,14 @@ def model_with_data(tmp_path):
     return model
 
 
+def test_channel_stats_cached_per_version(model_with_data):
+    stats = model_with_data.get_channel_stats()
+    assert model_with_data.get_channel_stats() is stats
+    assert model_with_data.get_channel_stats(exact=True) is not stats
+    model_with_data.crop(0, 10)
+    assert model_with_data.get_channel_stats() is not stats
+
+
 def _write_annotations_csv(path, rows, header=True):
     """Write a CSV annotation file."""
     with open(path, "w") as f:
@@ -375,3 +393,274 @@ def test_duplicate_does_not_share_parent_cache(model_two_datasets):
 
     model.reload_dataset(child_index)
     assert model.data[child_index]["data"] is not None
+
+
+def test_load_lazy(edf_files):
+    """Lazily loaded data is only read into memory when an operation needs it."""
+    model = Model()
+    model.load(edf_files[0], preload=False)
+
+    assert not model.current["data"].preload
+    assert model.nbytes == 0
+    assert model.get_info()["Size in Memory"] == "not loaded"
+
+    model.filter(1, None)
+
+    assert model.current["data"].preload
+    assert model.nbytes > 0
+
+
+def test_load_memmap(edf_files):
+    """Memory-mapped data is backed by a temporary file removed by cleanup()."""
+    model = Model()
+    model.load(edf_files[0], preload="memmap")
+
+    data = model.current["data"]
+    assert isinstance(data._data, np.memmap)
+    assert model.nbytes == 0
+    assert model.get_info()["Size in Memory"] == "memory-mapped"
+    path = data._data.filename
+    assert path in model._temp_files
+
+    del data
+    model.data.clear()
+    model.cleanup()
+    assert not Path(path).exists()
+
+
+def test_load_memmap_unsupported_reader(tmp_path):
+    """No temporary file is left behind by readers that do not memory-map."""
+    fname = tmp_path / "data.npy"
+    np.save(fname, np.random.default_rng(1).standard_normal((2, 1000)))
+    temp_files = set(Path(tempfile.gettempdir()).glob("mnelab_*.dat"))
+    model = Model()
+    model.load(fname, 100, preload="memmap")
+
+    assert not isinstance(model.current["data"]._data, np.memmap)
+    assert not model._temp_files
+    assert set(Path(tempfile.gettempdir()).glob("mnelab_*.dat")) == temp_files
+
+
+@pytest.mark.parametrize(
+    "kwargs", [{"lower": 1}, {"upper": 20}, {"lower": 1, "upper": 20}, {"notch": 50}]
+)
+def test_filter_memmap(edf_files, kwargs):
+    """Filtering memory-mapped data block by block matches filtering in memory."""
+    model = Model()
+    model.load(edf_files[0])
+    model.filter(**kwargs)
+    expected = model.current["data"]
+
+    model.load(edf_files[0], preload="memmap")
+    model.duplicate_data()  # samples are read-only and must be written to a new file
+    model.filter(**kwargs)
+    data = model.current["data"]
+    assert isinstance(data._data, np.memmap)
+    assert data._data.filename != model.data[model.index - 1]["data"]._data.filename
+    np.testing.assert_allclose(data._data, expected._data, rtol=0, atol=1e-12)
+    assert data.info["highpass"] == expected.info["highpass"]
+    assert data.info["lowpass"] == expected.info["lowpass"]
+    model.data.clear()
+    model.cleanup()
+
+
+def test_filter_n_jobs_in_history(edf_files):
+    """The number of parallel jobs is recorded in the history."""
+    model = Model()
+    model.load(edf_files[0], preload="memmap")
+    model.filter(lower=1)
+    assert model.history[-1] == "data.filter(1, None)"
+    expected = np.array(model.current["data"]._data)
+
+    model.load(edf_files[0], preload="memmap")
+    model.n_jobs = 2
+    model.filter(lower=1)
+    assert model.history[-1] == "data.filter(1, None, n_jobs=2)"
+    np.testing.assert_allclose(model.current["data"]._data, expected, atol=1e-12)
+    model.data.clear()
+    model.cleanup()
+
+
+def test_cache_evicts_least_recently_used(edf_files):
+    """The dataset cache only evicts when the budget is exceeded, oldest first."""
+    model = Model()
+    for file in edf_files:
+        model.load(file)
+    size = model.nbytes // len(edf_files)
+
+    model.cache.budget = 3 * size
+    assert model.cache.enforce() == []
+
+    model.index = 0
+    model.cache.enforce()
+    model.index = 2
+    model.cache.enforce()
+    model.index = 1
+    model.cache.enforce()  # usage order is now 0, 2, 1
+
+    model.cache.budget = 2 * size
+    model.index = 2
+    assert model.cache.enforce() == [model.data[0]["id"]]
+    assert model.data[0]["data"] is None
+    assert model.cache.evictions == 1
+
+    model.cache.access(0)  # reload evicted dataset
+    model.cache.access(2)
+    assert model.cache.misses == 1
+    assert model.cache.hits == 1
+
+    model.index = 0
+    assert model.cache.enforce() == [model.data[1]["id"]]  # current is pinned
+    assert model.data[0]["data"] is not None
+
+
+def test_background_evict_and_prefetch(model_two_datasets):
+    """Background evictions and prefetches are consumed by reload_dataset()."""
+    model = model_two_datasets
+    expected = model.data[0]["data"].get_data()
+
+    model.evict_dataset(0, background=True)
+    assert model.data[0]["data"] is None
+    model.reload_dataset(0)  # reuses the data if the write is still in flight
+    np.testing.assert_array_equal(model.data[0]["data"].get_data(), expected)
+
+    model.evict_dataset(0, background=True)
+    model._io.shutdown(wait=True)  # make sure the write has finished
+    model._io = None
+    assert Path(model.data[0]["_cache_path"]).exists()
+    assert not model._pending
+
+    future = model.prefetch_dataset(0)
+    samples = future.result()._data
+    # read into memory instead of being mapped from the cache file
+    assert not isinstance(samples.base, np.memmap)
+    model.reload_dataset(0)
+    assert model.data[0]["data"]._data is samples
+    assert not model._prefetched
+    np.testing.assert_array_equal(model.data[0]["data"].get_data(), expected)
+    model.cleanup()
+
+
+@pytest.mark.parametrize("preload", [True, False])
+def test_evict_reload_roundtrip(edf_files, preload):
+    """Evicted datasets (including lazy and epoched ones) reload unchanged."""
+    model = Model()
+    model.load(edf_files[0], preload=preload)
+    model.load(edf_files[1])
+    model.current["data"].set_annotations(Annotations([1, 5], [1, 1], ["a", "a"]))
+    model.events_from_annotations()
+    model.epoch_data([1], -0.5, 0.5, None)
+    for index in range(2):
+        expected = model.data[index]["data"].get_data()
+        model.evict_dataset(index)
+        model.reload_dataset(index)
+        data = model.data[index]["data"]
+        assert data.preload == (preload or index == 1)
+        np.testing.assert_array_equal(data.get_data(), expected)
+    assert model.data[1]["data"].events.shape == (2, 3)
+    model.cleanup()
+
+
+def test_duplicate_shares_samples_until_modified(model_two_datasets):
+    """Duplicated datasets share samples until an in-place operation runs."""
+    model = model_two_datasets
+    parent = model.current["data"]
+    expected = parent.get_data()
+
+    model.duplicate_data()
+    child = model.current["data"]
+    assert child._data is parent._data
+    assert not child._data.flags.writeable
+
+    model.filter(1, None)
+    assert not np.shares_memory(child._data, parent._data)
+    np.testing.assert_array_equal(parent.get_data(), expected)
+
+    model.index = 0
+    model.change_reference([], "average")  # the parent gets its own copy as well
+    assert parent._data.flags.writeable
+
+
+def test_nbytes_counts_shared_samples_once(model_two_datasets):
+    """Shared samples are counted once and evicted samples are reported on disk."""
+    model = model_two_datasets
+    size = model.data[0]["data"]._data.nbytes
+
+    model.duplicate_data()
+    assert model.nbytes == 2 * size
+
+    model.filter(1, None)  # the duplicate gets its own copy
+    assert model.nbytes == 3 * size
+
+    model.evict_dataset(0)
+    assert model.nbytes == 2 * size
+    assert model.nbytes_on_disk == size
+
+
+def test_get_info_invalidates_only_changed_fields(model_with_data):
+    """Operations only invalidate the info fields they change."""
+    model = model_with_data
+    info = model.get_info()
+    assert info["Events"] == "–"
+    model.current["_info"]["Channels"] = "cached"
+
+    model.set_events(np.array([[10, 0, 1], [20, 0, 2]]))
+    info = model.get_info()
+    assert info["Events"] == "2 (1: 1, 2: 1)"
+    assert info["Channels"] == "cached"
+
+    version = model.current["_version"]
+    model.crop(0, 5)
+    assert model.current["_version"] == version + 1
+    assert model.get_info()["Channels"] == "cached"
+
+    model.invalidate_info()
+    assert model.get_info()["Channels"] != "cached"
+
+
+def test_operations_are_recorded(edf_files, tmp_path):
+    """Model operations are recorded with parameters, timing, and code."""
+    model = Model()
+    model.load(edf_files[0])
+    model.duplicate_data()  # inserts a data set as part of the operation
+    model.filter(lower=1)
+
+    assert [op.name for op in model.operations] == ["load", "duplicate_data", "filter"]
+    load, duplicate, filter_ = model.operations
+    assert load.params["fname"] == str(edf_files[0])
+    assert load.memory_delta == model.data[0]["data"]._data.nbytes
+    assert duplicate.memory_delta == 0  # the samples are shared
+    assert duplicate.dataset_id == model.current["id"]
+    assert filter_.params == {"lower": 1, "upper": None, "notch": None}
+    assert filter_.code == ["data.filter(1, None)"]
+    assert filter_.duration > 0
+
+    summary = summarize_operations(model.operations)
+    assert {row["name"] for row in summary} == {"load", "duplicate_data", "filter"}
+
+    fname = tmp_path / "operations.json"
+    write_operations(fname, model.operations)
+    assert json.loads(fname.read_text())[2]["code"] == ["data.filter(1, None)"]
+    assert read_operations(fname) == model.operations
+
+
+def test_history_is_generated_from_operations(edf_files):
+    """The history consists of the code of all operations."""
+
+    class FailingModel(Model):
+        @data_changed
+        def fail(self):
+            self.add_code("data.fail()")
+            raise RuntimeError
+
+    model = FailingModel()
+    model.load(edf_files[0])
+    model.add_code("data.plot()", name="plot_data", interactive=True)
+    with pytest.raises(RuntimeError):
+        model.fail()  # the code of failed operations is discarded
+
+    load, plot = model.operations
+    assert load.params["reader"] == "read_raw"
+    assert load.code[0] == f'data = read_raw("{edf_files[0].as_posix()}", preload=True)'
+    assert plot.interactive and plot.duration == 0
+    assert model.history == [*HISTORY_HEADER, *load.code, "data.plot()"]
@@ -2,11 +2,13 @@
 #
 # License: BSD (3-clause)
 
+import mne
 import numpy as np
 import pytest
 
 from mnelab.utils import (
     annotations_between_events,
+    calculate_channel_stats,
     get_annotation_types_from_file,
     merge_annotations,
 )
@@ -421,3 +423,46 @@ def test_check_annotation_values_are_integer_empty_file(tmp_path):
     csv.write_text("type,onset,duration\n")
     _, values_are_integer = get_annotation_types_from_file(csv)
     assert values_are_integer is False
+
+
+@pytest.mark.parametrize("chunk_size", [None, 1000, 7])
+def test_channel_stats_approximate(chunk_size):
+    """Test that streamed statistics match exact ones within one histogram bin."""
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((3, 10_000)) * 1e-5
+    data[1, ::100] = 1e-3  # outliers
+    data[2] = 2e-6  # constant channel
+    raw = mne.io.RawArray(data, mne.create_info(3, SFREQ, "eeg"), verbose=False)
+
+    exact, nchan = calculate_channel_stats(raw, exact=True)
+    approx, _ = calculate_channel_stats(raw, n_bins=1000, chunk_size=chunk_size)
+    assert nchan == 3
+    assert approx["unit"] == exact["unit"] == ["µV"] * 3
+    for col in ["min", "max", "mean"]:
+        assert np.allclose(approx[col], exact[col])
+    tolerance = (exact["max"] - exact["min"]) / 1000
+    for col in ["Q1", "median", "Q3"]:
+        assert np.all(np.abs(approx[col] - exact[col]) <= tolerance)
+    assert approx["median"][2] == pytest.approx(2)
+
+
+def test_channel_stats_ignore_nan():
+    """Test that NaN samples (e.g. gaps in XDF streams) are ignored."""
+    rng = np.random.default_rng(1)
+    data = rng.standard_normal((3, 1000)) * 1e-5
+    data[0, 100:120] = np.nan
+    data[2] = np.nan
+    raw = mne.io.RawArray(data, mne.create_info(3, SFREQ, "eeg"), verbose=False)
+
+    exact, _ = calculate_channel_stats(raw, exact=True)
+    approx, _ = calculate_channel_stats(raw, n_bins=1000, chunk_size=300)
+    expected = np.nanpercentile(data[:2] * 1e6, [0, 25, 50, 75, 100], axis=1)
+    tolerance = (expected[4] - expected[0]) / 1000
+    for stats in (exact, approx):
+        assert np.allclose(stats["min"][:2], expected[0])
+        assert np.allclose(stats["max"][:2], expected[4])
+        assert np.allclose(stats["mean"][:2], np.nanmean(data[:2] * 1e6, axis=1))
+        for col, q in zip(["Q1", "median", "Q3"], expected[1:4]):
+            assert np.all(np.abs(stats[col][:2] - q) <= tolerance)
+            assert np.isnan(stats[col][2])
+        assert np.isnan([stats[col][2] for col in ["min", "max", "mean"]]).all()
@@ -0,0 +1,149 @@
+# © MNELAB developers
+#
+# License: BSD (3-clause)
+
+import mne
+import numpy as np
+import pytest
+
+from mnelab.viz import TFRCache, _calc_tfr, _calc_tfr_topomaps, _compute_tfr, _tfr_cache
+
+SFREQ = 100
+
+
+@pytest.fixture
+def epochs():
+    """Two-channel epochs of two events with a 10 Hz burst in C3 after time 0."""
+    rng = np.random.default_rng(1)
+    t = np.arange(2 * SFREQ) / SFREQ
+    data = rng.standard_normal((20, 2, t.size)) * 1e-6
+    data[:, 0, SFREQ:] += 5e-6 * np.sin(2 * np.pi * 10 * t[SFREQ:])
+    info = mne.create_info(["C3", "C4"], SFREQ, "eeg")
+    events = np.column_stack([np.arange(20) * 300, np.zeros(20), np.arange(20) % 2])
+    return mne.EpochsArray(
+        data,
+        info,
+        events.astype(int),
+        tmin=-1,
+        event_id={"left": 0, "right": 1},
+        verbose=False,
+    )
+
+
+@pytest.mark.filterwarnings("ignore:joblib not installed")
+def test_calc_tfr_masks_do_not_depend_on_n_jobs(epochs):
+    kwargs = {"alpha": 0.05, "n_permutations": 20}
+    freqs = np.arange(8.0, 13.0)
+    serial = _calc_tfr(epochs, freqs, (-1, 0), (-1, 0.99), n_jobs=1, **kwargs)
+    parallel = _calc_tfr(epochs, freqs, (-1, 0), (-1, 0.99), n_jobs=3, **kwargs)
+
+    assert list(parallel) == ["left", "right"]
+    for event, (_, masks) in serial.items():
+        assert list(parallel[event][1]) == ["C3", "C4"]
+        for ch, mask in masks.items():
+            assert mask.shape == (len(freqs), 2 * SFREQ)
+            assert np.array_equal(mask, parallel[event][1][ch])
+
+
+def test_tfr_cache_evicts_least_recently_used():
+    class FakeTFR:
+        def __init__(self, nbytes):
+            self.data = np.zeros(nbytes, dtype=np.uint8)
+
+    cache = TFRCache(budget=100)
+    cache.put("a", FakeTFR(40))
+    cache.put("b", FakeTFR(40))
+    assert cache.get("a") is not None  # "b" is now the least recently used entry
+    cache.put("c", FakeTFR(40))
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    assert cache.nbytes == 80
+    cache.put("d", FakeTFR(200))  # larger than the budget
+    assert cache.get("d") is None and len(cache) == 2
+
+
+def test_erds_maps_and_topomaps_share_tfr(epochs):
+    _tfr_cache.clear()
+    freqs = np.arange(8.0, 13.0)
+    tfr = _compute_tfr(epochs, freqs, freqs, tmin=-1, tmax=0.5, key=(1, None))
+    assert _compute_tfr(epochs, freqs, freqs, tmin=-1, tmax=0.5, key=(1, None)) is tfr
+    assert _compute_tfr(epochs, freqs, freqs, tmin=-1, tmax=0.5, key=(1, 1)) is not tfr
+    data = tfr.data.copy()
+
+    _calc_tfr(epochs, freqs, (-1, 0), (0, 0.5), key=(1, None))
+    topomaps = _calc_tfr_topomaps(
+        epochs, ["left"], freqs, (-1, 0), (0, 0.5), key=(1, None)
+    )
+    assert len(_tfr_cache) == 2
+    assert np.array_equal(tfr.data, data)  # baseline and crop work on copies
+
+    expected = epochs["left"].compute_tfr(
+        "multitaper", freqs, n_cycles=freqs, average=True, verbose=False
+    )
+    expected.apply_baseline((-1, 0), mode="percent", verbose=False)
+    expected.crop(0, 0.5)
+    assert np.allclose(topomaps["left"].data, expected.data, rtol=1e-4, atol=1e-6)
+    _tfr_cache.clear()
+
+
+def test_compute_tfr_decimated_cropped_and_chunked(epochs):
+    freqs = np.arange(8.0, 13.0)
+    full = epochs.compute_tfr(
+        "multitaper", freqs, n_cycles=freqs, average=False, verbose=False
+    )
+    tfr = _compute_tfr(epochs, freqs, freqs, decim=2, tmin=-0.5, tmax=0.5)
+    assert tfr.data.dtype == np.float32
+    assert tfr.times[0] == pytest.approx(-0.5) and tfr.times[-1] == pytest.approx(0.5)
+    keep = (full.times >= -0.5 - 1e-9) & (full.times <= 0.5 + 1e-9)
+    expected = full.data[..., keep][..., ::2]
+    assert np.allclose(tfr.data, expected, rtol=1e-5, atol=0)
+    assert tfr.event_id == epochs.event_id
+    assert np.array_equal(tfr.events, epochs.events)
+
+    chunked = _compute_tfr(epochs, freqs, freqs, decim=2, tmin=-0.5, chunk_size=3)
+    assert np.array_equal(chunked.data[..., : len(tfr.times)], tfr.data)
+
+
+def test_tfr_reused_for_other_baseline_and_crop(epochs, monkeypatch):
+    from mne import time_frequency
+
+    calls = []
+    tfr_multitaper = time_frequency.tfr_multitaper
+
+    def counting_tfr_multitaper(*args, **kwargs):
+        calls.append(args[0])
+        return tfr_multitaper(*args, **kwargs)
+
+    monkeypatch.setattr(time_frequency, "tfr_multitaper", counting_tfr_multitaper)
+    _tfr_cache.clear()
+    freqs = np.arange(8.0, 13.0)
+    maps = _calc_tfr(epochs, freqs, (-1, 0), (0, 0.5), key=(1, None))
+    assert len(calls) == 1
+    other = _calc_tfr(epochs, freqs, (-0.5, 0), (0, 0.25), key=(1, None))
+    _calc_tfr_topomaps(epochs, ["left"], freqs, (-0.8, -0.2), (0.1, 0.4), key=(1, None))
+    assert len(calls) == 1
+    assert other["left"][0].times[-1] == pytest.approx(0.25)
+    assert not np.allclose(maps["left"][0].data[..., :26], other["left"][0].data)
+
+    # a longer interval replaces the cached TFR
+    _calc_tfr(epochs, freqs, (-1, 0), (0, 0.9), key=(1, None))
+    assert len(calls) == 2 and len(_tfr_cache) == 1
+    _tfr_cache.clear()
+
+
+def test_calc_tfr_masks_with_one_empty_tail(epochs, monkeypatch):
+    freqs = np.arange(8.0, 13.0)
+    shape = (len(freqs), 2 * SFREQ)
+
+    def pcluster_test(x, tail, **kwargs):
+        if tail == -1:  # MNE returns an empty array if there are no clusters
+            return None, np.array([]), np.array([]), None
+        cluster = np.zeros(shape, dtype=bool)
+        cluster[0] = True
+        return None, [cluster, ~cluster], np.array([0.01, 0.5]), None
+
+    monkeypatch.setattr(mne.stats, "permutation_cluster_1samp_test", pcluster_test)
+    result = _calc_tfr(epochs, freqs, (-1, 0), (-1, 0.99), alpha=0.05)
+    for _, masks in result.values():
+        for mask in masks.values():
+            assert mask[0].all() and not mask[1:].any()
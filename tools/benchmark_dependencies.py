@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+
+"""Measure how long it takes to detect the installed dependencies.
+
+Run from the repository root:
+
+  python tools/benchmark_dependencies.py --repeat 10
+
+Each measurement runs in a new interpreter, because the package metadata is cached by
+the operating system and by `importlib` after the first lookup. The script reports the
+median wall-clock time of
+
+- detecting all dependencies when the module is imported (the previous behavior),
+- detecting all dependencies with an empty cache (the first start),
+- reading all dependencies from the cache (any subsequent start), and
+- reading only the dependencies needed at startup from the cache.
+
+Interpreter startup and importing MNELAB are not included in the reported times.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import tempfile
+from statistics import median
+
+SETUP = """
+from time import perf_counter
+from mnelab.utils import dependencies as d
+start = perf_counter()
+"""
+REPORT = "\nprint(perf_counter() - start)"
+CASES = {
+    "eager (all)": "{dep: d._detect(dep) for dep in d.required + d.optional}",
+    "lazy, no cache (all)": "dict(d.have)",
+    "lazy, cached (all)": "dict(d.have)",
+    "lazy, cached (startup)": "d.have['joblib'], d.have['mne-qt-browser']",
+}
+
+
+def run(code, cache_dir):
+    env = dict(os.environ, MNELAB_CACHE_DIR=cache_dir)
+    result = subprocess.run(
+        [sys.executable, "-c", SETUP + code + REPORT],
+        capture_output=True,
+        text=True,
+        check=True,
+        env=env,
+    )
+    return float(result.stdout.split()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="mnelab_") as warm:
+        # writes byte code, warms up the file system cache, and fills the cache
+        run(CASES["lazy, cached (all)"], warm)
+        for name, code in CASES.items():
+            times = []
+            for _ in range(args.repeat):
+                if "no cache" in name:
+                    with tempfile.TemporaryDirectory(prefix="mnelab_") as cold:
+                        times.append(run(code, cold))
+                else:
+                    times.append(run(code, warm))
+            print(f"{name:<24}{median(times) * 1000:>8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
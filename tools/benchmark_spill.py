@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+
+"""Compare the dataset spill format against a FIF round trip.
+
+Run from the repository root:
+
+  python tools/benchmark_spill.py --channels 256 --minutes 60
+
+The script writes a synthetic raw recording to a temporary directory using both the
+spill format of `Model.evict_dataset` and `mne.io.Raw.save`, reads it back with
+`Model.reload_dataset` and `mne.io.read_raw_fif(preload=True)`, and reports the
+wall-clock time of each step. Reading the spill format maps the samples lazily, so the
+time to touch every sample once (sum over all samples) is reported separately.
+"""
+
+import argparse
+import tempfile
+from pathlib import Path
+from time import perf_counter
+
+import mne
+import numpy as np
+
+from mnelab.model import Model
+
+
+def timed(f, *args, **kwargs):
+    """Return the result of f(*args, **kwargs) and the elapsed time in seconds."""
+    start = perf_counter()
+    result = f(*args, **kwargs)
+    return result, perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--channels", type=int, default=64, help="number of channels")
+    parser.add_argument("--minutes", type=float, default=10, help="duration")
+    parser.add_argument("--sfreq", type=float, default=256, help="sampling frequency")
+    parser.add_argument("--repeat", type=int, default=3, help="number of runs")
+    args = parser.parse_args()
+
+    mne.set_log_level("WARNING")
+    n_times = int(args.minutes * 60 * args.sfreq)
+    info = mne.create_info(args.channels, args.sfreq, "eeg")
+    rng = np.random.default_rng(42)
+    raw = mne.io.RawArray(rng.standard_normal((args.channels, n_times)) * 1e-5, info)
+    size = raw._data.nbytes / 1e6
+    print(f"{args.channels} channels × {n_times} samples ({size:.0f} MB)")
+
+    results = {"FIF": [], "spill": []}
+    with tempfile.TemporaryDirectory(prefix="mnelab_") as tmpdir:
+        for run in range(args.repeat):
+            fif = Path(tmpdir) / f"run{run}_raw.fif"
+            _, write = timed(raw.save, fif, overwrite=True)
+            loaded, read = timed(mne.io.read_raw_fif, fif, preload=True)
+            _, touch = timed(loaded._data.sum)
+            results["FIF"].append((write, read, touch))
+            del loaded
+
+            pkl = Path(tmpdir) / f"run{run}.pkl"
+            _, write = timed(Model._write_cache, pkl, raw)
+            loaded, read = timed(Model._read_cache, pkl)
+            _, touch = timed(loaded._data.sum)
+            results["spill"].append((write, read, touch))
+            np.testing.assert_array_equal(loaded._data, raw._data)
+            del loaded
+
+    print(f"{'format':<8}{'write':>10}{'read':>10}{'touch':>10}")
+    for name, times in results.items():
+        write, read, touch = np.median(times, axis=0)
+        print(f"{name:<8}{write:>9.3f}s{read:>9.3f}s{touch:>9.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+
+"""Measure how long it takes to import the MNELAB main window.
+
+Run from the repository root:
+
+  python tools/benchmark_startup.py --repeat 5 --budget 2
+
+Each run imports `mnelab.mainwindow` and `mnelab.model` in a new interpreter (which is
+what happens before the main window appears) and reports the median wall-clock time.
+The modules with the largest cumulative import time are listed as well (measured with
+`python -X importtime`). The script exits with status 1 if the median time exceeds the
+budget, so it can be used to catch startup regressions.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from statistics import median
+from time import perf_counter
+
+STATEMENT = "import mnelab.mainwindow, mnelab.model"
+
+
+def import_times(stderr):
+    """Parse the output of `python -X importtime` into {module: cumulative µs}."""
+    times = {}
+    for line in stderr.splitlines():
+        if match := re.match(r"import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)", line):
+            times[match[3]] = int(match[1]), len(match[2])
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="number of runs")
+    parser.add_argument("--top", type=int, default=15, help="number of modules listed")
+    parser.add_argument("--budget", type=float, help="maximum median time (seconds)")
+    args = parser.parse_args()
+
+    # the first run warms up the file system cache and writes byte code
+    subprocess.run([sys.executable, "-c", STATEMENT], check=True)
+    times = []
+    for _ in range(args.repeat):
+        start = perf_counter()
+        subprocess.run([sys.executable, "-c", STATEMENT], check=True)
+        times.append(perf_counter() - start)
+
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STATEMENT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = import_times(result.stderr)
+    top = sorted(modules.items(), key=lambda item: item[1][0], reverse=True)
+    print(f"{'cumulative':>10}  module")
+    for name, (us, indent) in top[: args.top]:
+        print(f"{us / 1e6:>9.3f}s  {' ' * (indent - 1)}{name}")
+    print(f"\nMedian startup import time: {median(times):.3f}s ({args.repeat} runs)")
+
+    if args.budget is not None and median(times) > args.budget:
+        print(f"Budget of {args.budget:.3f}s exceeded.")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()